@@ -0,0 +1,90 @@
+from array import array
+
+
+class CsrGraph(object):
+    ''' Directed graph of dense int ids with forward and reverse adjacency in CSR arrays
+
+    Node i is keys[i]. The successors of i are targets[offsets[i]:offsets[i + 1]], the
+    predecessors rev_targets[rev_offsets[i]:rev_offsets[i + 1]], both in ascending order.
+    Two int arrays per direction take a fraction of the memory of dicts of sets, and
+    traversals only touch ints, so callers make Node and Edge objects for the result only.
+    '''
+
+    def __init__(self, keys, edges):
+        '''
+        :param keys: node keys such as names, unique
+        :param edges: (from key, to key) pairs, duplicates are dropped
+        '''
+        self.keys = list(keys)
+        self.ids = {key: i for i, key in enumerate(self.keys)}
+
+        n = len(self.keys)
+        ids = self.ids
+
+        # an edge s -> t packed into one int s * n + t, ints sort much faster than tuples
+        packed = {ids[from_key] * n + ids[to_key] for from_key, to_key in edges}
+
+        self.offsets, self.targets = self.make_csr(n, sorted(packed))
+        self.rev_offsets, self.rev_targets = self.make_csr(n, sorted((p % n) * n + p // n for p in packed))
+
+    @staticmethod
+    def make_csr(node_count, sorted_packed):
+        offsets = array('l', [0]) * (node_count + 1)
+        targets = array('l', (p % node_count for p in sorted_packed))
+
+        for p in sorted_packed:
+            offsets[p // node_count + 1] += 1
+
+        for i in range(node_count):
+            offsets[i + 1] += offsets[i]
+
+        return offsets, targets
+
+    @property
+    def node_count(self):
+        return len(self.keys)
+
+    @property
+    def edge_count(self):
+        return len(self.targets)
+
+    def successors(self, i):
+        return self.targets[self.offsets[i]:self.offsets[i + 1]]
+
+    def predecessors(self, i):
+        return self.rev_targets[self.rev_offsets[i]:self.rev_offsets[i + 1]]
+
+    def out_degree(self, i):
+        return self.offsets[i + 1] - self.offsets[i]
+
+    def in_degree(self, i):
+        return self.rev_offsets[i + 1] - self.rev_offsets[i]
+
+    def traverse(self, starts, reverse=False):
+        ''' Breadth first search along the edges, against them if reverse
+
+        :return: ids reached from starts, starts included, in visiting order
+        '''
+        offsets, targets = (self.rev_offsets, self.rev_targets) if reverse else (self.offsets, self.targets)
+
+        visited = bytearray(len(self.keys))
+        order = []
+
+        for i in starts:
+            if not visited[i]:
+                visited[i] = 1
+                order.append(i)
+
+        # order is the queue
+        pos = 0
+
+        while pos < len(order):
+            i = order[pos]
+            pos += 1
+
+            for j in targets[offsets[i]:offsets[i + 1]]:
+                if not visited[j]:
+                    visited[j] = 1
+                    order.append(j)
+
+        return order
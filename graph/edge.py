@@ -1,8 +1,57 @@
 class Edge(object):
-    def __init__(self, from_, to_, attr={}):
+    __slots__ = ('from_', 'to_', 'attr')
+
+    def __init__(self, from_, to_, attr=None):
         self.from_ = from_
         self.to_ = to_
-        self.attr = attr
+        self.attr = {} if attr is None else attr
 
     def __str__(self):
         return '{} -> {}'.format(self.from_, self.to_)
+
+
+class EdgeList(object):
+    ''' Compact list of edges, endpoints kept in two parallel lists
+
+    16 bytes per edge instead of an Edge object with its own attr dict. Attributes are only
+    stored for the few edges that have them. Iterating yields Edge objects, so it can be used
+    wherever a list of edges is expected.
+    '''
+    __slots__ = ('from_nodes', 'to_nodes', 'attrs')
+
+    def __init__(self, edges=()):
+        self.from_nodes = []
+        self.to_nodes = []
+        self.attrs = {}  # position -> attr, only for edges with attributes
+
+        for edge in edges:
+            self.append(edge)
+
+    def add(self, from_node, to_node, attr=None):
+        if attr:
+            self.attrs[len(self.from_nodes)] = attr
+
+        self.from_nodes.append(from_node)
+        self.to_nodes.append(to_node)
+
+    def append(self, edge):
+        self.add(edge.from_, edge.to_, edge.attr)
+
+    def extend(self, edges):
+        for edge in edges:
+            self.append(edge)
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self.from_nodes)
+
+        return Edge(self.from_nodes[index], self.to_nodes[index], self.attrs.get(index))
+
+    def __iter__(self):
+        attrs = self.attrs
+
+        for index, (from_node, to_node) in enumerate(zip(self.from_nodes, self.to_nodes)):
+            yield Edge(from_node, to_node, attrs.get(index))
+
+    def __len__(self):
+        return len(self.from_nodes)
@@ -0,0 +1,225 @@
+import os
+import queue
+import logging
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+
+
+class GraphRenderer(object):
+    ''' Render .dot files with graphviz in a pool of subprocesses
+
+    dot runs in a pool of concurrency threads, each waiting for one dot process, so jobs can be
+    submitted while the caller keeps parsing. Each dot file is one dot call doing the layout once
+    for all its formats (dot -Tpdf -o.. -Tsvg -o..). Outputs are named like dot -O names them:
+    <dot_filepath>.<format>.
+
+    With a RenderCache, formats whose dot source was rendered before are taken from the cache
+    and only the others are rendered. The cache is only used by the thread calling submit,
+    get_finished and join, the pool threads just run dot.
+    '''
+    logger = logging.getLogger(__name__)
+
+    # tried once more with these formats if rendering fails
+    FALLBACK_FORMATS = {'pdf': 'svg'}
+
+    def __init__(self, concurrency=None, timeout=None, engine='dot', cache=None):
+        '''
+        :param concurrency: max number of dot processes at a time, default cpu count
+        :param timeout: seconds a single dot call may take, it is killed after that
+        :param engine: graphviz layout executable
+        :param cache: optional RenderCache
+        '''
+        self.concurrency = concurrency or os.cpu_count() or 1
+        self.timeout = timeout
+        self.engine = engine
+        self.cache = cache
+
+        self.executor = None
+
+        self.jobs = {}  # job id -> {'key', 'remaining', 'errors'}
+        self.next_job_id = 0
+        self.pending = 0
+        self.finished = queue.Queue()  # (job id, error, [(cache key, format, output filepath)]) per dot file
+
+        self.rendered = 0
+        self.failed = 0
+
+    @staticmethod
+    def get_output_filepath(dot_filepath, format):
+        return '{}.{}'.format(dot_filepath, format)
+
+    def get_command(self, dot_filepath, formats):
+        command = [self.engine]
+
+        for format in formats:
+            command.extend(['-T{}'.format(format), '-o{}'.format(self.get_output_filepath(dot_filepath, format))])
+
+        command.append(dot_filepath)
+
+        return command
+
+    def run_dot(self, dot_filepath, formats):
+        ''' :return: None for success or error message
+        '''
+        # an output may be a hardlink of a cache file, dot must not write through it
+        for format in formats:
+            output_filepath = self.get_output_filepath(dot_filepath, format)
+
+            if os.path.lexists(output_filepath):
+                os.remove(output_filepath)
+
+        try:
+            proc = subprocess.Popen(self.get_command(dot_filepath, formats),
+                                    stdout=subprocess.DEVNULL,
+                                    stderr=subprocess.PIPE)
+        except OSError as ex:
+            return 'failed to run {}: {}'.format(self.engine, ex)
+
+        try:
+            _, stderr = proc.communicate(timeout=self.timeout)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+            proc.communicate()
+
+            return 'render timeout after {}s'.format(self.timeout)
+
+        if proc.returncode != 0:
+            return '{} exit code {}: {}'.format(self.engine, proc.returncode, stderr.decode(errors='replace').strip())
+
+        return None
+
+    def render(self, dot_filepath, formats, keep_dot=True, cache_key=None):
+        ''' Render one dot file to all formats, falling back to FALLBACK_FORMATS on failure
+
+        :param keep_dot: False to remove the dot file after rendering
+        :param cache_key: RenderCache key of the dot source, None without cache
+        :return: (error, [(cache_key, format, output_filepath)] to put into the cache),
+                 error is None for success
+        '''
+        error = None
+
+        if formats:
+            error = self.run_dot(dot_filepath, formats)
+
+        if error:
+            fallback_formats = []
+
+            for format in formats:
+                format = self.FALLBACK_FORMATS.get(format, format)
+
+                if format not in fallback_formats:
+                    fallback_formats.append(format)
+
+            if fallback_formats != formats:
+                self.logger.warning('failed rendering [{}] to {}, try {}: {}'.format(dot_filepath, formats, fallback_formats, error))
+                formats = fallback_formats
+                error = self.run_dot(dot_filepath, formats)
+
+        cache_entries = []
+
+        if cache_key is not None and not error:
+            cache_entries = [(cache_key, format, self.get_output_filepath(dot_filepath, format)) for format in formats]
+
+        if not keep_dot and os.path.isfile(dot_filepath):
+            os.remove(dot_filepath)
+
+        return error, cache_entries
+
+    def start(self):
+        if self.executor is None:
+            self.executor = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix='GraphRenderer')
+
+    def submit(self, dot_filepaths, formats, keep_dot=True, key=None):
+        ''' Queue a render job, its result comes back from get_finished or join as (key, error)
+
+        :param dot_filepaths: dot files rendered as one job, e.g. the parts of a split graph
+        '''
+        self.start()
+
+        job_id = self.next_job_id
+        self.next_job_id += 1
+        self.jobs[job_id] = {'key': key, 'remaining': len(dot_filepaths) or 1, 'errors': []}
+        self.pending += 1
+
+        if not dot_filepaths:
+            self.finished.put((job_id, None, []))
+
+        for dot_filepath in dot_filepaths:
+            cache_key = None
+            dot_formats = list(formats)
+
+            if self.cache is not None:
+                with open(dot_filepath, encoding='utf-8') as f:
+                    cache_key = self.cache.make_key(f.read(), self.engine)
+
+                dot_formats = [f for f in dot_formats
+                               if not self.cache.get(cache_key, f, self.get_output_filepath(dot_filepath, f))]
+
+            future = self.executor.submit(self.render, dot_filepath, dot_formats, keep_dot=keep_dot, cache_key=cache_key)
+
+            def on_done(f, job_id=job_id):
+                try:
+                    error, cache_entries = f.result()
+                except Exception as ex:
+                    error, cache_entries = 'render failed: {}'.format(ex), []
+
+                self.finished.put((job_id, error, cache_entries))
+
+            future.add_done_callback(on_done)
+
+    def get_finished(self, block=False):
+        ''' :param block: wait for at least one job if any is pending
+        :return: list of (key, error) of jobs finished since the last call, error is None for success
+        '''
+        results = []
+
+        while self.pending:
+            try:
+                job_id, error, cache_entries = self.finished.get(block=block and not results)
+            except queue.Empty:
+                break
+
+            for cache_key, format, output_filepath in cache_entries:
+                self.cache.put(cache_key, format, output_filepath)
+
+            job = self.jobs[job_id]
+            job['remaining'] -= 1
+
+            if error:
+                job['errors'].append(error)
+
+            if job['remaining']:
+                continue
+
+            del self.jobs[job_id]
+            self.pending -= 1
+
+            error = '; '.join(job['errors']) if job['errors'] else None
+
+            if error:
+                self.failed += 1
+            else:
+                self.rendered += 1
+
+            results.append((job['key'], error))
+
+        return results
+
+    def join(self):
+        ''' Wait for all submitted jobs and stop the pool
+
+        :return: list of (key, error) of jobs not returned by get_finished yet
+        '''
+        results = []
+
+        while self.pending:
+            results.extend(self.get_finished(block=True))
+
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
+
+        if self.cache is not None:
+            self.cache.close()
+
+        return results
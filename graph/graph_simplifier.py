@@ -0,0 +1,148 @@
+import re
+import logging
+from graph.node import Node, NodeRegistry
+from graph.edge import EdgeList
+
+
+class GraphSimplifier(object):
+    ''' Collapse linear chains of intermediate nodes into one summary node
+
+    Script graphs have long runs of intermediate rowsets A -> B -> C -> D where each node has
+    one parent and one child. Layout time of dot grows superlinearly with them, while they add
+    little to the picture. A node is collapsible if it has exactly one distinct parent and one
+    distinct child and is none of: an input or output (type attr), a USING node, a node of
+    another module view than its neighbours. Maximal runs of at least min_chain_length
+    collapsible nodes are replaced by one node labelled with the first and last of them.
+
+    Input nodes and edges are not modified, so cached parse results can be simplified.
+    '''
+    logger = logging.getLogger(__name__)
+
+    re_view_prefix = re.compile(r'^<([^>]*)>_')
+
+    def __init__(self, min_chain_length=2):
+        self.min_chain_length = min_chain_length
+
+        # of the last simplify call
+        self.node_counts = (0, 0)
+        self.edge_counts = (0, 0)
+        self.chain_count = 0
+
+    def get_view(self, node):
+        match = self.re_view_prefix.match(str(node))
+        return match.group(1) if match else None
+
+    def is_kept(self, node):
+        if not isinstance(node, Node):
+            return True
+
+        return node.attr.get('type') in ['input', 'output'] or 'using' in node.attr
+
+    def get_collapsible(self, nodes, edges):
+        ''' :return: {node: (parent, child)} of the collapsible nodes
+        '''
+        parents = {}
+        children = {}
+
+        for edge in edges:
+            children.setdefault(edge.from_, {})[edge.to_] = None
+            parents.setdefault(edge.to_, {})[edge.from_] = None
+
+        collapsible = {}
+
+        for node in nodes:
+            if self.is_kept(node) or len(parents.get(node, ())) != 1 or len(children.get(node, ())) != 1:
+                continue
+
+            parent, = parents[node]
+            child, = children[node]
+
+            if node is parent or node is child:
+                continue
+
+            view = self.get_view(node)
+
+            if self.get_view(parent) != view or self.get_view(child) != view:
+                continue
+
+            collapsible[node] = (parent, child)
+
+        return collapsible
+
+    def get_chains(self, nodes, collapsible):
+        chains = []
+
+        for node in nodes:
+            # chains start at a collapsible node whose parent is not, a cycle of collapsible nodes is left as it is
+            if node not in collapsible or collapsible[node][0] in collapsible:
+                continue
+
+            chain = [node]
+
+            while collapsible[chain[-1]][1] in collapsible:
+                chain.append(collapsible[chain[-1]][1])
+
+            if len(chain) >= self.min_chain_length:
+                chains.append(chain)
+
+        return chains
+
+    @staticmethod
+    def make_summary_node(chain):
+        first, last = chain[0], chain[-1]
+
+        # keeps the id of the first node, ids stay unique since the chain nodes are dropped
+        return Node('{}..{}'.format(first.name, last.name),
+                    attr={'id': first.attr['id'],
+                          'label': '{}\n...\n{}\n({} nodes)'.format(first.attr['label'], last.attr['label'], len(chain)),
+                          'shape': 'box',
+                          'style': 'dashed',
+                          'collapsed': len(chain)})
+
+    def simplify(self, nodes, edges):
+        ''' :return: (nodes, edges) with chains collapsed, NodeRegistry and EdgeList
+        '''
+        nodes = list(nodes)
+        chains = self.get_chains(nodes, self.get_collapsible(nodes, edges))
+
+        summary_map = {}  # collapsed node -> summary node
+
+        for chain in chains:
+            summary_node = self.make_summary_node(chain)
+
+            for node in chain:
+                summary_map[node] = summary_node
+
+        new_nodes = NodeRegistry(summary_map.get(node, node) for node in nodes)
+        new_edges = EdgeList()
+
+        for edge in edges:
+            from_node = summary_map.get(edge.from_, edge.from_)
+            to_node = summary_map.get(edge.to_, edge.to_)
+
+            # inside a chain
+            if from_node is to_node and from_node is not edge.from_:
+                continue
+
+            new_edges.add(from_node, to_node, edge.attr)
+
+        self.node_counts = (len(nodes), len(new_nodes))
+        self.edge_counts = (len(edges), len(new_edges))
+        self.chain_count = len(chains)
+
+        node_ratio, edge_ratio = self.get_reduction_ratios()
+        self.logger.info('collapsed {} chains, nodes {} -> {} ({:.1%} less), edges {} -> {} ({:.1%} less)'
+                         .format(self.chain_count,
+                                 self.node_counts[0], self.node_counts[1], node_ratio,
+                                 self.edge_counts[0], self.edge_counts[1], edge_ratio))
+
+        return new_nodes, new_edges
+
+    def get_reduction_ratios(self):
+        ''' :return: (node reduction ratio, edge reduction ratio) of the last simplify call, 0.0 to 1.0
+        '''
+        def ratio(counts):
+            before, after = counts
+            return (before - after) / before if before else 0.0
+
+        return ratio(self.node_counts), ratio(self.edge_counts)
@@ -1,27 +1,349 @@
-from graph.networkx_utility import NetworkXUtility
+import io
+import os
+import re
+import logging
+import configparser
+from graph.graph_writer import GraphWriter
 
-from graph.node import Node
+from graph.node import Node, NodeIdAllocator
 from graph.edge import Edge
 
-from graphviz import Source
+
+class RenderPolicy(object):
+    ''' Size-aware layout of graphs that dot cannot lay out in reasonable time
+
+    A graph above max_nodes or max_edges is split into parts rendered as separate files: by
+    module view (the <view>_ node name prefix of ScriptParser.update_module_view_data) if it
+    has several views, otherwise by weakly connected component. Small views or components are
+    packed together up to the thresholds. A part still above the thresholds, or a graph that
+    cannot be split, is laid out with large_engine (sfdp or neato) instead of dot.
+    '''
+    logger = logging.getLogger(__name__)
+
+    SPLIT_AUTO = 'auto'
+    SPLIT_VIEWS = 'views'
+    SPLIT_COMPONENTS = 'components'
+    SPLIT_NONE = 'none'
+
+    SPLIT_MODES = [SPLIT_AUTO, SPLIT_VIEWS, SPLIT_COMPONENTS, SPLIT_NONE]
+    LARGE_ENGINES = ['sfdp', 'neato']
+
+    DEFAULT_MAX_NODES = 2000
+    DEFAULT_MAX_EDGES = 4000
+
+    re_view_prefix = re.compile(r'^<([^>]*)>_')
+
+    def __init__(self, max_nodes=DEFAULT_MAX_NODES, max_edges=DEFAULT_MAX_EDGES, large_engine='sfdp', split=SPLIT_AUTO):
+        if large_engine not in self.LARGE_ENGINES:
+            raise ValueError('unknown large_engine [{}], supported are {}'.format(large_engine, self.LARGE_ENGINES))
+
+        if split not in self.SPLIT_MODES:
+            raise ValueError('unknown split [{}], supported are {}'.format(split, self.SPLIT_MODES))
+
+        self.max_nodes = max_nodes
+        self.max_edges = max_edges
+        self.large_engine = large_engine
+        self.split = split
+
+    @classmethod
+    def from_config_file(cls, filepath=None):
+        ''' Read the optional [RenderPolicy] section, default config/config.ini
+        '''
+        if filepath is None:
+            filepath = os.path.join(os.path.dirname(__file__), os.pardir, 'config', 'config.ini')
+
+        config = configparser.ConfigParser()
+        config.read(filepath)
+
+        if not config.has_section('RenderPolicy'):
+            return cls()
+
+        section = config['RenderPolicy']
+
+        return cls(max_nodes=section.getint('max_nodes', cls.DEFAULT_MAX_NODES),
+                   max_edges=section.getint('max_edges', cls.DEFAULT_MAX_EDGES),
+                   large_engine=section.get('large_engine', 'sfdp'),
+                   split=section.get('split', cls.SPLIT_AUTO))
+
+    def is_large(self, node_count, edge_count):
+        return node_count > self.max_nodes or edge_count > self.max_edges
+
+    def get_large_graph_attr(self):
+        return {'layout': self.large_engine, 'overlap': 'false'}
+
+    def get_view_groups(self, writer):
+        groups = {}
+
+        for node in writer.node_attrs:
+            match = self.re_view_prefix.match(str(node))
+            groups.setdefault(match.group(1) if match else None, []).append(node)
+
+        return list(groups.values())
+
+    def get_component_groups(self, writer):
+        # union find over the edges, ignoring their direction
+        parents = {node: node for node in writer.node_attrs}
+
+        def find(node):
+            while parents[node] is not node:
+                parents[node] = parents[parents[node]]
+                node = parents[node]
+
+            return node
+
+        for from_node, to_node, _ in writer.iter_edges():
+            from_root, to_root = find(from_node), find(to_node)
+
+            if from_root is not to_root:
+                parents[to_root] = from_root
+
+        groups = {}
+
+        for node in writer.node_attrs:
+            groups.setdefault(find(node), []).append(node)
+
+        return list(groups.values())
+
+    def get_parts(self, writer):
+        ''' :return: list of GraphWriter to render, [writer] if it is small enough for dot
+        '''
+        node_count, edge_count = len(writer.node_attrs), writer.get_edge_count()
+
+        if not self.is_large(node_count, edge_count):
+            return [writer]
+
+        groups = []
+
+        if self.split in [self.SPLIT_AUTO, self.SPLIT_VIEWS]:
+            groups = self.get_view_groups(writer)
+
+        if len(groups) < 2 and self.split in [self.SPLIT_AUTO, self.SPLIT_COMPONENTS]:
+            groups = self.get_component_groups(writer)
+
+        if len(groups) < 2:
+            self.logger.info('lay out graph of {} nodes, {} edges with {}'.format(node_count, edge_count, self.large_engine))
+            return [writer.subgraph(writer.node_attrs, graph_attr=self.get_large_graph_attr())]
+
+        part_nodes_list = []
+        part_nodes = []
+        part_edge_count = 0
+
+        for group in groups:
+            group_edge_count = sum(len(writer.adj[node]) for node in group)
+
+            if part_nodes and self.is_large(len(part_nodes) + len(group), part_edge_count + group_edge_count):
+                part_nodes_list.append(part_nodes)
+                part_nodes = []
+                part_edge_count = 0
+
+            part_nodes.extend(group)
+            part_edge_count += group_edge_count
+
+        part_nodes_list.append(part_nodes)
+
+        parts = []
+
+        for part_nodes in part_nodes_list:
+            part = writer.subgraph(part_nodes)
+
+            if self.is_large(len(part.node_attrs), part.get_edge_count()):
+                part.graph_attr.update(self.get_large_graph_attr())
+
+            parts.append(part)
+
+        self.logger.info('split graph of {} nodes, {} edges into {} parts of {} groups, {} laid out with {}'
+                         .format(node_count, edge_count, len(parts), len(groups),
+                                 sum(1 for part in parts if part.graph_attr), self.large_engine))
+
+        return parts
+
 
 class GraphUtility(object):
-    def __init__(self, nodes, edges):
-        self.nu = NetworkXUtility()
+    logger = logging.getLogger(__name__)
+
+    # written directly, all other formats are rendered by graphviz from the dot source
+    GRAPH_FORMATS = ['gexf', 'dot']
+
+    def __init__(self, nodes, edges, use_networkx=False):
+        '''
+        :param use_networkx: build a networkx graph and write it with networkx/pydot instead of GraphWriter,
+                             needs networkx and pygraphviz or pydot installed
+        '''
+        self.nu = None
+        self.writer = None
+        self._dot_source = None
+
+        if use_networkx:
+            from graph.networkx_utility import NetworkXUtility
 
-        for node in nodes:
-            self.nu.add_node(node, **node.attr)
+            self.nu = NetworkXUtility()
 
-        for edge in edges:
-            self.nu.add_edge(edge.from_, edge.to_, **edge.attr)
+            for node in nodes:
+                self.nu.add_node(node, **node.attr)
+
+            for edge in edges:
+                self.nu.add_edge(edge.from_, edge.to_, **edge.attr)
+        else:
+            self.writer = GraphWriter(nodes, edges)
+
+    @classmethod
+    def from_writer(cls, writer):
+        gu = cls([], [])
+        gu.writer = writer
+
+        return gu
 
     def to_gexf_file(self, dest_file):
-        return self.nu.to_gexf(dest_file)
+        if self.nu is not None:
+            return self.nu.to_gexf(dest_file)
+
+        if not dest_file.endswith('.gexf'):
+            dest_file += '.gexf'
+
+        with open(dest_file, 'w', encoding='utf-8') as f:
+            self.writer.write_gexf(f)
+
+        return dest_file
+
+    def get_dot_source(self):
+        if self._dot_source is None:
+            f = io.StringIO()
+
+            if self.nu is not None:
+                self.nu.write_dot(f)
+            else:
+                self.writer.write_dot(f)
+
+            self._dot_source = f.getvalue()
+
+        return self._dot_source
 
     def to_dot_file(self, dest_file):
-        return self.nu.to_dot(dest_file)
+        if not dest_file.endswith('.dot'):
+            dest_file += '.dot'
+
+        with open(dest_file, 'w', encoding='utf-8') as f:
+            f.write(self.get_dot_source())
+
+        return dest_file
+
+    def to_graphviz_file(self, dest_file, format='pdf'):
+        ''' Render the graph with graphviz, without writing the dot file
+
+        :return: rendered file path, dest_file.dot.<format> as dot_to_graphviz names it
+        '''
+        if not dest_file.endswith('.dot'):
+            dest_file += '.dot'
+
+        # graphviz is only loaded when rendering in process
+        from graphviz import Source
+
+        output_file = '{}.{}'.format(dest_file, format)
+        data = Source(self.get_dot_source()).pipe(format=format)
+
+        with open(output_file, 'wb') as f:
+            f.write(data)
+
+        return output_file
+
+    def to_file(self, dest_file, format):
+        ''' Write the graph in one of GRAPH_FORMATS or a graphviz output format
+
+        :return: output file path
+        '''
+        if format == 'gexf':
+            return self.to_gexf_file(dest_file)
+
+        if format == 'dot':
+            return self.to_dot_file(dest_file)
+
+        return self.to_graphviz_file(dest_file, format=format)
+
+    def get_render_parts(self, render_policy):
+        ''' :return: list of (dest_file suffix, GraphUtility) of the parts render_policy splits the graph into
+        '''
+        # networkx graphs are written as they are
+        if render_policy is None or self.writer is None:
+            return [('', self)]
+
+        parts = render_policy.get_parts(self.writer)
+
+        if len(parts) == 1:
+            return [('', self if parts[0] is self.writer else self.from_writer(parts[0]))]
+
+        return [('.part{}'.format(i), self.from_writer(part)) for i, part in enumerate(parts, 1)]
+
+    def to_files(self, dest_file, output_formats, render=True, render_policy=None):
+        ''' Write the graph in all output_formats
+
+        gexf always holds the whole graph, dot and rendered files are written per part of render_policy:
+        dest_file.dot, dest_file.dot.pdf or dest_file.part1.dot, dest_file.part1.dot.pdf, ...
+
+        :param render: False to write dot files instead of rendering them, for GraphRenderer
+        :return: list of written files
+        '''
+        output_files = []
+        render_formats = [f for f in output_formats if f not in self.GRAPH_FORMATS]
+
+        if 'gexf' in output_formats:
+            output_files.append(self.to_gexf_file(dest_file))
+
+        if 'dot' not in output_formats and not render_formats:
+            return output_files
+
+        for suffix, part in self.get_render_parts(render_policy):
+            part_dest_file = dest_file + suffix
+
+            if 'dot' in output_formats or not render:
+                output_files.append(part.to_dot_file(part_dest_file))
+
+            if not render:
+                continue
+
+            for output_format in render_formats:
+                try:
+                    output_files.append(part.to_graphviz_file(part_dest_file, format=output_format))
+                except Exception as ex:
+                    from graph.graph_renderer import GraphRenderer
+
+                    fallback_format = GraphRenderer.FALLBACK_FORMATS.get(output_format)
+
+                    if fallback_format is None or fallback_format in output_formats:
+                        raise
+
+                    self.logger.warning('failed converting to {}, try {}: {}'.format(output_format, fallback_format, ex))
+                    output_files.append(part.to_graphviz_file(part_dest_file, format=fallback_format))
+
+        return output_files
+
+    @classmethod
+    def get_parse_stage_formats(cls, output_formats):
+        ''' Formats to write when rendering is left to a separate stage (GraphRenderer)
+
+        :return: (formats written by GraphUtility, formats rendered from the dot file), the dot file
+                 is included in the former if any format needs rendering
+        '''
+        graph_formats = [f for f in output_formats if f in cls.GRAPH_FORMATS]
+        render_formats = [f for f in output_formats if f not in cls.GRAPH_FORMATS]
+
+        if render_formats and 'dot' not in graph_formats:
+            graph_formats.append('dot')
+
+        return graph_formats, render_formats
+
+    @classmethod
+    def check_output_formats(cls, output_formats):
+        from graphviz.backend import FORMATS as GRAPHVIZ_FORMATS
+
+        unknown_formats = [f for f in output_formats if f not in cls.GRAPH_FORMATS and f not in GRAPHVIZ_FORMATS]
+
+        if unknown_formats:
+            raise ValueError('unknown output formats {}, supported are {} and graphviz formats like pdf, svg, png'
+                             .format(unknown_formats, cls.GRAPH_FORMATS))
 
     def dot_to_graphviz(self, dot_file_path, format='pdf'):
+        from graphviz import Source
+
         s = Source.from_file(dot_file_path, format=format)
         s.render(dot_file_path, view=False)
 
@@ -29,8 +351,10 @@ if __name__ == '__main__':
     nodes = []
     edges = []
 
-    nodes.append(Node('a'))
-    nodes.append(Node('b'))
+    id_allocator = NodeIdAllocator()
+
+    nodes.append(Node('a', id_allocator=id_allocator))
+    nodes.append(Node('b', id_allocator=id_allocator))
 
     edges.append(Edge('a', 'b'))
 
@@ -0,0 +1,214 @@
+import re
+
+
+class GraphWriter(object):
+    ''' Write nodes and edges as DOT or GEXF straight to a file object
+
+    Output matches what networkx (write_dot through pydot, write_gexf) produces for the same
+    nodes and edges: nodes in order of first appearance, nodes only referenced by edges are
+    added after them without attributes, edges are grouped by source node and an edge between
+    the same pair of node objects is written once.
+    '''
+    GEXF_CREATOR = 'scope_workflow_visualizer'
+
+    DOT_KEYWORDS = {'graph', 'subgraph', 'digraph', 'node', 'edge', 'strict'}
+
+    # unquoted DOT ids, as pydot writes them
+    re_dot_id = re.compile(r'^(?:[_a-zA-Z][a-zA-Z0-9_]*|[0-9]+|".*"|<.*>)$', re.S)
+    # str.isascii is 3.7+
+    re_non_ascii = re.compile(r'[^\x00-\x7f]')
+
+    GEXF_TYPES = {bool: 'boolean', int: 'long', float: 'double', str: 'string'}
+
+    def __init__(self, nodes, edges, graph_attr=None):
+        '''
+        :param graph_attr: graph attributes of the dot output, e.g. {'layout': 'sfdp'}
+        '''
+        # node -> attr, node -> {to_node: attr}
+        self.node_attrs = {}
+        self.adj = {}
+        self.graph_attr = dict(graph_attr or {})
+
+        for node in nodes:
+            self.add_node(node, node.attr)
+
+        for edge in edges:
+            self.add_node(edge.from_, None)
+            self.add_node(edge.to_, None)
+
+            to_attrs = self.adj[edge.from_]
+
+            if edge.to_ in to_attrs:
+                to_attrs[edge.to_].update(edge.attr)
+            else:
+                to_attrs[edge.to_] = dict(edge.attr)
+
+    def add_node(self, node, attr):
+        if node not in self.node_attrs:
+            self.node_attrs[node] = {}
+            self.adj[node] = {}
+
+        if attr:
+            self.node_attrs[node].update(attr)
+
+    def get_edge_count(self):
+        return sum(len(to_attrs) for to_attrs in self.adj.values())
+
+    def subgraph(self, nodes, graph_attr=None):
+        ''' :return: GraphWriter of the given nodes and the edges between them, in the original order
+        '''
+        nodes = set(nodes)
+        writer = GraphWriter([], [], graph_attr=graph_attr)
+
+        for node, attr in self.node_attrs.items():
+            if node in nodes:
+                writer.node_attrs[node] = attr
+                writer.adj[node] = {to_node: edge_attr for to_node, edge_attr in self.adj[node].items() if to_node in nodes}
+
+        return writer
+
+    def iter_edges(self):
+        for from_node, to_attrs in self.adj.items():
+            for to_node, attr in to_attrs.items():
+                yield from_node, to_node, attr
+
+    @classmethod
+    def quote_dot(cls, s):
+        if s == '':
+            return '""'
+
+        # unlike pydot, keywords and ids containing ',' or ':' are quoted, otherwise dot misreads them
+        if s.lower() not in cls.DOT_KEYWORDS and cls.re_dot_id.match(s) and (not cls.re_non_ascii.search(s) or s[0] in '"<'):
+            return s
+
+        return '"{}"'.format(s.replace('"', r'\"').replace('\n', r'\n').replace('\r', r'\r'))
+
+    @classmethod
+    def format_dot_attrs(cls, attr):
+        if not attr:
+            return ''
+
+        return ' [{}]'.format(', '.join('{}={}'.format(key, cls.quote_dot(str(attr[key]))) for key in sorted(attr)))
+
+    def write_dot(self, f):
+        # strict merges parallel edges, like networkx does for a graph without self loops
+        strict = all(from_node is not to_node for from_node, to_node, _ in self.iter_edges())
+
+        f.write('{}digraph  {{\n'.format('strict ' if strict else ''))
+
+        if self.graph_attr:
+            f.write('graph{};\n'.format(self.format_dot_attrs(self.graph_attr)))
+
+        for node, attr in self.node_attrs.items():
+            f.write('{}{};\n'.format(self.quote_dot(str(node)), self.format_dot_attrs(attr)))
+
+        for from_node, to_node, attr in self.iter_edges():
+            # pydot puts two spaces before edge attributes
+            f.write('{} -> {}{}{};\n'.format(self.quote_dot(str(from_node)),
+                                           self.quote_dot(str(to_node)),
+                                           ' ' if attr else '',
+                                           self.format_dot_attrs(attr)))
+
+        f.write('}\n')
+
+    @staticmethod
+    def escape_xml_attr(value):
+        return value.replace('&', '&amp;') \
+                    .replace('<', '&lt;') \
+                    .replace('>', '&gt;') \
+                    .replace('"', '&quot;') \
+                    .replace('\r', '&#13;') \
+                    .replace('\n', '&#10;') \
+                    .replace('\t', '&#09;')
+
+    def format_gexf_value(self, value):
+        if isinstance(value, bool):
+            return str(value).lower()
+
+        return self.escape_xml_attr(str(value))
+
+    def get_gexf_attr_ids(self, attrs):
+        ''' :return: {title: (attr_id, gexf_type)} in order of first appearance
+        '''
+        attr_ids = {}
+
+        for attr in attrs:
+            for key, value in attr.items():
+                if key not in attr_ids:
+                    attr_ids[key] = (str(len(attr_ids)), self.GEXF_TYPES.get(type(value), 'string'))
+
+        return attr_ids
+
+    def write_gexf_attr_declarations(self, f, class_, attr_ids, id_offset):
+        f.write('    <attributes mode="static" class="{}">\n'.format(class_))
+
+        for title, (attr_id, gexf_type) in attr_ids.items():
+            f.write('      <attribute id="{}" title="{}" type="{}" />\n'.format(int(attr_id) + id_offset,
+                                                                             self.escape_xml_attr(title),
+                                                                             gexf_type))
+
+        f.write('    </attributes>\n')
+
+    def write_gexf_attvalues(self, f, attr, attr_ids, id_offset, element):
+        if not attr:
+            f.write(' />\n')
+            return
+
+        f.write('>\n')
+        f.write('        <attvalues>\n')
+
+        for key, value in attr.items():
+            f.write('          <attvalue for="{}" value="{}" />\n'.format(int(attr_ids[key][0]) + id_offset,
+                                                                          self.format_gexf_value(value)))
+
+        f.write('        </attvalues>\n')
+        f.write('      </{}>\n'.format(element))
+
+    def write_gexf(self, f):
+        node_data = {}
+
+        for node, attr in self.node_attrs.items():
+            data = dict(attr)
+            node_data[node] = (str(data.pop('id', node)), str(data.pop('label', node)), data)
+
+        edge_data = [(from_node, to_node, dict(attr)) for from_node, to_node, attr in self.iter_edges()]
+
+        # attribute ids are shared by nodes and edges, nodes are numbered first
+        node_attr_ids = self.get_gexf_attr_ids(data for _, _, data in node_data.values())
+        edge_attr_ids = self.get_gexf_attr_ids(data for _, _, data in edge_data)
+        edge_id_offset = len(node_attr_ids)
+
+        f.write("<?xml version='1.0' encoding='utf-8'?>\n")
+        f.write('<gexf xmlns="http://www.gexf.net/1.2draft" '
+                'xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance" '
+                'xsi:schemaLocation="http://www.gexf.net/1.2draft http://www.gexf.net/1.2draft/gexf.xsd" '
+                'version="1.2">\n')
+        f.write('  <meta>\n')
+        f.write('    <creator>{}</creator>\n'.format(self.GEXF_CREATOR))
+        f.write('  </meta>\n')
+        f.write('  <graph defaultedgetype="directed" mode="static" name="">\n')
+
+        if edge_attr_ids:
+            self.write_gexf_attr_declarations(f, 'edge', edge_attr_ids, edge_id_offset)
+
+        if node_attr_ids:
+            self.write_gexf_attr_declarations(f, 'node', node_attr_ids, 0)
+
+        f.write('    <nodes>\n')
+
+        for node_id, label, data in node_data.values():
+            f.write('      <node id="{}" label="{}"'.format(self.escape_xml_attr(node_id), self.escape_xml_attr(label)))
+            self.write_gexf_attvalues(f, data, node_attr_ids, 0, 'node')
+
+        f.write('    </nodes>\n')
+        f.write('    <edges>\n')
+
+        for edge_id, (from_node, to_node, data) in enumerate(edge_data):
+            f.write('      <edge source="{}" target="{}" id="{}"'.format(self.escape_xml_attr(node_data[from_node][0]),
+                                                                       self.escape_xml_attr(node_data[to_node][0]),
+                                                                       edge_id))
+            self.write_gexf_attvalues(f, data, edge_attr_ids, edge_id_offset, 'edge')
+
+        f.write('    </edges>\n')
+        f.write('  </graph>\n')
+        f.write('</gexf>\n')
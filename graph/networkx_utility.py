@@ -1,22 +1,42 @@
+import re
+import logging
 import networkx as nx
 
-try:
-    import pygraphviz
-    from networkx.drawing.nx_agraph import write_dot
-    print("using package pygraphviz")
-except ImportError:
-    try:
-        import pydot
-        from networkx.drawing.nx_pydot import write_dot
-        print("using package pydot")
-    except ImportError:
-        print()
-        print("Both pygraphviz and pydot were not found ")
-        print("see  https://networkx.github.io/documentation/latest/reference/drawing.html")
-        print()
-        raise
+
+_write_dot = None
+
+
+def get_write_dot():
+    ''' networkx write_dot of pygraphviz, or of pydot if pygraphviz is not installed
+
+    Probed on first use, so importing this module does not load either of them.
+    '''
+    global _write_dot
+
+    if _write_dot is None:
+        logger = logging.getLogger(__name__)
+
+        try:
+            import pygraphviz
+            from networkx.drawing.nx_agraph import write_dot
+            logger.debug('using package pygraphviz')
+        except ImportError:
+            try:
+                import pydot
+                from networkx.drawing.nx_pydot import write_dot
+                logger.debug('using package pydot')
+            except ImportError:
+                raise ImportError('Both pygraphviz and pydot were not found, '
+                                  'see https://networkx.github.io/documentation/latest/reference/drawing.html')
+
+        _write_dot = write_dot
+
+    return _write_dot
+
 
 class NetworkXUtility(object):
+    re_gexf_modify_date = re.compile(r' lastmodifieddate="[^"]*"')
+
     def __init__(self):
         self.g = nx.DiGraph()
 
@@ -30,7 +50,13 @@ class NetworkXUtility(object):
         if not dest_path.endswith('.gexf'):
             dest_path += '.gexf'
 
-        nx.write_gexf(self.g, dest_path)
+        # same as nx.write_gexf, without the (optional) modify date, so the same graph gives the same bytes
+        with open(dest_path, 'w', encoding='utf-8') as f:
+            f.write("<?xml version='1.0' encoding='utf-8'?>\n")
+
+            for line in nx.generate_gexf(self.g):
+                f.write(self.re_gexf_modify_date.sub('', line, count=1))
+                f.write('\n')
 
         return dest_path
 
@@ -38,10 +64,13 @@ class NetworkXUtility(object):
         if not dest_path.endswith('.dot'):
             dest_path += '.dot'
 
-        write_dot(self.g, dest_path)
+        get_write_dot()(self.g, dest_path)
 
         return dest_path
 
+    def write_dot(self, f):
+        get_write_dot()(self.g, f)
+
 if __name__ == '__main__':
     nu = NetworkXUtility()
     nu.add_node(1, label='one')
@@ -1,19 +1,72 @@
-import uuid
+import sys
+
+
+class NodeIdAllocator(object):
+    ''' Monotonic integer node ids
+
+    Use one allocator per graph, so that identical input yields identical ids and output files.
+    '''
+    __slots__ = ('next',)
+
+    def __init__(self, start=1):
+        self.next = start
+
+    def next_id(self):
+        node_id = self.next
+        self.next += 1
+
+        return node_id
+
+
+# for nodes created without an allocator, ids are unique within the process only
+_default_id_allocator = NodeIdAllocator()
 
 
 class Node(object):
-    def __init__(self, name, attr={}):
-        self.name = name
+    __slots__ = ('name', 'attr')
+
+    def __init__(self, name, attr={}, id_allocator=None):
+        # the same names appear in many nodes and attrs (labels), keep one copy
+        self.name = sys.intern(name) if type(name) is str else name
         self.attr = attr.copy()
 
         if not 'id' in attr:
-            self.attr['id'] = uuid.uuid4()
+            self.attr['id'] = (id_allocator or _default_id_allocator).next_id()
 
         if not 'label' in attr:
-            self.attr['label'] = name
+            self.attr['label'] = self.name
 
     # pydot use this as unique identity
     # if you want to treat nodes with the same name as one node, return name
     # otherwise, return id
     def __str__(self):
-        return self.name
\ No newline at end of file
+        return self.name
+
+
+class NodeRegistry(object):
+    ''' Insertion ordered set of nodes, by identity
+
+    Drop-in for the list of nodes a parser appends to: appending a node again is a no-op,
+    so each node is kept (and later processed) once, in order of first appearance.
+    '''
+    __slots__ = ('nodes',)
+
+    def __init__(self, nodes=()):
+        self.nodes = dict.fromkeys(nodes)  # dict keeps insertion order, Node hashes by identity
+
+    def append(self, node):
+        if node not in self.nodes:
+            self.nodes[node] = None
+
+    def extend(self, nodes):
+        for node in nodes:
+            self.append(node)
+
+    def __contains__(self, node):
+        return node in self.nodes
+
+    def __iter__(self):
+        return iter(self.nodes)
+
+    def __len__(self):
+        return len(self.nodes)
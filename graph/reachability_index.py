@@ -0,0 +1,306 @@
+from array import array
+from bisect import bisect_right
+from graph.csr_graph import CsrGraph
+
+
+class IntervalLabels(object):
+    ''' Post order numbers of a DAG and, for each component, the intervals of post numbers it reaches
+
+    The node ids are kept in post order of their components, so the nodes of an interval are one slice.
+    '''
+    __slots__ = ('post', 'offsets', 'los', 'his', 'member_offsets', 'members')
+
+    def __init__(self, comp_count, offsets, targets, order, comp_offsets, comp_members):
+        '''
+        :param offsets, targets: CSR adjacency of the DAG of components
+        :param order: all components, each after the components it has edges to
+        :param comp_offsets, comp_members: node ids of each component, comp_members[comp_offsets[c]:comp_offsets[c + 1]]
+        '''
+        self.post = post = array('l', [0]) * comp_count
+        low = array('l', [0]) * comp_count
+        entered = bytearray(comp_count)
+        counter = 0
+
+        # depth first spanning forest from the sources, the subtree of c has post numbers low[c] to post[c]
+        for root in reversed(order):
+            if entered[root]:
+                continue
+
+            entered[root] = 1
+            low[root] = counter
+            stack = [(root, offsets[root])]
+
+            while stack:
+                c, pos = stack[-1]
+                end = offsets[c + 1]
+
+                while pos < end and entered[targets[pos]]:
+                    pos += 1
+
+                if pos < end:
+                    d = targets[pos]
+                    stack[-1] = (c, pos + 1)
+                    entered[d] = 1
+                    low[d] = counter
+                    stack.append((d, offsets[d]))
+                    continue
+
+                stack.pop()
+                post[c] = counter
+                counter += 1
+
+        comp_by_post = array('l', [0]) * comp_count
+        for c in range(comp_count):
+            comp_by_post[post[c]] = c
+
+        self.member_offsets = array('l', [0]) * (comp_count + 1)
+        self.members = array('l')
+
+        for p, c in enumerate(comp_by_post):
+            self.members.extend(comp_members[comp_offsets[c]:comp_offsets[c + 1]])
+            self.member_offsets[p + 1] = len(self.members)
+
+        intervals = [None] * comp_count
+
+        for c in order:
+            lo, hi = low[c], post[c]
+            merged = [(lo, hi)]
+
+            for d in targets[offsets[c]:offsets[c + 1]]:
+                reached = intervals[d]
+
+                # most successors are in the spanning subtree of c and reach nothing outside it
+                if len(reached) == 1 and lo <= reached[0][0] and reached[0][1] <= hi:
+                    continue
+
+                merged.extend(reached)
+
+            if len(merged) > 1:
+                merged = self.merge(merged)
+
+            intervals[c] = merged
+
+        self.offsets = array('l', [0]) * (comp_count + 1)
+        self.los = array('l')
+        self.his = array('l')
+
+        for c in range(comp_count):
+            self.los.extend(lo for lo, _ in intervals[c])
+            self.his.extend(hi for _, hi in intervals[c])
+            self.offsets[c + 1] = len(self.los)
+
+    @staticmethod
+    def merge(intervals):
+        ''' :return: sorted disjoint intervals covering the given ones, adjacent intervals joined
+        '''
+        intervals.sort()
+        merged = []
+        last_lo, last_hi = intervals[0]
+
+        for lo, hi in intervals:
+            if lo > last_hi + 1:
+                merged.append((last_lo, last_hi))
+                last_lo, last_hi = lo, hi
+            elif hi > last_hi:
+                last_hi = hi
+
+        merged.append((last_lo, last_hi))
+
+        return merged
+
+    def reaches(self, c, d):
+        p = self.post[d]
+        k = bisect_right(self.los, p, self.offsets[c], self.offsets[c + 1]) - 1
+
+        return k >= self.offsets[c] and p <= self.his[k]
+
+    def reached(self, comps):
+        ''' :return: node ids of the components reached from any of comps, comps included
+        '''
+        offsets = self.offsets
+        intervals = []
+
+        for c in comps:
+            intervals.extend(zip(self.los[offsets[c]:offsets[c + 1]], self.his[offsets[c]:offsets[c + 1]]))
+
+        # the intervals of one component are disjoint already
+        if len(comps) > 1:
+            intervals = self.merge(intervals)
+
+        ids = array('l')
+
+        for lo, hi in intervals:
+            ids.extend(self.members[self.member_offsets[lo]:self.member_offsets[hi + 1]])
+
+        return ids.tolist()
+
+
+class ReachabilityIndex(object):
+    ''' Reachability labels of a CsrGraph, built once, to answer upstream, downstream and path queries without a traversal
+
+    The strongly connected components are condensed into a DAG, numbered in reverse topological
+    order. Each component gets the post order number of a depth first spanning forest of the DAG,
+    and the components it reaches are the post numbers within a few intervals: the interval of
+    its spanning subtree merged with the intervals of its successors. Dependency graphs are mostly
+    trees within a workflow group, so most components have one or two intervals, where a transitive
+    closure bitset would take (component count)^2 bits. The labels of the reverse DAG answer
+    upstream queries.
+
+    path_exists is a binary search in the intervals of one component, upstream and downstream
+    read the answer off the intervals, in time linear in the size of the answer.
+    '''
+
+    def __init__(self, graph):
+        '''
+        :param graph: CsrGraph
+        '''
+        self.graph = graph
+
+        self.comps, comp_count = self.find_components(graph)
+
+        # node ids of each component
+        self.comp_offsets = array('l', [0]) * (comp_count + 1)
+        for c in self.comps:
+            self.comp_offsets[c + 1] += 1
+
+        for c in range(comp_count):
+            self.comp_offsets[c + 1] += self.comp_offsets[c]
+
+        self.comp_members = array('l', [0]) * graph.node_count
+        fill = self.comp_offsets[:-1]
+
+        for i, c in enumerate(self.comps):
+            self.comp_members[fill[c]] = i
+            fill[c] += 1
+
+        # edges between components, successors have lower numbers
+        comps = self.comps
+        dag_packed = {comps[i] * comp_count + comps[j]
+                      for i in range(graph.node_count)
+                      for j in graph.successors(i)
+                      if comps[i] != comps[j]}
+
+        dag_offsets, dag_targets = CsrGraph.make_csr(comp_count, sorted(dag_packed))
+        rev_dag_offsets, rev_dag_targets = CsrGraph.make_csr(comp_count, sorted((p % comp_count) * comp_count + p // comp_count for p in dag_packed))
+
+        self.down_labels = IntervalLabels(comp_count, dag_offsets, dag_targets, range(comp_count), self.comp_offsets, self.comp_members)
+        self.up_labels = IntervalLabels(comp_count, rev_dag_offsets, rev_dag_targets, range(comp_count - 1, -1, -1), self.comp_offsets, self.comp_members)
+
+    @property
+    def comp_count(self):
+        return len(self.comp_offsets) - 1
+
+    @property
+    def interval_count(self):
+        return len(self.down_labels.los) + len(self.up_labels.los)
+
+    @staticmethod
+    def find_components(graph):
+        ''' Tarjan's strongly connected components, without recursion
+
+        :return: (component of each node id, component count), components in reverse topological order
+        '''
+        n = graph.node_count
+        offsets, targets = graph.offsets, graph.targets
+
+        comps = array('l', [-1]) * n
+        index = array('l', [-1]) * n
+        lowlink = array('l', [0]) * n
+        on_stack = bytearray(n)
+
+        stack = []
+        next_index = 0
+        comp_count = 0
+
+        for root in range(n):
+            if index[root] >= 0:
+                continue
+
+            # (node, position of its next successor)
+            call_stack = [(root, offsets[root])]
+            index[root] = lowlink[root] = next_index
+            next_index += 1
+            stack.append(root)
+            on_stack[root] = 1
+
+            while call_stack:
+                i, pos = call_stack[-1]
+                end = offsets[i + 1]
+                child = -1
+
+                while pos < end:
+                    j = targets[pos]
+                    pos += 1
+
+                    if index[j] < 0:
+                        child = j
+                        break
+
+                    if on_stack[j] and index[j] < lowlink[i]:
+                        lowlink[i] = index[j]
+
+                if child >= 0:
+                    call_stack[-1] = (i, pos)
+                    call_stack.append((child, offsets[child]))
+                    index[child] = lowlink[child] = next_index
+                    next_index += 1
+                    stack.append(child)
+                    on_stack[child] = 1
+                    continue
+
+                call_stack.pop()
+
+                if lowlink[i] == index[i]:
+                    while True:
+                        k = stack.pop()
+                        on_stack[k] = 0
+                        comps[k] = comp_count
+
+                        if k == i:
+                            break
+
+                    comp_count += 1
+
+                if call_stack:
+                    parent = call_stack[-1][0]
+
+                    if lowlink[i] < lowlink[parent]:
+                        lowlink[parent] = lowlink[i]
+
+        return comps, comp_count
+
+    def path_exists(self, from_id, to_id):
+        ''' :return: True if to_id is reached from from_id, every node reaches itself
+        '''
+        from_comp = self.comps[from_id]
+        to_comp = self.comps[to_id]
+
+        if from_comp == to_comp:
+            return True
+
+        # edges only go to lower components
+        if to_comp > from_comp:
+            return False
+
+        return self.down_labels.reaches(from_comp, to_comp)
+
+    def downstream(self, starts):
+        ''' :return: ids reached from starts, starts included, like CsrGraph.traverse in no particular order
+        '''
+        return self.down_labels.reached({self.comps[i] for i in starts})
+
+    def upstream(self, starts):
+        ''' :return: ids reaching starts, starts included, like CsrGraph.traverse(reverse=True) in no particular order
+        '''
+        return self.up_labels.reached({self.comps[i] for i in starts})
+
+    def get_edges(self, ids):
+        ''' :return: (from id, to id) of the edges between ids
+        '''
+        graph = self.graph
+        selected = bytearray(graph.node_count)
+
+        for i in ids:
+            selected[i] = 1
+
+        return [(i, j) for i in ids for j in graph.successors(i) if selected[j]]
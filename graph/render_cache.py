@@ -0,0 +1,204 @@
+import os
+import time
+import shutil
+import sqlite3
+import hashlib
+import logging
+import tempfile
+
+
+class RenderCache(object):
+    ''' On-disk cache of graphviz renders, keyed by sha1 of the canonical dot source, engine and format
+
+    Graphs are written with deterministic node ids and attribute order (GraphWriter), so an unchanged
+    graph gives the same key in the next run and its layout is not computed again. Rendered files are
+    kept under cache_dir and handed out by hardlink, or by copy if linking is not possible. An SQLite
+    index tracks sizes and access times, least recently used files are evicted once the total size
+    exceeds max_bytes.
+    '''
+    logger = logging.getLogger(__name__)
+
+    # now, but after the latest access, so accesses within the clock resolution keep their order
+    ACCESS_TIME_SQL = 'MAX(?, (SELECT COALESCE(MAX(last_access), 0) + 0.000001 FROM entries))'
+
+    DB_FILENAME = 'render_cache.db'
+    DEFAULT_MAX_BYTES = 2 * 1024 * 1024 * 1024
+
+    # bump to drop all entries, e.g. when graph styling changes outside the dot source
+    VERSION = '1'
+
+    def __init__(self, cache_dir=None, max_bytes=DEFAULT_MAX_BYTES, timeout=60):
+        if cache_dir is None:
+            cache_dir = self.get_default_cache_dir()
+
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.timeout = timeout
+        self.db_filepath = os.path.join(cache_dir, self.DB_FILENAME)
+
+        self.hits = 0
+        self.misses = 0
+
+        self._conn = None
+
+    @staticmethod
+    def get_default_cache_dir():
+        return os.path.join(tempfile.gettempdir(), 'graph_render_cache')
+
+    @staticmethod
+    def canonicalize_dot(dot_source):
+        ''' Drop differences that don't change the layout: line endings, indentation, blank lines
+        '''
+        lines = (line.strip() for line in dot_source.splitlines())
+
+        return '\n'.join(line for line in lines if line)
+
+    def make_key(self, dot_source, engine):
+        h = hashlib.sha1()
+        h.update(self.VERSION.encode())
+        h.update(engine.encode())
+        h.update(b'\0')
+        h.update(self.canonicalize_dot(dot_source).encode('utf-8', 'ignore'))
+
+        return h.hexdigest()
+
+    def get_filepath(self, key, format):
+        return os.path.join(self.cache_dir, key[:2], '{}.{}'.format(key, format))
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_conn'] = None
+        return state
+
+    def get_conn(self):
+        if self._conn is None:
+            os.makedirs(self.cache_dir, exist_ok=True)
+
+            self._conn = sqlite3.connect(self.db_filepath, timeout=self.timeout, isolation_level=None)
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute('CREATE TABLE IF NOT EXISTS entries ('
+                               'key TEXT NOT NULL, '
+                               'format TEXT NOT NULL, '
+                               'size INTEGER NOT NULL, '
+                               'last_access REAL NOT NULL, '
+                               'PRIMARY KEY (key, format))')
+
+        return self._conn
+
+    @staticmethod
+    def link_or_copy(src, dest):
+        # already linked, renaming a hardlink over itself would leave the tmp file behind
+        if os.path.exists(dest) and os.path.samefile(src, dest):
+            return
+
+        # dest may be a hardlink of a cache file, replace it instead of writing through it
+        tmp_dest = '{}.tmp{}'.format(dest, os.getpid())
+
+        try:
+            os.link(src, tmp_dest)
+        except OSError:
+            shutil.copyfile(src, tmp_dest)
+
+        os.replace(tmp_dest, dest)
+
+    def get(self, key, format, dest_filepath):
+        ''' Put the cached render at dest_filepath
+
+        :return: True on hit
+        '''
+        try:
+            conn = self.get_conn()
+            row = conn.execute('SELECT size FROM entries WHERE key = ? AND format = ?', (key, format)).fetchone()
+
+            if row is not None:
+                try:
+                    self.link_or_copy(self.get_filepath(key, format), dest_filepath)
+                except OSError as ex:
+                    # evicted by another process in between, or removed by hand
+                    self.logger.warning('render cache file of [{}.{}] is gone: {}'.format(key, format, ex))
+                    conn.execute('DELETE FROM entries WHERE key = ? AND format = ?', (key, format))
+                    row = None
+
+            if row is None:
+                self.misses += 1
+                return False
+
+            conn.execute('UPDATE entries SET last_access = ' + self.ACCESS_TIME_SQL + ' WHERE key = ? AND format = ?', (time.time(), key, format))
+            self.hits += 1
+
+            return True
+        except sqlite3.Error as ex:
+            self.logger.warning('render cache get failed [{}.{}]: {}'.format(key, format, ex))
+            self.misses += 1
+            return False
+
+    def put(self, key, format, rendered_filepath):
+        size = os.path.getsize(rendered_filepath)
+
+        if size > self.max_bytes:
+            self.logger.info('skip caching [{}], {} bytes exceeds cache size'.format(rendered_filepath, size))
+            return
+
+        try:
+            filepath = self.get_filepath(key, format)
+            os.makedirs(os.path.dirname(filepath), exist_ok=True)
+            self.link_or_copy(rendered_filepath, filepath)
+
+            conn = self.get_conn()
+            conn.execute('BEGIN IMMEDIATE')
+
+            try:
+                conn.execute('INSERT OR REPLACE INTO entries (key, format, size, last_access) VALUES (?, ?, ?, ' + self.ACCESS_TIME_SQL + ')',
+                             (key, format, size, time.time()))
+                evicted = self.evict(conn)
+                conn.execute('COMMIT')
+            except Exception:
+                conn.execute('ROLLBACK')
+                raise
+
+            # files are removed once the index no longer points to them
+            for evicted_key, evicted_format in evicted:
+                self.remove_file(evicted_key, evicted_format)
+        except (OSError, sqlite3.Error) as ex:
+            self.logger.warning('render cache put failed [{}.{}]: {}'.format(key, format, ex))
+
+    def evict(self, conn):
+        ''' :return: list of evicted (key, format)
+        '''
+        evicted = []
+        total = conn.execute('SELECT COALESCE(SUM(size), 0) FROM entries').fetchone()[0]
+
+        if total <= self.max_bytes:
+            return evicted
+
+        for key, format, size in conn.execute('SELECT key, format, size FROM entries ORDER BY last_access').fetchall():
+            conn.execute('DELETE FROM entries WHERE key = ? AND format = ?', (key, format))
+            total -= size
+            evicted.append((key, format))
+
+            self.logger.debug('evict render cache entry [{}.{}]'.format(key, format))
+
+            if total <= self.max_bytes:
+                break
+
+        return evicted
+
+    def remove_file(self, key, format):
+        try:
+            os.remove(self.get_filepath(key, format))
+        except OSError:
+            pass
+
+    def get_total_bytes(self):
+        return self.get_conn().execute('SELECT COALESCE(SUM(size), 0) FROM entries').fetchone()[0]
+
+    def clear(self):
+        for key, format in self.get_conn().execute('SELECT key, format FROM entries').fetchall():
+            self.remove_file(key, format)
+
+        self.get_conn().execute('DELETE FROM entries')
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
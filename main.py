@@ -4,10 +4,14 @@ import logging
 import traceback
 import json
 import sys
-import multiprocessing as mp
-from myparser.script_parser import ScriptParser
+import time
+# parser grammars, graphviz, the render pool and multiprocessing are imported by the commands that use them,
+# so workflow-only commands start fast
 from myparser.workflow_parser import WorkflowParser
+from graph.graph_utility import GraphUtility
 from util.file_utility import FileUtility
+from util.build_manifest import BuildManifest
+from util.ndjson_journal import NdjsonJournal
 from datetime import datetime
 from util.datetime_utility import DatetimeUtility
 
@@ -17,6 +21,92 @@ __log_level = logging.DEBUG
 def cli():
     pass
 
+def resolve_script_params(workflow_parser, workflow_obj, target_filename, external_params, master_key=None, target_date_str=None):
+    ''' Params the script is parsed with: workflow params of its closest process, then external_params
+    '''
+    process_name = workflow_parser.get_closest_process_name(target_filename, workflow_obj)
+    print('target_filename = [{}], closest process_name = [{}]'.format(target_filename, process_name))
+    param_map = workflow_parser.get_params(workflow_obj, process_name, master_key=master_key)
+
+    if target_date_str:
+        datetime_obj = datetime.strptime(target_date_str, '%Y-%m-%d')
+
+        for key in param_map:
+            # replace {yyyy-MM-dd}
+            param_map[key] = DatetimeUtility.replace_ymd(param_map[key], datetime_obj)
+
+    param_map.update(external_params)
+
+    return param_map
+
+
+def get_render_cache(use_cache=True, cache_dir=None):
+    ''' Render cache next to the parse cache, None if caching is off
+    '''
+    if not use_cache:
+        return None
+
+    from graph.render_cache import RenderCache
+
+    render_cache_dir = os.path.join(cache_dir, 'render') if cache_dir else RenderCache.get_default_cache_dir()
+    print('render cache folder [{}]'.format(render_cache_dir))
+
+    return RenderCache(render_cache_dir)
+
+
+def get_workflow_snapshot_filepath(workflow_folder, cache_dir, exclude_keys=[]):
+    ''' WorkflowObj snapshot of workflow_folder in the parse cache folder, one per exclude_keys
+    '''
+    import hashlib
+
+    folder_key = os.path.abspath(workflow_folder)
+
+    if exclude_keys:
+        folder_key += '\n' + '\n'.join(sorted(exclude_keys))
+
+    folder_hash = hashlib.sha1(folder_key.encode('utf-8')).hexdigest()
+
+    return os.path.join(cache_dir, 'workflow', '{}_{}.pickle'.format(os.path.basename(os.path.normpath(workflow_folder)), folder_hash))
+
+
+def load_workflow_obj(workflow_parser, workflow_folder, cache_dir, exclude_keys=[], config_process_no=1):
+    ''' Parse workflow_folder, only its changed configs if there is a snapshot in cache_dir
+
+    :param cache_dir: parse cache folder, None to parse all configs
+    '''
+    if cache_dir is None:
+        return workflow_parser.parse_folder(workflow_folder, exclude_keys=list(exclude_keys), process_no=config_process_no)
+
+    return workflow_parser.load_folder(workflow_folder,
+                                       get_workflow_snapshot_filepath(workflow_folder, cache_dir, exclude_keys=exclude_keys),
+                                       exclude_keys=list(exclude_keys),
+                                       process_no=config_process_no)
+
+
+def print_render_summary(renderer):
+    print('rendered {} graphs, {} failed'.format(renderer.rendered, renderer.failed))
+
+    if renderer.cache is not None:
+        print('render cache {} hits, {} misses, {:.1f} MB'.format(renderer.cache.hits,
+                                                                  renderer.cache.misses,
+                                                                  renderer.cache.get_total_bytes() / 1024 / 1024))
+
+
+def get_script_fullpath_map(proj_folder):
+    ''' :return: script filename -> full path of the scripts under proj_folder
+    '''
+    script_fullpath_map = {}
+    for f in FileUtility.list_files_recursive(proj_folder, target_suffix='.script'):
+        script_fullpath_map[os.path.basename(f)] = f
+
+    return script_fullpath_map
+
+
+def get_script_dest_filepath(output_folder, target_filename):
+    # graphs of the script are written to this path with suffixes like .dot, .dot.pdf
+    return os.path.join(output_folder, target_filename)
+
+
 def parse_script_single(target_filename,
                         workflow_parser,
                         workflow_obj,
@@ -26,7 +116,19 @@ def parse_script_single(target_filename,
                         output_folder,
                         external_params,
                         master_key=None,
-                        target_date_str=None):
+                        target_date_str=None,
+                        lineage_only=False,
+                        simplify=False,
+                        cache_dir=None,
+                        output_formats=None,
+                        render=True):
+    '''
+    :return: (result, output_files), result is None for success or error message, output_files are
+             the written files, with render False the dot files left for GraphRenderer among them
+    '''
+    from myparser.script_parser import ScriptParser
+    from myparser.parse_cache import ParseCache
+
     # each process needs to set log level
     logging.basicConfig(level=__log_level)
 
@@ -36,57 +138,97 @@ def parse_script_single(target_filename,
     target_filename = os.path.basename(target_filename)  # make sure it's basename
 
     try:
-        process_name = wfp.get_closest_process_name(target_filename, obj)
-        print('target_filename = [{}], closest process_name = [{}]'.format(target_filename, process_name))
-        param_map = wfp.get_params(obj, process_name, master_key=master_key)
+        param_map = resolve_script_params(wfp, obj, target_filename, external_params, master_key, target_date_str)
+
+        parse_cache = None
+        if cache_dir:
+            parse_cache = ParseCache(cache_dir)
 
         sp = ScriptParser(b_add_sstream_link=add_sstream_link,
-                          b_add_sstream_size=add_sstream_size)
+                          b_add_sstream_size=add_sstream_size,
+                          lineage_only=lineage_only,
+                          parse_cache=parse_cache,
+                          simplify=simplify)
 
-        dest_filepath = os.path.join(output_folder, target_filename)
+        dest_filepath = get_script_dest_filepath(output_folder, target_filename)
         script_fullpath = script_fullpath_map[target_filename]
 
-        if target_date_str:
-            datetime_obj = datetime.strptime(target_date_str, '%Y-%m-%d')
-
-            for key in param_map:
-                # replace {yyyy-MM-dd}
-                param_map[key] = DatetimeUtility.replace_ymd(param_map[key], datetime_obj)
-
-        param_map.update(external_params)
-
         # dest_filepath will be appended suffix like .dot.pdf
         print('parse_file [{}]'.format(script_fullpath))
-        sp.parse_file(script_fullpath, external_params=param_map, dest_filepath=dest_filepath)
+        output_files = sp.parse_file(script_fullpath,
+                                     external_params=param_map,
+                                     dest_filepath=dest_filepath,
+                                     output_formats=output_formats,
+                                     render=render)
+
+        if sp.graph_simplifier is not None:
+            node_ratio, edge_ratio = sp.graph_simplifier.get_reduction_ratios()
+            print('simplified [{}]: {:.1%} fewer nodes, {:.1%} fewer edges'.format(target_filename, node_ratio, edge_ratio))
     except Exception as ex:
         print('[WARNING] Failed parse file [{}]: {}'.format(target_filename, ex))
         print(traceback.format_exc())
 
-        return '{}: {}'.format(target_filename, ex)
+        return '{}: {}'.format(target_filename, ex), []
 
+    return None, output_files
 
 
-def parse_script(proj_folder,
-                 workflow_folder,
-                 output_folder,
-                 target_script_folder=None,
-                 target_filenames=[],
-                 add_sstream_link=False,
-                 add_sstream_size=False,
-                 exclude_keys=[],
-                 external_params={},
-                 master_key=None,
-                 target_date_str=None):
 
+# set once per pool worker by init_parse_script_worker
+_worker_shared_state = {}
+
+
+def init_parse_script_worker(shared_state):
+    global _worker_shared_state
+    _worker_shared_state = shared_state
+
+
+def parse_script_worker(target_filename):
+    return parse_script_single(target_filename, **_worker_shared_state)
+
+
+def prepare_parse_script(proj_folder,
+                         workflow_folder,
+                         output_folder,
+                         target_script_folder=None,
+                         target_filenames=[],
+                         add_sstream_link=False,
+                         add_sstream_size=False,
+                         external_params={},
+                         master_key=None,
+                         target_date_str=None,
+                         lineage_only=False,
+                         simplify=False,
+                         use_cache=True,
+                         cache_dir=None,
+                         output_formats=None,
+                         render=True,
+                         config_process_no=1):
+    ''' Parse the workflow folder and collect the scripts to parse
+
+    :param config_process_no: number of processes parsing the workflow configs, None for cpu count
+
+    :return: (shared_state, target_filenames), shared_state holds the arguments of parse_script_single
+             other than target_filename; (None, []) if there is nothing to parse
+    '''
     print('proj_folder [{}]'.format(proj_folder))
     print('workflow_folder [{}]'.format(workflow_folder))
 
+    from myparser.parse_cache import ParseCache
+
+    if not use_cache:
+        cache_dir = None
+    elif cache_dir is None:
+        cache_dir = ParseCache.get_default_cache_dir()
+
+    print('parse cache folder [{}]'.format(cache_dir))
+
     wfp = WorkflowParser()
-    obj = wfp.parse_folder(workflow_folder)
+    obj = load_workflow_obj(wfp, workflow_folder, cache_dir, config_process_no=config_process_no)
 
-    script_fullpath_map = {}
-    for f in FileUtility.list_files_recursive(proj_folder, target_suffix='.script'):
-        script_fullpath_map[os.path.basename(f)] = f
+    script_fullpath_map = get_script_fullpath_map(proj_folder)
+
+    target_filenames = list(target_filenames)
 
     if len(target_filenames) == 0:
         print('no specified target_filenames, check target_script_folder [{}]'.format(target_script_folder))
@@ -106,38 +248,158 @@ def parse_script(proj_folder,
 
     if len(target_filenames) == 0:
         print('no target files, abort.')
-        return
+        return None, []
 
     if not os.path.isdir(output_folder):
         print('create folder [{}]'.format(output_folder))
         os.makedirs(output_folder)
 
-    arguments_list = []
-    for target_filename in target_filenames:
-        arguments = (target_filename,
-                     wfp,
-                     obj,
-                     script_fullpath_map,
-                     add_sstream_link,
-                     add_sstream_size,
-                     output_folder,
-                     external_params,
-                     master_key,
-                     target_date_str
-                     )
-
-        arguments_list.append(arguments)
-
-    process_no = min(len(target_filenames), 10)
-
-    if process_no == 1:
-        exe_results = [parse_script_single(*arguments_list[0]),]
+    # state shared by all scripts, handed to each worker once instead of pickled per task
+    shared_state = {'workflow_parser': wfp,
+                    'workflow_obj': obj,
+                    'script_fullpath_map': script_fullpath_map,
+                    'add_sstream_link': add_sstream_link,
+                    'add_sstream_size': add_sstream_size,
+                    'output_folder': output_folder,
+                    'external_params': external_params,
+                    'master_key': master_key,
+                    'target_date_str': target_date_str,
+                    'lineage_only': lineage_only,
+                    'simplify': simplify,
+                    'cache_dir': cache_dir,
+                    'output_formats': output_formats,
+                    'render': render}
+
+    return shared_state, target_filenames
+
+
+def parse_script(proj_folder,
+                 workflow_folder,
+                 output_folder,
+                 target_script_folder=None,
+                 target_filenames=[],
+                 add_sstream_link=False,
+                 add_sstream_size=False,
+                 exclude_keys=[],
+                 external_params={},
+                 master_key=None,
+                 target_date_str=None,
+                 lineage_only=False,
+                 simplify=False,
+                 use_cache=True,
+                 cache_dir=None,
+                 process_no=None,
+                 chunksize=1,
+                 maxtasksperchild=None,
+                 timeout=None,
+                 output_formats=None,
+                 render_concurrency=None,
+                 render_timeout=None,
+                 config_process_no=1):
+    ''' Parse scripts in worker processes, render their dot files with graphviz in a separate stage
+
+    :param simplify: collapse chains of intermediate nodes, see GraphSimplifier
+    :param output_formats: formats of the script graphs, e.g. ['dot', 'pdf'], default ScriptParser.DEFAULT_OUTPUT_FORMATS
+    :param process_no: number of worker processes, default min(number of scripts, cpu count)
+    :param chunksize: number of scripts handed to a worker at a time
+    :param maxtasksperchild: restart a worker after this many chunks, default never
+    :param timeout: seconds a single script may take, the worker of a longer parse is killed
+    :param render_concurrency: number of graphviz processes at a time, default cpu count
+    :param render_timeout: seconds a single graphviz call may take
+    :param config_process_no: number of processes parsing the workflow configs, None for cpu count
+    :return: list of results, None for success or error message, in completion order
+    '''
+    from myparser.script_parser import ScriptParser
+    from graph.graph_renderer import GraphRenderer
+    from util.pool_utility import PoolUtility
+
+    if output_formats is None:
+        output_formats = ScriptParser.DEFAULT_OUTPUT_FORMATS
+
+    GraphUtility.check_output_formats(output_formats)
+    _, render_formats = GraphUtility.get_parse_stage_formats(output_formats)
+
+    shared_state, target_filenames = prepare_parse_script(proj_folder,
+                                                          workflow_folder,
+                                                          output_folder,
+                                                          target_script_folder=target_script_folder,
+                                                          target_filenames=target_filenames,
+                                                          add_sstream_link=add_sstream_link,
+                                                          add_sstream_size=add_sstream_size,
+                                                          external_params=external_params,
+                                                          master_key=master_key,
+                                                          target_date_str=target_date_str,
+                                                          lineage_only=lineage_only,
+                                                          simplify=simplify,
+                                                          use_cache=use_cache,
+                                                          cache_dir=cache_dir,
+                                                          output_formats=output_formats,
+                                                          render=False,
+                                                          config_process_no=config_process_no)
+
+    if shared_state is None:
+        return
+
+    if not process_no:
+        process_no = os.cpu_count() or 1
+
+    process_no = min(len(target_filenames), process_no)
+
+    if process_no == 1 and not timeout:
+        parse_results = ((f, parse_script_single(f, **shared_state), False) for f in target_filenames)
     else:
-        pool = mp.Pool(processes=process_no)
-        exe_results = pool.starmap(parse_script_single, arguments_list)
+        pool = PoolUtility(processes=process_no,
+                           initializer=init_parse_script_worker,
+                           initargs=(shared_state,),
+                           chunksize=chunksize,
+                           maxtasksperchild=maxtasksperchild,
+                           timeout=timeout)
+
+        parse_results = pool.imap_unordered(parse_script_worker, target_filenames)
+
+    renderer = GraphRenderer(concurrency=render_concurrency,
+                             timeout=render_timeout,
+                             cache=get_render_cache(use_cache, cache_dir))
+    exe_results = []
+
+    for target_filename, exe_result, timed_out in parse_results:
+        if timed_out:
+            result, dot_filepaths = '{}: timeout after {}s'.format(target_filename, timeout), []
+        else:
+            result, output_files = exe_result
+            dot_filepaths = [f for f in output_files if f.endswith('.dot')]
+
+        # rendered while the next scripts are parsed
+        if not result and render_formats and dot_filepaths:
+            renderer.submit(dot_filepaths,
+                            render_formats,
+                            keep_dot='dot' in output_formats,
+                            key=target_filename)
+        else:
+            add_parse_script_result(exe_results, len(target_filenames), target_filename, result)
+
+        for rendered_filename, error in renderer.get_finished():
+            add_parse_script_result(exe_results, len(target_filenames), rendered_filename,
+                                    '{}: {}'.format(rendered_filename, error) if error else None)
+
+    for rendered_filename, error in renderer.join():
+        add_parse_script_result(exe_results, len(target_filenames), rendered_filename,
+                                '{}: {}'.format(rendered_filename, error) if error else None)
+
+    if render_formats:
+        print_render_summary(renderer)
 
     return exe_results
 
+
+def add_parse_script_result(exe_results, total, target_filename, result):
+    exe_results.append(result)
+
+    print('[{}/{}] finished [{}]'.format(len(exe_results), total, target_filename))
+
+    if result:
+        print('[WARNING] {}'.format(result))
+
 @cli.command()
 @click.argument('proj_folder')
 @click.argument('workflow_folder')
@@ -145,22 +407,60 @@ def parse_script(proj_folder,
 @click.option('--target_filenames', multiple=True, default=[])
 @click.option('--add_sstream_link', type=bool, default=True, help='resolve and add sstream link')
 @click.option('--exclude_keys', multiple=True, default=[])
+@click.option('--no-cache', 'no_cache', is_flag=True, default=False, help='always re-parse and re-render, do not use parse and render cache')
+@click.option('--cache-dir', 'cache_dir', default=None, help='parse cache folder, render cache in its render sub folder, default under system temp folder')
+@click.option('--process_no', type=int, default=None, help='number of worker processes, default cpu count')
+@click.option('--chunksize', type=int, default=1, help='number of scripts handed to a worker at a time')
+@click.option('--maxtasksperchild', type=int, default=None, help='restart a worker after this many chunks')
+@click.option('--timeout', type=float, default=None, help='seconds a single script may take before it is killed')
+@click.option('--output_formats', multiple=True, default=[], help='e.g. dot, gexf, pdf, svg, default gexf, dot and pdf')
+@click.option('--render_concurrency', type=int, default=None, help='number of graphviz processes at a time, default cpu count')
+@click.option('--render_timeout', type=float, default=None, help='seconds a single graphviz call may take before it is killed')
+@click.option('--simplify', is_flag=True, default=False, help='collapse chains of intermediate nodes to speed up layout')
+@click.option('--config_process_no', type=int, default=1, help='number of processes parsing workflow configs, 0 for cpu count')
 def script_to_graph(proj_folder,
                  workflow_folder,
                  output_folder,
                  target_filenames,
                  add_sstream_link,
-                 exclude_keys):
-
-    return parse_script(proj_folder, output_folder, target_filenames, add_sstream_link, exclude_keys)
+                 exclude_keys,
+                 no_cache,
+                 cache_dir,
+                 process_no,
+                 chunksize,
+                 maxtasksperchild,
+                 timeout,
+                 output_formats,
+                 render_concurrency,
+                 render_timeout,
+                 simplify,
+                 config_process_no):
+
+    return parse_script(proj_folder,
+                        workflow_folder,
+                        output_folder,
+                        target_filenames=list(target_filenames),
+                        add_sstream_link=add_sstream_link,
+                        exclude_keys=list(exclude_keys),
+                        use_cache=not no_cache,
+                        cache_dir=cache_dir,
+                        process_no=process_no,
+                        chunksize=chunksize,
+                        maxtasksperchild=maxtasksperchild,
+                        timeout=timeout,
+                        output_formats=list(output_formats) or None,
+                        render_concurrency=render_concurrency,
+                        render_timeout=render_timeout,
+                        simplify=simplify,
+                        config_process_no=config_process_no or None)
 
 
 @click.argument('workflow_folder', type=click.Path(exists=True))
 @click.argument('target_filename')
 @click.option('--exclude_keys', multiple=True, default=[])
-def print_wf_params(workflow_folder, target_filename, exclude_keys=[], master_key=None):
+def print_wf_params(workflow_folder, target_filename, exclude_keys=[], master_key=None, config_process_no=1):
     wfp = WorkflowParser()
-    obj = wfp.parse_folder(workflow_folder)
+    obj = wfp.parse_folder(workflow_folder, process_no=config_process_no)
 
     process_name = wfp.get_closest_process_name(target_filename, obj)
     print(json.dumps(wfp.get_params(obj, process_name, master_key=master_key), indent=4))
@@ -172,22 +472,30 @@ def print_wf_params(workflow_folder, target_filename, exclude_keys=[], master_ke
 @click.option('--target_node_names', multiple=True, default=[])
 @click.option('--exclude_keys', multiple=True, default=[])
 @click.option('--filter_type', default=None)
+@click.option('--output_formats', multiple=True, default=[])
 def to_workflow_dep_graph(proj_folder,
                           output_folder,
                           target_folder_name=None,
                           target_node_names=[],
                           exclude_keys=[],
-                          filter_type=None):
+                          filter_type=None,
+                          output_formats=None,
+                          render=True,
+                          workflow_obj=None,
+                          config_process_no=1):
+    '''
+    :param workflow_obj: WorkflowObj of proj_folder if already parsed
+    :param config_process_no: number of processes parsing the workflow configs, None for cpu count
+    :return: list of written files
+    '''
     wfp = WorkflowParser()
-    obj = wfp.parse_folder(proj_folder)
+    obj = workflow_obj or wfp.parse_folder(proj_folder, process_no=config_process_no)
 
-    proj_name = os.path.basename(proj_folder)
-    dest_filepath = '{}/event_dep_[{}]_target_folders[{}]_nodes[{}]_filter_{}'\
-                            .format(output_folder,
-                                    proj_name,
-                                    target_folder_name,
-                                    '-'.join(target_node_names),
-                                    filter_type)
+    dest_filepath = get_workflow_dep_graph_filepath(proj_folder,
+                                                    output_folder,
+                                                    target_folder_name=target_folder_name,
+                                                    target_node_names=target_node_names,
+                                                    filter_type=filter_type)
 
     # only support either target_folder_name or target_node_names
     if target_folder_name and len(target_node_names) == 0:
@@ -198,10 +506,175 @@ def to_workflow_dep_graph(proj_folder,
             target_node_names.append(os.path.basename(f))
 
     FileUtility.mkdir_p(output_folder)
-    wfp.to_workflow_dep_graph(obj,
-                              dest_filepath=dest_filepath,
-                              target_node_names=target_node_names,
-                              filter_type=filter_type)
+    return wfp.to_workflow_dep_graph(obj,
+                                     dest_filepath=dest_filepath,
+                                     target_node_names=target_node_names,
+                                     filter_type=filter_type,
+                                     output_formats=output_formats,
+                                     render=render)
+
+
+def get_workflow_dep_graph_filepath(proj_folder, output_folder, target_folder_name=None, target_node_names=[], filter_type=None):
+    # the dependency graph is written to this path with suffixes like .dot, .dot.pdf
+    return '{}/event_dep_[{}]_target_folders[{}]_nodes[{}]_filter_{}'.format(output_folder,
+                                                                          os.path.basename(proj_folder),
+                                                                          target_folder_name,
+                                                                          '-'.join(target_node_names),
+                                                                          filter_type)
+
+
+def get_reachable_graph_filepath(proj_folder, output_folder, node_names, up=True, down=True):
+    # the sub graph of upstream and downstream is written to this path with suffixes like .dot, .dot.pdf
+    return '{}/reachable_[{}]_{}_nodes[{}]'.format(output_folder,
+                                                os.path.basename(os.path.normpath(proj_folder)),
+                                                'up' if not down else 'down' if not up else 'both',
+                                                '-'.join(node_names))
+
+
+def get_parse_cache_dir(use_cache=True, cache_dir=None):
+    ''' :return: parse cache folder, None if caching is off
+    '''
+    if not use_cache:
+        return None
+
+    from myparser.parse_cache import ParseCache
+
+    return cache_dir or ParseCache.get_default_cache_dir()
+
+
+def query_reachable_nodes(workflow_parser, workflow_obj, node_names, up=True, down=True, filter_type=None):
+    ''' :return: (names of the nodes up or down of node_names, node_names and nodes of other types than filter_type excluded, seconds of the query)
+    '''
+    dep_nodes, index = workflow_parser.get_reachability_index(workflow_obj)
+
+    start = time.time()
+    target_ids = workflow_parser.get_dep_node_ids(workflow_obj, node_names)
+
+    reached = set(index.upstream(target_ids)) if up else set()
+
+    if down:
+        reached.update(index.downstream(target_ids))
+
+    reached.difference_update(target_ids)
+    seconds = time.time() - start
+
+    return sorted(dep_nodes[i].name for i in reached if filter_type is None or dep_nodes[i].attr['type'] == filter_type), seconds
+
+
+def print_reachable_nodes(proj_folder,
+                          node_names,
+                          up=True,
+                          down=True,
+                          filter_type=None,
+                          exclude_keys=[],
+                          output_folder=None,
+                          output_formats=None,
+                          use_cache=True,
+                          cache_dir=None,
+                          config_process_no=1):
+    ''' Print the nodes up or down of node_names and write their sub graph to output_folder
+
+    :return: list of written files
+    '''
+    wfp = WorkflowParser()
+    obj = load_workflow_obj(wfp, proj_folder, get_parse_cache_dir(use_cache, cache_dir), exclude_keys=exclude_keys, config_process_no=config_process_no)
+
+    start = time.time()
+    _, index = wfp.get_reachability_index(obj)
+    print('reachability index of {} nodes, {} components built in {:.3f}s'.format(index.graph.node_count, index.comp_count, time.time() - start))
+
+    names, seconds = query_reachable_nodes(wfp, obj, node_names, up=up, down=down, filter_type=filter_type)
+
+    for name in names:
+        print(name)
+
+    print('{} nodes {} of [{}] in {:.1f}us'.format(len(names), 'up' if not down else 'down' if not up else 'up and down', ', '.join(node_names), seconds * 1000000))
+
+    if not output_folder:
+        return []
+
+    nodes, edges = wfp.get_reachable_objects(obj, node_names, up=up, down=down)
+    dest_filepath = get_reachable_graph_filepath(proj_folder, output_folder, node_names, up=up, down=down)
+
+    FileUtility.mkdir_p(output_folder)
+    return wfp.write_dep_graph(nodes, edges, dest_filepath, output_formats or WorkflowParser.DEFAULT_OUTPUT_FORMATS)
+
+
+@cli.command()
+@click.argument('proj_folder', type=click.Path(exists=True))
+@click.argument('node_names', nargs=-1, required=True)
+@click.option('--filter_type', default=None, help='only print nodes of this type, SCRIPT or EVENT')
+@click.option('--exclude_keys', multiple=True, default=[])
+@click.option('--output_folder', default=None, help='write the sub graph of the nodes to this folder')
+@click.option('--output_formats', multiple=True, default=[], help='e.g. dot, gexf, pdf, svg, default gexf, dot and pdf')
+@click.option('--no-cache', 'no_cache', is_flag=True, default=False, help='always parse all workflow configs, do not use the workflow snapshot')
+@click.option('--cache-dir', 'cache_dir', default=None, help='parse cache folder holding the workflow snapshot, default under system temp folder')
+@click.option('--config_process_no', type=int, default=1, help='number of processes parsing workflow configs, 0 for cpu count')
+def upstream(proj_folder, node_names, filter_type, exclude_keys, output_folder, output_formats, no_cache, cache_dir, config_process_no):
+    ''' Print the scripts and events NODE_NAMES depend on, NODE_NAMES are script, event or process names
+    '''
+    return print_reachable_nodes(proj_folder,
+                                 list(node_names),
+                                 up=True,
+                                 down=False,
+                                 filter_type=filter_type,
+                                 exclude_keys=list(exclude_keys),
+                                 output_folder=output_folder,
+                                 output_formats=list(output_formats) or None,
+                                 use_cache=not no_cache,
+                                 cache_dir=cache_dir,
+                                 config_process_no=config_process_no or None)
+
+
+@cli.command()
+@click.argument('proj_folder', type=click.Path(exists=True))
+@click.argument('node_names', nargs=-1, required=True)
+@click.option('--filter_type', default=None, help='only print nodes of this type, SCRIPT or EVENT')
+@click.option('--exclude_keys', multiple=True, default=[])
+@click.option('--output_folder', default=None, help='write the sub graph of the nodes to this folder')
+@click.option('--output_formats', multiple=True, default=[], help='e.g. dot, gexf, pdf, svg, default gexf, dot and pdf')
+@click.option('--no-cache', 'no_cache', is_flag=True, default=False, help='always parse all workflow configs, do not use the workflow snapshot')
+@click.option('--cache-dir', 'cache_dir', default=None, help='parse cache folder holding the workflow snapshot, default under system temp folder')
+@click.option('--config_process_no', type=int, default=1, help='number of processes parsing workflow configs, 0 for cpu count')
+def downstream(proj_folder, node_names, filter_type, exclude_keys, output_folder, output_formats, no_cache, cache_dir, config_process_no):
+    ''' Print the scripts and events depending on NODE_NAMES, NODE_NAMES are script, event or process names
+    '''
+    return print_reachable_nodes(proj_folder,
+                                 list(node_names),
+                                 up=False,
+                                 down=True,
+                                 filter_type=filter_type,
+                                 exclude_keys=list(exclude_keys),
+                                 output_folder=output_folder,
+                                 output_formats=list(output_formats) or None,
+                                 use_cache=not no_cache,
+                                 cache_dir=cache_dir,
+                                 config_process_no=config_process_no or None)
+
+
+@cli.command('path-exists')
+@click.argument('proj_folder', type=click.Path(exists=True))
+@click.argument('from_node_name')
+@click.argument('to_node_name')
+@click.option('--exclude_keys', multiple=True, default=[])
+@click.option('--no-cache', 'no_cache', is_flag=True, default=False, help='always parse all workflow configs, do not use the workflow snapshot')
+@click.option('--cache-dir', 'cache_dir', default=None, help='parse cache folder holding the workflow snapshot, default under system temp folder')
+@click.option('--config_process_no', type=int, default=1, help='number of processes parsing workflow configs, 0 for cpu count')
+def path_exists(proj_folder, from_node_name, to_node_name, exclude_keys, no_cache, cache_dir, config_process_no):
+    ''' Print whether TO_NODE_NAME depends on FROM_NODE_NAME through any chain of scripts and events
+    '''
+    wfp = WorkflowParser()
+    obj = load_workflow_obj(wfp, proj_folder, get_parse_cache_dir(not no_cache, cache_dir), exclude_keys=list(exclude_keys), config_process_no=config_process_no or None)
+
+    wfp.get_reachability_index(obj)
+
+    start = time.time()
+    result = wfp.path_exists(obj, from_node_name, to_node_name)
+    seconds = time.time() - start
+
+    print('path [{}] -> [{}]: {} ({:.1f}us)'.format(from_node_name, to_node_name, 'unknown node' if result is None else result, seconds * 1000000))
+
+    return result
 
 
 def generate_workflow_dep_graph(dwc_wf_folder,
@@ -225,15 +698,319 @@ def generate_workflow_dep_graph(dwc_wf_folder,
             print("Exception: {}".format(ex))
 
 
+TASK_DEP_GRAPH = 'dep_graph'
+TASK_SCRIPT = 'script'
+
+CHECKPOINT_FILENAME = 'checkpoint.ndjson'
+
+# output formats of all_in_one if not specified
+ALL_IN_ONE_DEP_GRAPH_FORMATS = ['pdf', 'svg']
+ALL_IN_ONE_SCRIPT_FORMATS = ['pdf']
+
+# set once per pool worker by init_all_in_one_worker, wf_folder -> group state
+_worker_group_states = {}
+
+
+def init_all_in_one_worker(group_states):
+    global _worker_group_states
+    _worker_group_states = group_states
+
+
+def all_in_one_worker(task):
+    ''' Run one task of all_in_one
+
+    :param task: (task_type, wf_folder, target_filename), target_filename is None for TASK_DEP_GRAPH
+    :return: (result, dot_filepaths, start_time, end_time), result is None for success or error message,
+             dot_filepaths are left for the render stage
+    '''
+    task_type, wf_folder, target_filename = task
+    group_state = _worker_group_states[wf_folder]
+
+    start_time = time.time()
+
+    if task_type == TASK_DEP_GRAPH:
+        script_state = group_state['script_state']
+
+        try:
+            # parsed already when the group was prepared
+            output_files = to_workflow_dep_graph(group_state['wf_folder_path'],
+                                                 group_state['out_sub_folder'],
+                                                 output_formats=group_state['dep_graph_formats'],
+                                                 render=False,
+                                                 workflow_obj=script_state['workflow_obj'] if script_state else None)
+            result = None
+        except Exception as ex:
+            print("Exception: {}".format(ex))
+            result, output_files = 'dependency graph: {}'.format(ex), []
+    else:
+        result, output_files = parse_script_single(target_filename, **group_state['script_state'])
+
+    return result, [f for f in output_files if f.endswith('.dot')], start_time, time.time()
+
+
+def get_all_in_one_task_cost(task, group_states):
+    # dependency graphs first, then scripts from the largest, so the longest tasks don't start last
+    task_type, wf_folder, target_filename = task
+
+    if task_type == TASK_DEP_GRAPH:
+        return float('inf')
+
+    script_fullpath = group_states[wf_folder]['script_state']['script_fullpath_map'].get(target_filename)
+
+    if script_fullpath is None or not os.path.isfile(script_fullpath):
+        return 0
+
+    return os.path.getsize(script_fullpath)
+
+
+def has_date_placeholder(value):
+    ''' Whether a {yyyy-MM-dd} placeholder occurs in a string of the config dicts
+    '''
+    if isinstance(value, str):
+        return DatetimeUtility.has_ymd(value)
+
+    if isinstance(value, dict):
+        value = list(value.values())
+
+    if isinstance(value, (list, tuple)):
+        return any(has_date_placeholder(v) for v in value)
+
+    return False
+
+
+def get_all_in_one_group_inputs(group_state):
+    ''' Inputs shared by the tasks of a group, collected without resolving the params of each script
+
+    The params of a script are resolved from the workflow configs (by their content), external
+    params, master key and, only if a config has a {yyyy-MM-dd} placeholder, the target date.
+    '''
+    # content and file names only, a fresh copy or a moved folder gives the same hash
+    config_filepaths = sorted(FileUtility.list_files_recursive(group_state['wf_folder_path'], target_suffix='.config'))
+    group_inputs = {'configs': FileUtility.get_files_sha1(config_filepaths)}
+
+    script_state = group_state['script_state']
+
+    # no scripts, only the dependency graph
+    if script_state is None:
+        return group_inputs
+
+    workflow_obj = script_state['workflow_obj']
+    uses_date = has_date_placeholder([workflow_obj.masters, workflow_obj.workflows])
+
+    group_inputs.update({'external_params': script_state['external_params'],
+                         'master_key': script_state['master_key'],
+                         'target_date': script_state['target_date_str'] if uses_date else None})
+
+    return group_inputs
+
+
+def get_all_in_one_task_inputs_hash(task, group_state, group_inputs):
+    ''' Hash of everything the artifact of the task is generated from, None if it cannot be computed
+
+    Only cheap inputs are hashed, the script content and group_inputs of get_all_in_one_group_inputs,
+    the params are resolved by the worker.
+    '''
+    task_type, wf_folder, target_filename = task
+    tool_version = BuildManifest.get_tool_version()
+
+    if task_type == TASK_DEP_GRAPH:
+        return BuildManifest.make_inputs_hash(task_type, tool_version, group_inputs['configs'], group_state['dep_graph_formats'])
+
+    script_state = group_state['script_state']
+    script_fullpath = script_state['script_fullpath_map'].get(target_filename)
+
+    if script_fullpath is None:
+        return None
+
+    flags = {key: script_state[key] for key in ['add_sstream_link', 'add_sstream_size', 'lineage_only', 'simplify', 'output_formats']}
+
+    return BuildManifest.make_inputs_hash(task_type,
+                                          tool_version,
+                                          group_inputs,
+                                          target_filename,
+                                          FileUtility.get_files_sha1([script_fullpath]),
+                                          flags)
+
+
+def get_all_in_one_artifact(task):
+    # manifest key of the task output
+    task_type, wf_folder, target_filename = task
+
+    return '{}/{}'.format(wf_folder, target_filename or task_type)
+
+
+def get_all_in_one_task_outputs(task, group_state):
+    task_type, wf_folder, target_filename = task
+
+    if task_type == TASK_DEP_GRAPH:
+        folder, prefix = group_state['out_sub_folder'], 'event_dep_['
+        output_formats = group_state['dep_graph_formats']
+    else:
+        folder, prefix = group_state['out_script_folder'], '{}.'.format(target_filename)
+        output_formats = group_state['script_state']['output_formats']
+
+    if not os.path.isdir(folder):
+        return []
+
+    # files of other formats are left from earlier runs
+    suffixes = tuple('.{}'.format(output_format) for output_format in output_formats)
+
+    return [os.path.join(folder, f) for f in os.listdir(folder)
+            if f.startswith(prefix) and f.endswith(suffixes) and os.path.isfile(os.path.join(folder, f))]
+
+
+def finish_all_in_one_group(wf_folder, group_state, stats, task_inputs, manifest, checkpoint):
+    for succeeded_task in stats['succeeded']:
+        manifest.update(get_all_in_one_artifact(succeeded_task),
+                        task_inputs[succeeded_task],
+                        get_all_in_one_task_outputs(succeeded_task, group_state))
+
+    manifest.save()
+    checkpoint.append({'type': 'group', 'group': wf_folder})
+
+
+def get_all_in_one_render_formats(task, group_state):
+    ''' :return: (render_formats, keep_dot) of the task for GraphRenderer
+    '''
+    task_type, wf_folder, target_filename = task
+
+    if task_type == TASK_DEP_GRAPH:
+        output_formats = group_state['dep_graph_formats']
+    else:
+        output_formats = group_state['script_state']['output_formats']
+
+    _, render_formats = GraphUtility.get_parse_stage_formats(output_formats)
+
+    return render_formats, 'dot' in output_formats
+
+
+def get_all_in_one_render_result(task, error):
+    task_type, wf_folder, target_filename = task
+
+    return '{}: {}'.format(target_filename or task_type, error) if error else None
+
+
+def finish_all_in_one_task(task, result, timed_out, group_states, group_stats, task_inputs, manifest, checkpoint, error_fp):
+    ''' Record a parsed and rendered task, finish its group if it was the last one
+
+    :param result: None for success or error message
+    :param timed_out: the task was killed after the timeout, result says so too
+    '''
+    task_type, wf_folder, target_filename = task
+    group_state = group_states[wf_folder]
+    stats = group_stats[wf_folder]
+
+    stats['remaining'] -= 1
+
+    # not None means error
+    if result:
+        stats['errors'] += 1
+        print('error processing file [{}]'.format(result))
+
+        if error_fp:
+            error_fp.write('{}/{}\n'.format(group_state['wf_folder_path'], result))
+            # on disk before a crash, like the checkpoint
+            error_fp.flush()
+            os.fsync(error_fp.fileno())
+
+        # the previous outputs are stale now
+        manifest.remove(get_all_in_one_artifact(task))
+    else:
+        stats['succeeded'].append(task)
+
+    checkpoint.append({'type': 'task',
+                       'artifact': get_all_in_one_artifact(task),
+                       'status': 'error' if result else 'ok',
+                       'error': result or None,
+                       'timed_out': timed_out,
+                       'inputs': task_inputs[task]})
+
+    if stats['remaining'] == 0:
+        finish_all_in_one_group(wf_folder, group_state, stats, task_inputs, manifest, checkpoint)
+
+
+def print_run_summary(group_stats, wall_seconds, process_no):
+    ''' Print per group wall time and core usage of an all_in_one run
+
+    avg cores is busy time / wall time of the group, i.e. how many workers it kept busy on average.
+    '''
+    total_busy_seconds = 0
+
+    print('{:<40} {:>6} {:>7} {:>7} {:>7} {:>10} {:>10} {:>10}'.format('group', 'tasks', 'skipped', 'resumed', 'errors',
+                                                                       'wall (s)', 'busy (s)', 'avg cores'))
+
+    for wf_folder in sorted(group_stats):
+        stats = group_stats[wf_folder]
+        group_wall_seconds = (stats['end'] - stats['start']) if stats['start'] is not None else 0
+        total_busy_seconds += stats['busy']
+
+        print('{:<40} {:>6} {:>7} {:>7} {:>7} {:>10.1f} {:>10.1f} {:>10.2f}'.format(wf_folder,
+                                                                        stats['tasks'],
+                                                                        stats['skipped'],
+                                                                        stats['resumed'],
+                                                                        stats['errors'],
+                                                                        group_wall_seconds,
+                                                                        stats['busy'],
+                                                                        stats['busy'] / group_wall_seconds if group_wall_seconds else 0))
+
+    utilisation = total_busy_seconds / (wall_seconds * process_no) if wall_seconds and process_no else 0
+
+    print('total wall {:.1f}s, busy {:.1f}s, {} workers, core utilisation {:.1%}'.format(wall_seconds,
+                                                                                      total_busy_seconds,
+                                                                                      process_no,
+                                                                                      utilisation))
+
+
 def all_in_one(dwc_wf_folder,
                out_folder,
                target_wf_folders=[],
                target_filenames=[],
-               keep_exts=['.pdf', '.svg'],
+               output_formats=None,
                error_log_filename=None,
                add_sstream_link=False,
                add_sstream_size=False,
-               script_root_folder=None):
+               script_root_folder=None,
+               use_cache=True,
+               cache_dir=None,
+               process_no=None,
+               chunksize=1,
+               maxtasksperchild=None,
+               timeout=None,
+               force=False,
+               resume=False,
+               render_concurrency=None,
+               render_timeout=None,
+               simplify=False,
+               config_process_no=1):
+    ''' Generate dependency graph and script graphs of all workflow groups
+
+    All groups are prepared first, then their dependency graph and script tasks go through
+    one worker pool, so small groups don't leave workers idle. Workers only write dot files,
+    graphviz renders them in a separate GraphRenderer stage (render_concurrency processes,
+    render_timeout seconds each) while the workers go on parsing. Graphs whose inputs (script,
+    resolved params, workflow configs, tool version) are unchanged since the last run, as
+    recorded in out_folder/manifest.json, are skipped unless force is set.
+
+    Every finished task and group is appended to out_folder/checkpoint.ndjson, the record of a
+    failed task holds its error and whether it timed out. With resume, those are skipped, so a
+    crashed or killed run continues where it stopped. Errors are also written to the plain text
+    error_log_filename as soon as a task reports them, appended to it with resume.
+
+    Only output_formats are generated, by default ALL_IN_ONE_DEP_GRAPH_FORMATS for dependency
+    graphs and ALL_IN_ONE_SCRIPT_FORMATS for script graphs. With simplify, chains of intermediate
+    nodes of script graphs are collapsed (GraphSimplifier). The workflow configs of a group are
+    parsed by config_process_no processes before its tasks are queued, None for cpu count.
+
+    :return: summary, wf_folder -> {'tasks', 'skipped', 'resumed', 'errors', 'start', 'end', 'busy'}
+    '''
+    from graph.graph_renderer import GraphRenderer
+    from util.pool_utility import PoolUtility
+
+    run_start_time = time.time()
+
+    if output_formats is not None:
+        GraphUtility.check_output_formats(output_formats)
+
     target_date_str = DatetimeUtility.get_datetime(-6, fmt_str='%Y-%m-%d')
 
     FileUtility.mkdir_p(out_folder)
@@ -242,63 +1019,464 @@ def all_in_one(dwc_wf_folder,
     if error_log_filename:
         filepath = os.path.join(out_folder, error_log_filename)
 
-        if os.path.exists(filepath):
+        if os.path.exists(filepath) and not resume:
             # backup
             print('backup existing error log file {}'.format(filepath))
             os.rename(filepath, '{}.{}'.format(filepath, DatetimeUtility.get_datetime(0, '%Y-%m-%d_%H%M%S')))
 
-        error_fp = open(filepath, 'w+')
+        error_fp = open(filepath, 'a' if resume else 'w+')
+
+    checkpoint = NdjsonJournal(os.path.join(out_folder, CHECKPOINT_FILENAME))
+    finished_groups = set()
+    finished_tasks = {}
+
+    if resume:
+        for record in checkpoint.read():
+            if record.get('type') == 'group':
+                finished_groups.add(record['group'])
+            elif record.get('type') == 'task':
+                finished_tasks[record['artifact']] = record
+
+        print('resume from checkpoint, {} finished groups, {} finished tasks'.format(len(finished_groups), len(finished_tasks)))
+
+    checkpoint.open(append=resume)
+
+    manifest = BuildManifest(out_folder)
+    group_states = {}
+    group_skipped = {}
+    group_resumed = {}
+    group_succeeded = {}
+    task_inputs = {}
+    tasks = []
 
     for wf_folder in os.listdir(dwc_wf_folder):
         if target_wf_folders and wf_folder not in target_wf_folders:
             print('wf_folder [{}] not in target list [{}]'.format(wf_folder, target_wf_folders))
             continue
 
+        if wf_folder in finished_groups:
+            print('skip finished wf_folder [{}]'.format(wf_folder))
+            continue
+
         wf_folder_path = os.path.join(dwc_wf_folder, wf_folder)
         print('wf_folder_path [{}]'.format(wf_folder_path))
 
         out_sub_folder = os.path.join(out_folder, wf_folder)
+        out_script_folder = os.path.join(out_sub_folder, 'script_graph')
+        script_folder = wf_folder_path
 
-#        if os.path.exists(out_sub_folder):
-#            print('skip processed folder [{}]'.format(out_sub_folder))
-#            continue
+        # explicitly specified
+        if script_root_folder:
+            script_folder = script_root_folder
 
         try:
-            to_workflow_dep_graph(wf_folder_path, out_sub_folder)
-
-            out_script_folder = os.path.join(out_sub_folder, 'script_graph')
-            script_folder = wf_folder_path
-
-            # explicitly specified
-            if script_root_folder:
-                script_folder = script_root_folder
-
-            results = parse_script(script_folder,
-                                   wf_folder_path,
-                                   out_script_folder,
-                                   target_filenames=target_filenames[:],
-                                   add_sstream_link=add_sstream_link,
-                                   add_sstream_size=add_sstream_size,
-                                   target_date_str=target_date_str)
-
-            for result in results:
-                # not None means error
-                if result:
-                    print('error processing file [{}]'.format(result))
-
-                    if error_fp:
-                        error_fp.write('{}/{}\n'.format(wf_folder_path, result))
-
-            if keep_exts:
-                FileUtility.delete_files_except_exts(out_sub_folder, keep_exts)
-                FileUtility.delete_files_except_exts(out_script_folder, keep_exts)
+            script_state, group_target_filenames = prepare_parse_script(script_folder,
+                                                                        wf_folder_path,
+                                                                        out_script_folder,
+                                                                        target_filenames=target_filenames,
+                                                                        add_sstream_link=add_sstream_link,
+                                                                        add_sstream_size=add_sstream_size,
+                                                                        target_date_str=target_date_str,
+                                                                        simplify=simplify,
+                                                                        use_cache=use_cache,
+                                                                        cache_dir=cache_dir,
+                                                                        output_formats=output_formats or ALL_IN_ONE_SCRIPT_FORMATS,
+                                                                        render=False,
+                                                                        config_process_no=config_process_no)
         except Exception as ex:
             print("Exception: {}".format(ex))
+            continue
+
+        group_states[wf_folder] = {'wf_folder_path': wf_folder_path,
+                                   'out_sub_folder': out_sub_folder,
+                                   'out_script_folder': out_script_folder,
+                                   'dep_graph_formats': output_formats or ALL_IN_ONE_DEP_GRAPH_FORMATS,
+                                   'script_state': script_state}
+
+        group_inputs = get_all_in_one_group_inputs(group_states[wf_folder])
+        group_skipped[wf_folder] = 0
+        group_resumed[wf_folder] = 0
+        group_succeeded[wf_folder] = []
+
+        group_tasks = [(TASK_DEP_GRAPH, wf_folder, None)]
+        group_tasks.extend((TASK_SCRIPT, wf_folder, f) for f in group_target_filenames)
+
+        for task in group_tasks:
+            inputs_hash = get_all_in_one_task_inputs_hash(task, group_states[wf_folder], group_inputs)
+
+            artifact = get_all_in_one_artifact(task)
+
+            if not force and manifest.is_up_to_date(artifact, inputs_hash):
+                group_skipped[wf_folder] += 1
+                continue
+
+            task_inputs[task] = inputs_hash
+            finished = finished_tasks.get(artifact)
+
+            # finished before the crash with the same inputs
+            if finished and inputs_hash is not None and finished['inputs'] == inputs_hash:
+                group_resumed[wf_folder] += 1
 
+                if finished['status'] == 'ok':
+                    group_succeeded[wf_folder].append(task)
+
+                continue
+
+            tasks.append(task)
+
+    tasks.sort(key=lambda task: get_all_in_one_task_cost(task, group_states), reverse=True)
+
+    group_stats = {wf_folder: {'tasks': 0, 'skipped': group_skipped[wf_folder], 'resumed': group_resumed[wf_folder],
+                               'remaining': 0, 'errors': 0, 'start': None, 'end': None, 'busy': 0.0,
+                               'succeeded': group_succeeded[wf_folder]}
+                   for wf_folder in group_states}
+
+    for _, wf_folder, _ in tasks:
+        group_stats[wf_folder]['tasks'] += 1
+        group_stats[wf_folder]['remaining'] += 1
+
+    # nothing left to run in these groups
+    for wf_folder, stats in group_stats.items():
+        if stats['remaining'] == 0:
+            finish_all_in_one_group(wf_folder, group_states[wf_folder], stats, task_inputs, manifest, checkpoint)
+
+    if not process_no:
+        process_no = os.cpu_count() or 1
+
+    process_no = max(min(len(tasks), process_no), 1)
+
+    print('{} tasks of {} groups, {} workers, {} up to date'.format(len(tasks),
+                                                                     len(group_states),
+                                                                     process_no,
+                                                                     sum(group_skipped.values())))
+
+    pool = PoolUtility(processes=process_no,
+                       initializer=init_all_in_one_worker,
+                       initargs=(group_states,),
+                       chunksize=chunksize,
+                       maxtasksperchild=maxtasksperchild,
+                       timeout=timeout)
+
+    renderer = GraphRenderer(concurrency=render_concurrency,
+                             timeout=render_timeout,
+                             cache=get_render_cache(use_cache, cache_dir))
+
+    exe_results = pool.imap_unordered(all_in_one_worker, tasks) if tasks else []
+
+    for task, exe_result, timed_out in exe_results:
+        task_type, wf_folder, target_filename = task
+        group_state = group_states[wf_folder]
+        stats = group_stats[wf_folder]
+
+        if timed_out:
+            end_time = time.time()
+            start_time = end_time - timeout
+            result = '{}: timeout after {}s'.format(target_filename or task_type, timeout)
+            dot_filepaths = []
+        else:
+            result, dot_filepaths, start_time, end_time = exe_result
+
+        stats['start'] = start_time if stats['start'] is None else min(stats['start'], start_time)
+        stats['end'] = end_time if stats['end'] is None else max(stats['end'], end_time)
+        stats['busy'] += end_time - start_time
+
+        render_formats, keep_dot = get_all_in_one_render_formats(task, group_state)
+
+        # rendered while the workers parse the next scripts, the task is finished after that
+        if not result and render_formats and dot_filepaths:
+            renderer.submit(dot_filepaths, render_formats, keep_dot=keep_dot, key=task)
+        else:
+            finish_all_in_one_task(task, result, timed_out, group_states, group_stats, task_inputs,
+                                   manifest, checkpoint, error_fp)
+
+        for rendered_task, error in renderer.get_finished():
+            finish_all_in_one_task(rendered_task, get_all_in_one_render_result(rendered_task, error), False,
+                                   group_states, group_stats, task_inputs, manifest, checkpoint, error_fp)
+
+    for rendered_task, error in renderer.join():
+        finish_all_in_one_task(rendered_task, get_all_in_one_render_result(rendered_task, error), False,
+                               group_states, group_stats, task_inputs, manifest, checkpoint, error_fp)
+
+    checkpoint.close()
 
     if error_fp:
         error_fp.close()
 
+    for stats in group_stats.values():
+        del stats['remaining']
+        del stats['succeeded']
+
+    print('rebuilt {} artifacts, skipped {} up to date, {} finished before resume'.format(len(tasks),
+                                                                                       sum(group_skipped.values()),
+                                                                                       sum(group_resumed.values())))
+    print_render_summary(renderer)
+    print_run_summary(group_stats, time.time() - run_start_time, process_no)
+
+    return group_stats
+
+
+@cli.command('all_in_one')
+@click.argument('dwc_wf_folder', type=click.Path(exists=True))
+@click.argument('out_folder')
+@click.option('--target_wf_folders', multiple=True, default=[])
+@click.option('--target_filenames', multiple=True, default=[])
+@click.option('--output_formats', multiple=True, default=[], help='e.g. dot, pdf, svg, default pdf and svg of dependency graphs, pdf of scripts')
+@click.option('--error_log_filename', default=None, help='error log in out_folder, e.g. errors.txt')
+@click.option('--add_sstream_link', type=bool, default=False, help='resolve and add sstream link')
+@click.option('--script_root_folder', default=None, help='script folder if scripts are not in the workflow group folder')
+@click.option('--no-cache', 'no_cache', is_flag=True, default=False, help='always re-parse and re-render, do not use parse and render cache')
+@click.option('--cache-dir', 'cache_dir', default=None, help='parse cache folder, render cache in its render sub folder, default under system temp folder')
+@click.option('--process_no', type=int, default=None, help='number of worker processes, default cpu count')
+@click.option('--chunksize', type=int, default=1, help='number of tasks handed to a worker at a time')
+@click.option('--maxtasksperchild', type=int, default=None, help='restart a worker after this many chunks')
+@click.option('--timeout', type=float, default=None, help='seconds a single task may take before it is killed')
+@click.option('--force', is_flag=True, default=False, help='rebuild all graphs, even if inputs are unchanged')
+@click.option('--resume', is_flag=True, default=False, help='skip scripts and groups finished by the previous run')
+@click.option('--render_concurrency', type=int, default=None, help='number of graphviz processes at a time, default cpu count')
+@click.option('--render_timeout', type=float, default=None, help='seconds a single graphviz call may take before it is killed')
+@click.option('--simplify', is_flag=True, default=False, help='collapse chains of intermediate nodes of script graphs to speed up layout')
+@click.option('--config_process_no', type=int, default=1, help='number of processes parsing workflow configs, 0 for cpu count')
+def all_in_one_command(dwc_wf_folder,
+                       out_folder,
+                       target_wf_folders,
+                       target_filenames,
+                       output_formats,
+                       error_log_filename,
+                       add_sstream_link,
+                       script_root_folder,
+                       no_cache,
+                       cache_dir,
+                       process_no,
+                       chunksize,
+                       maxtasksperchild,
+                       timeout,
+                       force,
+                       resume,
+                       render_concurrency,
+                       render_timeout,
+                       simplify,
+                       config_process_no):
+
+    all_in_one(dwc_wf_folder,
+               out_folder,
+               target_wf_folders=list(target_wf_folders),
+               target_filenames=list(target_filenames),
+               output_formats=list(output_formats) or None,
+               error_log_filename=error_log_filename,
+               add_sstream_link=add_sstream_link,
+               script_root_folder=script_root_folder,
+               use_cache=not no_cache,
+               cache_dir=cache_dir,
+               process_no=process_no,
+               chunksize=chunksize,
+               maxtasksperchild=maxtasksperchild,
+               timeout=timeout,
+               force=force,
+               resume=resume,
+               render_concurrency=render_concurrency,
+               render_timeout=render_timeout,
+               simplify=simplify,
+               config_process_no=config_process_no or None)
+
+
+def render_daemon_outputs(output_files, output_formats, use_cache=True, cache_dir=None, render_concurrency=None, render_timeout=None):
+    ''' Render the dot files written for a daemon request
+
+    :return: (written files, error), error is None for success
+    '''
+    from graph.graph_renderer import GraphRenderer
+
+    _, render_formats = GraphUtility.get_parse_stage_formats(output_formats)
+    keep_dot = 'dot' in output_formats
+
+    dot_filepaths = [f for f in output_files if f.endswith('.dot')]
+    files = [f for f in output_files if keep_dot or not f.endswith('.dot')]
+
+    if not render_formats or not dot_filepaths:
+        return files, None
+
+    renderer = GraphRenderer(concurrency=render_concurrency,
+                             timeout=render_timeout,
+                             cache=get_render_cache(use_cache, cache_dir))
+    renderer.submit(dot_filepaths, render_formats, keep_dot=keep_dot)
+    (_, error), = renderer.join()
+
+    for dot_filepath in dot_filepaths:
+        for format in render_formats:
+            filepath = GraphRenderer.get_output_filepath(dot_filepath, format)
+
+            # rendered to the fallback format instead
+            if not os.path.isfile(filepath) and format in GraphRenderer.FALLBACK_FORMATS:
+                filepath = GraphRenderer.get_output_filepath(dot_filepath, GraphRenderer.FALLBACK_FORMATS[format])
+
+            if os.path.isfile(filepath):
+                files.append(filepath)
+
+    return files, error
+
+
+def daemon_parse_script(payload, workflow_cache, use_cache=True, cache_dir=None, render_concurrency=None, render_timeout=None):
+    ''' Daemon handler of POST /parse_script
+
+    payload: {"proj_folder", "target_filename", "output_folder", optional "workflow_folder" (default
+    proj_folder), "params", "master_key", "target_date", "exclude_keys", "output_formats", "simplify",
+    "lineage_only", "add_sstream_link"}
+
+    :return: {'files': written files, 'error': None or message, 'workflow_cache_hit'}
+    '''
+    from myparser.script_parser import ScriptParser
+    from myparser.parse_cache import ParseCache
+
+    proj_folder = payload['proj_folder']
+    target_filename = os.path.basename(payload['target_filename'])
+    output_formats = payload.get('output_formats') or ScriptParser.DEFAULT_OUTPUT_FORMATS
+
+    GraphUtility.check_output_formats(output_formats)
+
+    obj, hit = workflow_cache.get(payload.get('workflow_folder') or proj_folder, payload.get('exclude_keys', []))
+    script_fullpath_map = get_script_fullpath_map(proj_folder)
+
+    if target_filename not in script_fullpath_map:
+        return {'files': [], 'error': 'script [{}] not found in [{}]'.format(target_filename, proj_folder), 'workflow_cache_hit': hit}
+
+    FileUtility.mkdir_p(payload['output_folder'])
+
+    result, output_files = parse_script_single(target_filename,
+                                               workflow_cache.workflow_parser,
+                                               obj,
+                                               script_fullpath_map,
+                                               payload.get('add_sstream_link', False),
+                                               False,
+                                               payload['output_folder'],
+                                               payload.get('params', {}),
+                                               master_key=payload.get('master_key'),
+                                               target_date_str=payload.get('target_date'),
+                                               lineage_only=payload.get('lineage_only', False),
+                                               simplify=payload.get('simplify', False),
+                                               cache_dir=(cache_dir or ParseCache.get_default_cache_dir()) if use_cache else None,
+                                               output_formats=output_formats,
+                                               render=False)
+
+    if result:
+        return {'files': [], 'error': result, 'workflow_cache_hit': hit}
+
+    files, error = render_daemon_outputs(output_files, output_formats, use_cache, cache_dir, render_concurrency, render_timeout)
+
+    return {'files': files, 'error': error, 'workflow_cache_hit': hit}
+
+
+def daemon_dep_graph(payload, workflow_cache, use_cache=True, cache_dir=None, render_concurrency=None, render_timeout=None):
+    ''' Daemon handler of POST /dep_graph
+
+    payload: {"proj_folder", "output_folder", optional "target_node_names", "target_folder_name",
+    "filter_type", "exclude_keys", "output_formats"}
+
+    :return: {'files': written files, 'error': None or message, 'workflow_cache_hit'}
+    '''
+    output_formats = payload.get('output_formats') or WorkflowParser.DEFAULT_OUTPUT_FORMATS
+
+    GraphUtility.check_output_formats(output_formats)
+
+    obj, hit = workflow_cache.get(payload['proj_folder'], payload.get('exclude_keys', []))
+
+    output_files = to_workflow_dep_graph(payload['proj_folder'],
+                                         payload['output_folder'],
+                                         target_folder_name=payload.get('target_folder_name'),
+                                         target_node_names=list(payload.get('target_node_names', [])),
+                                         filter_type=payload.get('filter_type'),
+                                         output_formats=output_formats,
+                                         render=False,
+                                         workflow_obj=obj)
+
+    files, error = render_daemon_outputs(output_files, output_formats, use_cache, cache_dir, render_concurrency, render_timeout)
+
+    return {'files': files, 'error': error, 'workflow_cache_hit': hit}
+
+
+def daemon_reachability(payload, workflow_cache, use_cache=True, cache_dir=None, render_concurrency=None, render_timeout=None):
+    ''' Daemon handler of POST /reachability, the index is built once per parsed workflow folder
+
+    payload: {"proj_folder", "query": "upstream", "downstream" or "path_exists", "node_names",
+    optional "filter_type", "exclude_keys", "output_folder", "output_formats"}, path_exists takes two node names
+
+    :return: {'nodes': names} or {'path_exists': True, False or None for unknown nodes},
+             with 'query_seconds' and 'workflow_cache_hit', and 'files', 'error' if there is an output_folder
+    '''
+    query = payload['query']
+    node_names = list(payload['node_names'])
+
+    if query not in ('upstream', 'downstream', 'path_exists'):
+        raise ValueError('unknown query [{}]'.format(query))
+
+    obj, hit = workflow_cache.get(payload['proj_folder'], payload.get('exclude_keys', []))
+    wfp = WorkflowParser()
+
+    if query == 'path_exists':
+        wfp.get_reachability_index(obj)
+
+        start = time.time()
+        result = wfp.path_exists(obj, *node_names)
+
+        return {'path_exists': result, 'query_seconds': time.time() - start, 'workflow_cache_hit': hit}
+
+    up = query == 'upstream'
+    names, seconds = query_reachable_nodes(wfp, obj, node_names, up=up, down=not up, filter_type=payload.get('filter_type'))
+    reply = {'nodes': names, 'query_seconds': seconds, 'workflow_cache_hit': hit}
+
+    if payload.get('output_folder'):
+        output_formats = payload.get('output_formats') or WorkflowParser.DEFAULT_OUTPUT_FORMATS
+
+        GraphUtility.check_output_formats(output_formats)
+
+        nodes, edges = wfp.get_reachable_objects(obj, node_names, up=up, down=not up)
+        dest_filepath = get_reachable_graph_filepath(payload['proj_folder'], payload['output_folder'], node_names, up=up, down=not up)
+
+        FileUtility.mkdir_p(payload['output_folder'])
+        output_files = wfp.write_dep_graph(nodes, edges, dest_filepath, output_formats, render=False)
+
+        reply['files'], reply['error'] = render_daemon_outputs(output_files, output_formats, use_cache, cache_dir, render_concurrency, render_timeout)
+
+    return reply
+
+
+def get_daemon_handlers(**settings):
+    ''' :param settings: use_cache, cache_dir, render_concurrency, render_timeout of all requests
+    '''
+    return {'/parse_script': lambda payload, workflow_cache: daemon_parse_script(payload, workflow_cache, **settings),
+            '/dep_graph': lambda payload, workflow_cache: daemon_dep_graph(payload, workflow_cache, **settings),
+            '/reachability': lambda payload, workflow_cache: daemon_reachability(payload, workflow_cache, **settings)}
+
+
+@cli.command()
+@click.option('--host', default='127.0.0.1', help='address to listen on, keep it local, there is no authentication')
+@click.option('--port', type=int, default=None, help='default 8765')
+@click.option('--no-cache', 'no_cache', is_flag=True, default=False, help='always re-parse and re-render, do not use parse and render cache')
+@click.option('--cache-dir', 'cache_dir', default=None, help='parse cache folder, render cache in its render sub folder, default under system temp folder')
+@click.option('--render_concurrency', type=int, default=None, help='number of graphviz processes at a time, default cpu count')
+@click.option('--render_timeout', type=float, default=None, help='seconds a single graphviz call may take before it is killed')
+@click.option('--config_process_no', type=int, default=1, help='number of processes parsing workflow configs, 0 for cpu count')
+def daemon(host, port, no_cache, cache_dir, render_concurrency, render_timeout, config_process_no):
+    ''' Serve parse requests over HTTP, keeping grammars loaded and workflow folders parsed
+
+    POST /parse_script, POST /dep_graph, POST /reachability with a JSON body, GET /status, POST /shutdown
+    '''
+    from myparser.parse_daemon import ParseDaemon, WorkflowObjCache
+    # load the grammars before the first request
+    import myparser.script_parser
+
+    handlers = get_daemon_handlers(use_cache=not no_cache,
+                                   cache_dir=cache_dir,
+                                   render_concurrency=render_concurrency,
+                                   render_timeout=render_timeout)
+
+    parse_daemon = ParseDaemon(handlers,
+                               host=host,
+                               port=port or ParseDaemon.DEFAULT_PORT,
+                               workflow_cache=WorkflowObjCache(process_no=config_process_no or None))
+    print('parse daemon listening on http://{}:{}'.format(*parse_daemon.address))
+
+    parse_daemon.serve_forever()
+
 
 if __name__ == '__main__':
 #    cli()
@@ -0,0 +1,61 @@
+import re
+
+
+class ParamTemplate(object):
+    ''' A workflow parameter value such as \\"$(OutputRoot)/$(Date)\\", split once into literal and $(name) segments
+
+    resolve substitutes master params by joining the segments, which gives the same result as
+    replace_params, except where a substitution could form or contain another placeholder. Those
+    templates and values go through replace_params.
+    '''
+    PLACEHOLDER_REGEX = re.compile(r'\$\(.*?\)')
+    SPLIT_REGEX = re.compile(r'(\$\(.*?\))')
+
+    def __init__(self, param_str):
+        self.param_str = param_str
+
+        # literals and placeholder texts in turn, placeholders at odd indexes
+        self.segments = self.SPLIT_REGEX.split(param_str)
+        self.placeholders = [(i, self.segments[i][2:-1]) for i in range(1, len(self.segments), 2)]  # (index, param name)
+
+        # a placeholder inside a placeholder or after a literal $ could be replaced differently
+        self.simple = not any(self.segments[i - 1].endswith('$') or '$(' in self.segments[i][2:]
+                              for i, _ in self.placeholders)
+
+    @classmethod
+    def replace_params(cls, master_params, param_str):
+        ''' Replace each $(name) of a master param in turn, None values are kept as they are
+        '''
+        for match in cls.PLACEHOLDER_REGEX.findall(param_str):
+            param = match[2:-1]
+
+            if param in master_params:
+                if master_params[param] is None:
+                    continue
+
+                param_str = param_str.replace(match, master_params[param])
+
+        return param_str.replace('\\"', '"')
+
+    def resolve(self, master_params):
+        if not self.placeholders:
+            return self.segments[0].replace('\\"', '"')
+
+        if not self.simple:
+            return self.replace_params(master_params, self.param_str)
+
+        segments = list(self.segments)
+
+        for i, param in self.placeholders:
+            value = master_params.get(param)
+
+            if value is None:
+                continue
+
+            # the value could complete a placeholder which replace_params substitutes too
+            if '$' in value:
+                return self.replace_params(master_params, self.param_str)
+
+            segments[i] = value
+
+        return ''.join(segments).replace('\\"', '"')
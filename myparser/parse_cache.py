@@ -0,0 +1,166 @@
+import os
+import glob
+import json
+import time
+import pickle
+import sqlite3
+import hashlib
+import logging
+import tempfile
+
+
+class ParseCache(object):
+    ''' On-disk cache of ScriptParser.parse_content results (nodes, edges)
+
+    Entries live in a SQLite file so that pool workers can read and write concurrently,
+    keyed by sha1 of content, effective external params, parser version and flags.
+    Least recently used entries are evicted once the total size exceeds max_bytes.
+    '''
+    logger = logging.getLogger(__name__)
+
+    # now, but after the latest access, so accesses within the clock resolution keep their order
+    ACCESS_TIME_SQL = 'MAX(?, (SELECT COALESCE(MAX(last_access), 0) + 0.000001 FROM entries))'
+
+    DB_FILENAME = 'parse_cache.db'
+    DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+    # source files whose content affects the parse result
+    PARSER_SOURCES = ['myparser/script_parser.py',
+                      'myparser/scope_resolver.py',
+                      'myparser/script_preprocessor.py',
+                      'myparser/statement_splitter.py',
+                      'scope_parser/*.py',
+                      'graph/node.py',
+                      'graph/edge.py']
+
+    _parser_version = None
+
+    def __init__(self, cache_dir=None, max_bytes=DEFAULT_MAX_BYTES, timeout=60):
+        if cache_dir is None:
+            cache_dir = self.get_default_cache_dir()
+
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.timeout = timeout
+        self.db_filepath = os.path.join(cache_dir, self.DB_FILENAME)
+
+        self.hits = 0
+        self.misses = 0
+
+        self._conn = None
+
+    @staticmethod
+    def get_default_cache_dir():
+        return os.path.join(tempfile.gettempdir(), 'script_parse_cache')
+
+    @classmethod
+    def get_parser_version(cls):
+        ''' Hash of the parser sources, so any grammar or resolver change invalidates old entries
+        '''
+        if cls._parser_version is None:
+            root = os.path.join(os.path.dirname(__file__), os.pardir)
+            h = hashlib.sha1()
+
+            for pattern in cls.PARSER_SOURCES:
+                for filepath in sorted(glob.glob(os.path.join(root, pattern))):
+                    with open(filepath, 'rb') as f:
+                        h.update(f.read())
+
+            cls._parser_version = h.hexdigest()
+
+        return cls._parser_version
+
+    def make_key(self, content, external_params, flags):
+        h = hashlib.sha1()
+        h.update(self.get_parser_version().encode())
+        h.update(content.encode('utf-8', 'ignore'))
+        h.update(json.dumps(external_params, sort_keys=True, default=str).encode())
+        h.update(json.dumps(flags, sort_keys=True, default=str).encode())
+
+        return h.hexdigest()
+
+    # connection is per process, never pickled to pool workers
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_conn'] = None
+        return state
+
+    def get_conn(self):
+        if self._conn is None:
+            os.makedirs(self.cache_dir, exist_ok=True)
+
+            self._conn = sqlite3.connect(self.db_filepath, timeout=self.timeout, isolation_level=None)
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute('CREATE TABLE IF NOT EXISTS entries ('
+                               'key TEXT PRIMARY KEY, '
+                               'value BLOB NOT NULL, '
+                               'size INTEGER NOT NULL, '
+                               'last_access REAL NOT NULL)')
+
+        return self._conn
+
+    def get(self, key):
+        try:
+            conn = self.get_conn()
+            row = conn.execute('SELECT value FROM entries WHERE key = ?', (key,)).fetchone()
+
+            if row is None:
+                self.misses += 1
+                return None
+
+            conn.execute('UPDATE entries SET last_access = ' + self.ACCESS_TIME_SQL + ' WHERE key = ?', (time.time(), key))
+            self.hits += 1
+
+            return pickle.loads(row[0])
+        except (sqlite3.Error, pickle.UnpicklingError, EOFError) as ex:
+            self.logger.warning('parse cache get failed [{}]: {}'.format(key, ex))
+            self.misses += 1
+            return None
+
+    def put(self, key, value):
+        data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+
+        if len(data) > self.max_bytes:
+            self.logger.info('skip caching [{}], {} bytes exceeds cache size'.format(key, len(data)))
+            return
+
+        try:
+            conn = self.get_conn()
+            conn.execute('BEGIN IMMEDIATE')
+
+            try:
+                conn.execute('INSERT OR REPLACE INTO entries (key, value, size, last_access) VALUES (?, ?, ?, ' + self.ACCESS_TIME_SQL + ')',
+                             (key, sqlite3.Binary(data), len(data), time.time()))
+                self.evict(conn)
+                conn.execute('COMMIT')
+            except Exception:
+                conn.execute('ROLLBACK')
+                raise
+        except sqlite3.Error as ex:
+            self.logger.warning('parse cache put failed [{}]: {}'.format(key, ex))
+
+    def evict(self, conn):
+        total = conn.execute('SELECT COALESCE(SUM(size), 0) FROM entries').fetchone()[0]
+
+        if total <= self.max_bytes:
+            return
+
+        for key, size in conn.execute('SELECT key, size FROM entries ORDER BY last_access').fetchall():
+            conn.execute('DELETE FROM entries WHERE key = ?', (key,))
+            total -= size
+
+            self.logger.debug('evict parse cache entry [{}]'.format(key))
+
+            if total <= self.max_bytes:
+                break
+
+    def get_total_bytes(self):
+        return self.get_conn().execute('SELECT COALESCE(SUM(size), 0) FROM entries').fetchone()[0]
+
+    def clear(self):
+        self.get_conn().execute('DELETE FROM entries')
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
@@ -0,0 +1,224 @@
+import os
+import json
+import time
+import logging
+import threading
+import urllib.request
+import urllib.error
+from socketserver import ThreadingMixIn
+from http.server import HTTPServer, BaseHTTPRequestHandler
+from util.file_utility import FileUtility
+from myparser.workflow_parser import WorkflowParser
+
+
+class WorkflowObjCache(object):
+    ''' WorkflowObj of parsed workflow folders, parsed again only if a .config file changed
+
+    A folder is identified by the path, mtime and size of all its .config files, so adding,
+    removing or touching a config invalidates it. Listing the folder is much cheaper than
+    parsing every config again, and only the changed configs of an invalidated folder are.
+    '''
+    logger = logging.getLogger(__name__)
+
+    def __init__(self, workflow_parser=None, process_no=1):
+        '''
+        :param process_no: number of processes parsing the configs of a folder, see WorkflowParser.parse_folder
+        '''
+        self.workflow_parser = workflow_parser or WorkflowParser()
+        self.process_no = process_no
+
+        self.entries = {}  # (folder, exclude_keys) -> (signature, WorkflowObj)
+        self.lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def get_signature(folder):
+        signature = []
+
+        for filepath in FileUtility.list_files_recursive(folder, target_suffix='.config'):
+            try:
+                st = os.stat(filepath)
+            except OSError:
+                # removed while listing
+                continue
+
+            signature.append((filepath, st.st_mtime_ns, st.st_size))
+
+        return tuple(sorted(signature))
+
+    def get(self, folder, exclude_keys=[]):
+        ''' :return: (WorkflowObj, hit)
+        '''
+        key = (os.path.abspath(folder), tuple(exclude_keys))
+        signature = self.get_signature(folder)
+
+        with self.lock:
+            entry = self.entries.get(key)
+
+            if entry is not None and entry[0] == signature:
+                self.hits += 1
+                return entry[1], True
+
+            self.misses += 1
+
+        self.logger.info('parse workflow folder [{}]'.format(folder))
+
+        # parse_folder appends to exclude_keys
+        obj = self.workflow_parser.parse_folder(folder,
+                                                exclude_keys=list(exclude_keys),
+                                                process_no=self.process_no,
+                                                previous=entry[1] if entry is not None else None)
+
+        with self.lock:
+            self.entries[key] = (signature, obj)
+
+        return obj, False
+
+
+class ThreadingHTTPServer(ThreadingMixIn, HTTPServer):
+    # http.server has it from python 3.7 on
+    daemon_threads = True
+
+
+class ParseDaemon(object):
+    ''' Long-running JSON over HTTP server on localhost
+
+    Imported modules and pyparsing grammars (class attributes of scope_parser/*) stay loaded,
+    and a WorkflowObjCache keeps parsed workflow folders, so a request only does the work of
+    the request itself. handlers map a path to a function (payload dict, WorkflowObjCache) ->
+    reply dict, e.g. {'/parse_script': ..., '/dep_graph': ...}, called on POST with the JSON
+    body. Built in are GET /status and POST /shutdown.
+
+    Replies are JSON: the handler reply with 'ok': true, or {'ok': false, 'error': message}.
+    '''
+    logger = logging.getLogger(__name__)
+
+    DEFAULT_PORT = 8765
+
+    def __init__(self, handlers, host='127.0.0.1', port=DEFAULT_PORT, workflow_cache=None):
+        self.handlers = handlers
+        self.workflow_cache = workflow_cache or WorkflowObjCache()
+
+        self.start_time = time.time()
+        self.requests = 0
+        self.errors = 0
+        self.lock = threading.Lock()  # requests are handled in their own threads
+
+        self.server = ThreadingHTTPServer((host, port), self.make_request_handler())
+
+    @property
+    def address(self):
+        return self.server.server_address[:2]
+
+    def make_request_handler(self):
+        daemon = self
+
+        class RequestHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path == '/status':
+                    self.send_json(200, daemon.get_status())
+                else:
+                    self.send_json(404, {'ok': False, 'error': 'unknown path [{}]'.format(self.path)})
+
+            def do_POST(self):
+                try:
+                    length = int(self.headers.get('Content-Length', 0))
+                    payload = json.loads(self.rfile.read(length).decode('utf-8') or '{}')
+                except ValueError as ex:
+                    self.send_json(400, {'ok': False, 'error': 'invalid json: {}'.format(ex)})
+                    return
+
+                status, reply = daemon.handle(self.path, payload)
+                self.send_json(status, reply)
+
+            def send_json(self, status, reply):
+                body = json.dumps(reply).encode('utf-8')
+
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                daemon.logger.debug(format % args)
+
+        return RequestHandler
+
+    def get_status(self):
+        with self.lock:
+            requests, errors = self.requests, self.errors
+
+        return {'ok': True,
+                'uptime': time.time() - self.start_time,
+                'requests': requests,
+                'errors': errors,
+                'paths': sorted(self.handlers),
+                'workflow_cache': {'folders': len(self.workflow_cache.entries),
+                                   'hits': self.workflow_cache.hits,
+                                   'misses': self.workflow_cache.misses}}
+
+    def handle(self, path, payload):
+        ''' :return: (http status, reply dict)
+        '''
+        if path == '/shutdown':
+            # shutdown waits for serve_forever, which waits for this request
+            threading.Thread(target=self.server.shutdown, daemon=True).start()
+            return 200, {'ok': True}
+
+        if path not in self.handlers:
+            return 404, {'ok': False, 'error': 'unknown path [{}]'.format(path)}
+
+        with self.lock:
+            self.requests += 1
+
+        start = time.time()
+
+        try:
+            reply = self.handlers[path](payload, self.workflow_cache)
+        except Exception as ex:
+            self.logger.exception('request [{}] failed'.format(path))
+
+            with self.lock:
+                self.errors += 1
+
+            return 500, {'ok': False, 'error': '{}: {}'.format(type(ex).__name__, ex)}
+
+        reply = dict(reply, ok=not reply.get('error'), seconds=time.time() - start)
+
+        if reply.get('error'):
+            with self.lock:
+                self.errors += 1
+
+        return 200, reply
+
+    def serve_forever(self):
+        self.logger.info('parse daemon listening on http://{}:{}'.format(*self.address))
+
+        try:
+            self.server.serve_forever()
+        finally:
+            self.server.server_close()
+
+    def shutdown(self):
+        self.server.shutdown()
+
+
+def request_daemon(path, payload=None, host='127.0.0.1', port=ParseDaemon.DEFAULT_PORT, timeout=None):
+    ''' Send a request to a running ParseDaemon, GET if payload is None
+
+    :return: reply dict
+    '''
+    url = 'http://{}:{}{}'.format(host, port, path)
+    data = None if payload is None else json.dumps(payload).encode('utf-8')
+
+    req = urllib.request.Request(url, data=data, headers={'Content-Type': 'application/json'})
+
+    try:
+        with urllib.request.urlopen(req, timeout=timeout) as res:
+            return json.loads(res.read().decode('utf-8'))
+    except urllib.error.HTTPError as ex:
+        # error replies are json too
+        return json.loads(ex.read().decode('utf-8'))
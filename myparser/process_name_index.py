@@ -0,0 +1,141 @@
+import os
+import itertools
+import editdistance
+from collections import Counter
+
+
+class ProcessNameIndex(object):
+    ''' Lookup of the process a script or process key belongs to, see get_closest
+
+    Built once from the process names and the script name -> process name map of a WorkflowObj:
+    exact lookups are dicts, the substring and the edit distance lookups go through n-gram
+    inverted indexes of the script names and of the process names. Answers are the same as
+    scanning the maps in order, ties go to the name that comes first.
+    '''
+    NGRAM_SIZE = 3
+
+    # process names sharing the most ngrams with the key, checked first for an upper bound of the distance
+    BOUND_CANDIDATE_NO = 8
+
+    def __init__(self, process_names, script_process_map):
+        self.process_names = list(process_names)
+        self.process_name_set = set(self.process_names)
+
+        self.script_process_map = dict(script_process_map)
+        self.script_names = list(script_process_map)
+
+        # ngram -> ascending indexes of the names containing it
+        self.script_ngram_index = self.make_ngram_index(self.script_names)
+        self.process_ngram_index = self.make_ngram_index(self.process_names)
+
+        self.results = {}  # process key -> closest process name
+
+    @classmethod
+    def get_ngrams(cls, s):
+        return {s[i:i + cls.NGRAM_SIZE] for i in range(len(s) - cls.NGRAM_SIZE + 1)}
+
+    @classmethod
+    def make_ngram_index(cls, names):
+        ngram_index = {}
+
+        for i, name in enumerate(names):
+            for ngram in cls.get_ngrams(name):
+                ngram_index.setdefault(ngram, []).append(i)
+
+        return ngram_index
+
+    def find_script_containing(self, s):
+        ''' :return: first script name containing s, None if there is none
+        '''
+        if len(s) < self.NGRAM_SIZE:
+            return next((script_name for script_name in self.script_names if s in script_name), None)
+
+        # a script containing s is in the posting list of each of its ngrams,
+        # so the shortest list holds all candidates in script order
+        postings = []
+
+        for ngram in self.get_ngrams(s):
+            posting = self.script_ngram_index.get(ngram)
+
+            if posting is None:
+                return None
+
+            postings.append(posting)
+
+        for i in min(postings, key=len):
+            if s in self.script_names[i]:
+                return self.script_names[i]
+
+        return None
+
+    def find_closest_process_name(self, s):
+        ''' :return: first process name with the smallest edit distance to s below len(s) * 2, None if there is none
+        '''
+        min_dist = len(s) * 2  # just a big enough value
+        min_index = None
+
+        def check(i):
+            nonlocal min_dist, min_index
+
+            # the edit distance is at least the length difference
+            if abs(len(self.process_names[i]) - len(s)) > min_dist:
+                return
+
+            dist = editdistance.eval(self.process_names[i], s)
+
+            if dist < min_dist or (dist == min_dist and min_index is not None and i < min_index):
+                min_dist = dist
+                min_index = i
+
+        ngrams = self.get_ngrams(s)
+        counts = Counter(itertools.chain.from_iterable(self.process_ngram_index.get(ngram, ()) for ngram in ngrams))
+
+        for i, _ in counts.most_common(self.BOUND_CANDIDATE_NO):
+            check(i)
+
+        # each edit breaks at most NGRAM_SIZE ngrams of s, so a name within max_dist
+        # shares at least this many of them
+        max_dist = min_dist if min_index is not None else min_dist - 1
+        min_count = len(ngrams) - max_dist * self.NGRAM_SIZE
+
+        if min_count <= 0:
+            candidates = range(len(self.process_names))
+        else:
+            candidates = sorted(i for i, count in counts.items() if count >= min_count)
+
+        for i in candidates:
+            check(i)
+
+        return None if min_index is None else self.process_names[min_index]
+
+    def get_closest(self, process_key):
+        ''' Process name of a process key, which is a process name, a script name or close to one of them
+
+        In this order: the process name itself, the process of the script name, the first script
+        name containing the key without extension, the process name with the smallest edit distance.
+
+        :return: process name, process_key if nothing is close
+        '''
+        if process_key in self.process_name_set:
+            return process_key
+
+        if process_key in self.script_process_map:
+            return self.script_process_map[process_key]
+
+        if process_key in self.results:
+            return self.results[process_key]
+
+        # such as key [NKWOptMPIProcessing] and script [NKWOptMPIProcessing3.script]
+        script_name = self.find_script_containing(os.path.splitext(process_key)[0])
+
+        if script_name is not None:
+            process_name = self.script_process_map[script_name]
+        else:
+            process_name = self.find_closest_process_name(process_key)
+
+            if process_name is None:
+                process_name = process_key
+
+        self.results[process_key] = process_name
+
+        return process_name
@@ -21,31 +21,48 @@ from scope_parser.using import Using
 from scope_parser.select import Select
 from scope_parser.loop import Loop
 from myparser.scope_resolver import ScopeResolver
+from myparser.script_preprocessor import ScriptPreprocessor
+from myparser.statement_splitter import StatementSplitter
 
-from graph.node import Node
-from graph.edge import Edge
-from graph.graph_utility import GraphUtility
-from cosmos.sstream_utiltiy import SstreamUtility
+from graph.node import Node, NodeIdAllocator, NodeRegistry
+from graph.edge import EdgeList
+from graph.graph_utility import GraphUtility, RenderPolicy
+from graph.graph_simplifier import GraphSimplifier
 
 
 class ScriptParser(object):
     logger = logging.getLogger(__name__)
 
-    def __init__(self, b_add_sstream_link=False, b_add_sstream_size=False):
+    DEFAULT_OUTPUT_FORMATS = ['gexf', 'dot', 'pdf']
+
+    def __init__(self, b_add_sstream_link=False, b_add_sstream_size=False, lineage_only=False, parse_cache=None,
+                 simplify=False):
         self.vars = {}
 
+        # optional ParseCache, reuse nodes/edges of unchanged content
+        self.parse_cache = parse_cache
+
+        # lineage_only: only extract source -> target edges, skip column lists and conditions
+        self.lineage_only = lineage_only
+
+        # simplify: collapse chains of intermediate nodes before writing the graph
+        self.graph_simplifier = GraphSimplifier() if simplify else None
+
         self.declare = Declare()
         self.set = Set()
         self.input = Input()
-        self.output = Output()
+        self.output = Output(lineage_only=lineage_only)
         self.module = Module()
-        self.process = Process()
-        self.reduce = Reduce()
-        self.combine = Combine()
+        self.process = Process(lineage_only=lineage_only)
+        self.reduce = Reduce(lineage_only=lineage_only)
+        self.combine = Combine(lineage_only=lineage_only)
         self.using = Using()
-        self.select = Select()
+        self.select = Select(lineage_only=lineage_only)
 
         self.scope_resolver = ScopeResolver()
+        self.id_allocator = NodeIdAllocator()
+        self.preprocessor = ScriptPreprocessor(loop_expander=self.expand_loop)
+        self.statement_splitter = StatementSplitter()
 
         self.b_add_sstream_link = b_add_sstream_link
         self.b_add_sstream_size = b_add_sstream_size
@@ -59,12 +76,17 @@ class ScriptParser(object):
         self.default_datetime = DatetimeUtility.get_datetime()
 
         if b_add_sstream_size:
+            # cosmos needs pycurl and BeautifulSoup, only load them for stream sizes
+            from cosmos.sstream_utiltiy import SstreamUtility
+
             self.ssu = SstreamUtility("d:/workspace/dummydummy.ini")  # specify your auth file path
 
         # read fallback configs from ini file
         config_filepath = os.path.join(os.path.dirname(__file__), os.pardir, 'config', 'config.ini')
         self.read_configs(config_filepath)
 
+        self.render_policy = RenderPolicy.from_config_file(config_filepath)
+
     def read_configs(self, filepath):
         config = configparser.ConfigParser()
         config.optionxform = str  # reserve case
@@ -142,13 +164,13 @@ class ScriptParser(object):
 
         self.logger.warning('cannot find node [{}]! Probably source node.'.format(target_name))
 
-        return Node(target_name)
+        return Node(target_name, id_allocator=self.id_allocator)
 
     def upsert_node(self, node_map, node_name):
         if node_name not in node_map:
             self.logger.info('cannot find node [{}]! Probably source node.'.format(node_name))
 
-            node_map[node_name] = Node(node_name)
+            node_map[node_name] = Node(node_name, id_allocator=self.id_allocator)
 
     def get_target_declare_int(self, content, target_key):
         match = re.search('#DECLARE[ \t]+{}[ \t]+int[ \t]+=[ \t]+(\d)+.*;'.format(target_key), content)
@@ -409,17 +431,17 @@ class ScriptParser(object):
 
         to_node = Node(d['path'], attr={'type': 'output',
                                         'style': 'filled',
-                                        'fillcolor': 'tomato'})
+                                        'fillcolor': 'tomato'}, id_allocator=self.id_allocator)
 
         source_names = d['idents']
 
         if not source_names:
             from_node = node_map['last_node']
-            edges.append(Edge(from_node, to_node))
+            edges.add(from_node, to_node)
         else:
             for source_name in source_names:
                 from_node = node_map.get(source_name, node_map['last_node'])
-                edges.append(Edge(from_node, to_node))
+                edges.add(from_node, to_node)
 
         all_nodes.append(to_node)
 
@@ -458,7 +480,7 @@ class ScriptParser(object):
                 continue
 
             param_node = node_map[param]
-            edges.append(Edge(param_node, dest_node))
+            edges.add(param_node, dest_node)
 
     def process_core(self, part, node_map, all_nodes, edges, d):
         from_nodes = []
@@ -475,7 +497,7 @@ class ScriptParser(object):
                 main_node_name = source.split('.')[0]
 
                 if main_node_name in node_map:
-                    edges.append(Edge(node_map[main_node_name], node_map[source]))
+                    edges.add(node_map[main_node_name], node_map[source])
 
         if len(from_nodes) == 0:
             from_nodes.append(node_map['last_node'])
@@ -491,18 +513,18 @@ class ScriptParser(object):
             if 'using' in d:
                 attr['using'] = d['using']
 
-            new_node = Node(node_name, attr=attr)
+            new_node = Node(node_name, attr=attr, id_allocator=self.id_allocator)
             node_map[node_name] = new_node  # update
             to_node = new_node
         else:
             if not node_map['last_node']:
-                new_node = Node("SCOPE_IMPLICIT")
+                new_node = Node("SCOPE_IMPLICIT", id_allocator=self.id_allocator)
                 to_node = new_node
             else:
                 to_node = node_map['last_node']
 
         for from_node in from_nodes:
-            edges.append(Edge(from_node, to_node))
+            edges.add(from_node, to_node)
             all_nodes.append(from_node)
 
         all_nodes.append(to_node)
@@ -540,8 +562,9 @@ class ScriptParser(object):
 
         self.logger.info('set [{}] as [{}]'.format(key, value))
 
-    def update_module_view_data(self, final_nodes, final_edges, nodes, edges, view_name):
+    def update_module_view_data(self, final_nodes, final_edges, nodes, edges, view_name, id_allocator=None):
         processed = set()
+        id_map = {}  # view node id -> module node id, ids of each view start from 1
 
         for node in nodes:
             # nodes may be duplicate because we recorded the whole appearance
@@ -551,10 +574,25 @@ class ScriptParser(object):
             node.name = '<{}>_{}'.format(view_name, node.name)
             processed.add(node)
 
+            if id_allocator:
+                view_node_id = node.attr['id']
+
+                if view_node_id not in id_map:
+                    id_map[view_node_id] = id_allocator.next_id()
+
+                node.attr['id'] = id_map[view_node_id]
+
         final_nodes.extend(nodes)
         final_edges.extend(edges)
 
-    def parse_file(self, filepath, external_params={}, dest_filepath=None):
+    def parse_file(self, filepath, external_params={}, dest_filepath=None, output_formats=None, render=True):
+        '''
+        :param dest_filepath: output files are dest_filepath.gexf, dest_filepath.dot, dest_filepath.dot.pdf, ...
+        :param output_formats: formats written to dest_filepath, default DEFAULT_OUTPUT_FORMATS
+        :param render: False to only write the dot file for formats rendered by graphviz, so they can
+                       be rendered later by GraphRenderer
+        :return: list of written files
+        '''
         self.logger.info('parse_file [{}]'.format(filepath))
         self.logger.debug('file [{}], external_params = {}'.format(filepath, external_params))
 
@@ -585,17 +623,18 @@ class ScriptParser(object):
 
         content = FileUtility.get_file_content(filepath)
 
-        final_nodes = []
-        final_edges = []
+        final_nodes = NodeRegistry()
+        final_edges = EdgeList()
 
         if filepath.endswith('.module'):
             d = self.get_module_views(content)
+            module_id_allocator = NodeIdAllocator()
 
             for view_name in d:
                 content = d[view_name]
                 nodes, edges = self.parse_content(content, external_params)
 
-                self.update_module_view_data(final_nodes, final_edges, nodes, edges, view_name)
+                self.update_module_view_data(final_nodes, final_edges, nodes, edges, view_name, module_id_allocator)
 
         if filepath.endswith('.view'):
             content = self.remove_view_template(content)
@@ -605,13 +644,20 @@ class ScriptParser(object):
         if filepath.endswith('.script'):
             final_nodes, final_edges = self.parse_content(content, external_params)
 
+        if self.graph_simplifier is not None:
+            final_nodes, final_edges = self.graph_simplifier.simplify(final_nodes, final_edges)
+
+        output_files = []
+
         if dest_filepath:
-            self.to_graph(dest_filepath, final_nodes, final_edges)
+            output_files = self.to_graph(dest_filepath, final_nodes, final_edges, output_formats=output_formats, render=render)
 
         # save cosmos querying results
         if self.b_add_sstream_size:
             self.ssu.refresh_cache()
 
+        return output_files
+
     def get_parse_type(self, part):
         ''' Use the first occurred keyword as parsing type
 
@@ -628,33 +674,50 @@ class ScriptParser(object):
 
         return None
 
+    def get_cache_flags(self):
+        return {'lineage_only': self.lineage_only,
+                'add_sstream_link': self.b_add_sstream_link,
+                'sstream_link_prefix': self.sstream_link_prefix,
+                'sstream_link_suffix': self.sstream_link_suffix,
+                'default_datetime': self.default_datetime.isoformat()}
+
     def parse_content(self, content, external_params={}):
-        content = self.remove_comments(content)
-        content = self.remove_if(content)
-        content = self.remove_if(content)  # for nested if
-        content = self.resolve_external_params(content, self.external_params)
-        content = self.expand_loop(content)
-        content = self.remove_data_hint(content)
-        content = self.remove_split_reserved_char(content)
-        content = self.remove_ascii_non_target(content)
+        # stream size comes from cosmos, not from the content, never cache it
+        if self.parse_cache is None or self.b_add_sstream_size:
+            return self.parse_content_core(content, external_params)
+
+        key = self.parse_cache.make_key(content, self.external_params, self.get_cache_flags())
+
+        cached = self.parse_cache.get(key)
+        if cached is not None:
+            self.logger.info('parse cache hit [{}]'.format(key))
+            return cached
+
+        nodes, edges = self.parse_content_core(content, external_params)
+        self.parse_cache.put(key, (nodes, edges))
 
-        parts = content.split(';')
+        return nodes, edges
+
+    def preprocess(self, content):
+        return self.preprocessor.process(content, self.external_params)
+
+    def parse_content_core(self, content, external_params={}):
+        content = self.preprocess(content)
+
+        # node ids of each content start from 1, same content gives same ids
+        self.id_allocator = NodeIdAllocator()
 
         declare_map = {}
 
         node_map = {'last_node': None}
-        edges = []
-        all_nodes = []  # add node to networkx ourself, missing nodes in edges will be added automatically
+        edges = EdgeList()
+        all_nodes = NodeRegistry()  # add node to networkx ourself, missing nodes in edges will be added automatically
         # and the id of auto-added nodes are not controllable
 
-        for part in parts:
+        # stops at C# block by itself
+        for offset, part in self.statement_splitter.split(content):
             self.logger.debug('-' * 20)
-            self.logger.debug(part)
-
-            # ignore data after C# block
-            if '#CS' in part:
-                self.logger.info('meet CS block, break parsing.')
-                break
+            self.logger.debug('offset {}: {}'.format(offset, part))
 
             if '#DECLARE' in part:
                 # some files contain prefix unicode string
@@ -691,7 +754,7 @@ class ScriptParser(object):
                 try:
                     self.process_input_module(part, node_map, all_nodes, edges)
                 except Exception as ex:
-                    self.logger.warning(ex)
+                    self.logger.warning('statement at offset {}: {}'.format(offset, ex))
                     pass
 
         self.logger.info(declare_map)
@@ -709,21 +772,19 @@ class ScriptParser(object):
 
         return all_nodes, edges
 
-    def to_graph(self, dest_filepath, nodes, edges):
-        gu = GraphUtility(nodes, edges)
+    def to_graph(self, dest_filepath, nodes, edges, output_formats=None, render=True):
+        if output_formats is None:
+            output_formats = self.DEFAULT_OUTPUT_FORMATS
 
-        gexf_output_file = gu.to_gexf_file(dest_filepath)
-        self.logger.info('output .gexf file to [{}]'.format(gexf_output_file))
+        output_files = GraphUtility(nodes, edges).to_files(dest_filepath,
+                                                           output_formats,
+                                                           render=render,
+                                                           render_policy=self.render_policy)
 
-        dot_output_file = gu.to_dot_file(dest_filepath)
-        self.logger.info('output .dot file to [{}]'.format(dot_output_file))
+        for output_file in output_files:
+            self.logger.info('output file to [{}]'.format(output_file))
 
-        self.logger.info('render graphviz file')
-        try:
-            gu.dot_to_graphviz(dot_output_file, format='pdf')
-        except Exception as ex:
-            self.logger.warning('failed converting to pdf, try svg')
-            gu.dot_to_graphviz(dot_output_file, format='svg')
+        return output_files
 
 
 if __name__ == '__main__':
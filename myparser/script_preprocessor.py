@@ -0,0 +1,193 @@
+import re
+import logging
+
+
+class ScriptPreprocessor(object):
+    ''' Single-pass replacement of the ScriptParser regex preprocessing chain
+
+    The scanner jumps between interesting tokens (comments, string literals, #IF/#ELSE/#ENDIF
+    and @@param@@) instead of rewriting the whole script once per rule. Data hints are then
+    dropped by the same regexes as before, but each only runs if its trigger literal occurs.
+    For well-formed scripts the output is the same text as remove_comments -> remove_if ->
+    resolve_external_params -> expand_loop -> remove_data_hint -> remove_split_reserved_char
+    -> remove_ascii_non_target. Unterminated comments/strings and stray @@ may differ.
+    '''
+    logger = logging.getLogger(__name__)
+
+    # unterminated quotes match nothing and stay plain text, same as remove_comments
+    re_token = re.compile(r'''//|/\*|"(?:\\.|[^\\"])*"|'(?:\\.|[^\\'])*'|#IF|#ELSE|#ENDIF|@@''', re.DOTALL)
+    re_token_in_string = re.compile(r'#IF|#ELSE|#ENDIF|@@')
+
+    # same rules and order as ScriptParser.remove_data_hint, (trigger literal, regex)
+    data_hints = [
+        ('=', re.compile(r'\[.+?=[ ]?\d+?\]')),                 # [ROWCOUNT=100]
+        ('[LOWDISTINCTNESS', re.compile(r'\[LOWDISTINCTNESS[ ]*\(.*\)\]')),  # [LOWDISTINCTNESS(MatchTypeId)]
+        ('=(', re.compile(r'\[.+?=\(.+=.+\)\]')),              # [PARTITION=(PARTITIONCOUNT=2000)]
+        ('[Privacy.', re.compile(r'\[Privacy\..+?]')),           # [Privacy.xxx]
+        ('[', re.compile(r'\[[ ]*[a-zA-Z\(\), ]+[ ]*\]')),      # [ PARTITION(BiddedKeyword) ]
+    ]
+
+    # back-to-back double quotes left from resolving quoted external params
+    re_quote_prefix = re.compile(r'("")([\w]+)')
+    re_quote_suffix = re.compile(r'([\w]+)("")')
+
+    # str.isascii is 3.7+
+    re_non_ascii = re.compile(r'[^\x00-\x7f]')
+
+    def __init__(self, loop_expander=None):
+        ''' :param loop_expander: callable(content) -> content for LOOP blocks, e.g. ScriptParser.expand_loop
+        '''
+        self.loop_expander = loop_expander
+
+    def skip_line(self, content, pos):
+        ''' Position right after the newline ending the current line, comments replaced as a space
+
+        :return: -1 if there is no newline left
+        '''
+        while True:
+            newline = content.find('\n', pos)
+            if newline < 0:
+                return -1
+
+            block = content.find('/*', pos, newline)
+            if block < 0:
+                return newline + 1
+
+            block_end = content.find('*/', block + 2)
+            if block_end < 0:
+                # unterminated block is not a comment
+                return newline + 1
+
+            pos = block_end + 2
+
+    def scan(self, content, params):
+        ''' Remove comments and #IF/#ELSE/#ENDIF directives, substitute @@param@@
+
+        :param content: the raw script
+        :param params: external params
+        :return: list of text pieces
+        '''
+        pieces = []
+        end = len(content)
+        pos = 0
+        string_end = -1   # end of the string literal we are in, comments are not recognized inside
+        if_open = False   # an #IF line was removed and waits for its #ENDIF
+        last_endif = content.rfind('#ENDIF')
+
+        while pos < end:
+            if pos < string_end:
+                match = self.re_token_in_string.search(content, pos, string_end)
+            else:
+                match = self.re_token.search(content, pos)
+
+            if not match:
+                if pos < string_end:
+                    pieces.append(content[pos:string_end])
+                    pos = string_end
+                    continue
+
+                pieces.append(content[pos:])
+                break
+
+            start = match.start()
+            token = match.group()
+            pieces.append(content[pos:start])
+            pos = match.end()
+
+            if token == '//':
+                newline = content.find('\n', pos)
+                pos = end if newline < 0 else newline
+                pieces.append(' ')
+            elif token == '/*':
+                block_end = content.find('*/', pos)
+
+                if block_end < 0:
+                    # unterminated block is not a comment
+                    pieces.append('/')
+                    pos = start + 1
+                else:
+                    pos = block_end + 2
+                    pieces.append(' ')
+            elif token[0] in '"\'':
+                if '#' in token or '@@' in token:
+                    # directives and params are still resolved inside string literals
+                    pieces.append(token[0])
+                    string_end = pos
+                    pos = start + 1
+                else:
+                    pieces.append(token)
+            elif token == '#IF':
+                next_line = self.skip_line(content, pos)
+
+                if next_line < 0:
+                    pieces.append(token)
+                    continue
+
+                if not if_open and last_endif >= next_line:
+                    if_open = True
+
+                pos = next_line
+            elif token == '#ELSE':
+                pass
+            elif token == '#ENDIF':
+                if if_open:
+                    if_open = False
+                    continue
+
+                # dangling #ENDIF of a nested #IF, removed with the rest of its line
+                next_line = self.skip_line(content, pos)
+
+                if next_line < 0:
+                    pieces.append(token)
+                    continue
+
+                pos = next_line
+            elif token == '@@':
+                close = content.find('@@', pos)
+                newline = content.find('\n', pos)
+
+                if close < 0 or (0 <= newline < close):
+                    pieces.append(token)
+                    continue
+
+                name = content[pos:close]
+                pieces.append(params.get(name, '@@{}@@'.format(name)))
+                pos = close + 2
+
+        return pieces
+
+    def resolve_quotes(self, content):
+        if '""' not in content:
+            return content
+
+        content = self.re_quote_prefix.sub(r'"2', content)
+        content = self.re_quote_suffix.sub(r'1"', content)
+
+        return content.replace('"""', '""')
+
+    def process(self, content, params={}):
+        content = ''.join(self.scan(content, params))
+        content = self.resolve_quotes(content)
+
+        if self.loop_expander and 'LOOP' in content:
+            content = self.loop_expander(content)
+        else:
+            content = '\n'.join(content.splitlines())
+
+        if '[' in content:
+            for trigger, re_data_hint in self.data_hints:
+                if trigger in content:
+                    content = re_data_hint.sub('', content)
+
+        # same as remove_split_reserved_char
+        if "';'" in content:
+            content = content.replace("';'", '')
+
+        if '";"' in content:
+            content = content.replace('";"', '')
+
+        # same as remove_ascii_non_target
+        if self.re_non_ascii.search(content):
+            content = content.encode('ascii', 'ignore').decode()
+
+        return content
@@ -0,0 +1,34 @@
+import re
+import logging
+
+
+class StatementSplitter(object):
+    ''' Lazily split a script into statements on ';'
+
+    Semicolons inside string literals (including verbatim @"..." strings), char literals and
+    comments do not end a statement. Scanning stops at the first #CS block, the C# code after
+    it is never looked at.
+    '''
+    logger = logging.getLogger(__name__)
+
+    re_token = re.compile(r'''@"(?:[^"]|"")*"|"(?:\\.|[^\\"])*"|'(?:\\.|[^\\'])*'|//[^\n]*|/\*.*?\*/|;|#CS''', re.DOTALL)
+
+    def split(self, content):
+        ''' Yield statements of the content
+
+        :param content: the (preprocessed) script
+        :return: generator of (offset, statement_text), offset is the index of statement_text in content
+        '''
+        start = 0
+
+        for match in self.re_token.finditer(content):
+            token = match.group()
+
+            if token == ';':
+                yield start, content[start:match.start()]
+                start = match.end()
+            elif token == '#CS':
+                self.logger.info('meet CS block at offset {}, stop splitting.'.format(match.start()))
+                return
+
+        yield start, content[start:]
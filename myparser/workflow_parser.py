@@ -3,15 +3,27 @@ import logging
 import re
 import os
 import codecs
-import editdistance
+import pickle
+import hashlib
 from util.file_utility import FileUtility
+from myparser.process_name_index import ProcessNameIndex
+from myparser.param_template import ParamTemplate
 
 from graph.node import Node
 from graph.edge import Edge
-from graph.graph_utility import GraphUtility
+from graph.csr_graph import CsrGraph
+from graph.reachability_index import ReachabilityIndex
+from graph.graph_utility import GraphUtility, RenderPolicy
 
 
 class WorkflowObj(object):
+    logger = logging.getLogger(__name__)
+
+    # source files whose changes make saved snapshots unusable
+    SNAPSHOT_SOURCES = ['workflow_parser.py', 'param_template.py']
+
+    _snapshot_version = None
+
     def __init__(self):
         self.masters = {}  # config_filename -> master config dict
         self.workflows = {}  # process_name -> workflow config dict
@@ -25,12 +37,114 @@ class WorkflowObj(object):
         self.script_process_map = {} # script name -> process_name
         self.event_interval_map = {}  # event_name -> interval
 
+        self.process_name_index = None  # ProcessNameIndex, built on the first lookup
+        self.reachability_index = None  # (Node of each id, ReachabilityIndex) of the dependency graph, built on the first query
+
+        # entries hold the config dicts they were made from and are made again if those were replaced
+        self.param_templates = {}  # process_name -> (workflow config dict, [(param name, ParamTemplate)])
+        self.param_maps = {}       # (process_name, master_key) -> (workflow config dict, master params dict, param map)
+
+        # parse results of the .config files, to parse only changed files again
+        self.config_stats = {}    # filepath -> (mtime_ns, size)
+        self.config_results = {}  # filepath -> (config dict or None, error message or None)
+
+    @classmethod
+    def get_snapshot_version(cls):
+        if cls._snapshot_version is None:
+            h = hashlib.sha1()
+
+            for filename in cls.SNAPSHOT_SOURCES:
+                with open(os.path.join(os.path.dirname(__file__), filename), 'rb') as f:
+                    h.update(f.read())
+
+            cls._snapshot_version = h.hexdigest()
+
+        return cls._snapshot_version
+
+    def save(self, filepath):
+        ''' Write a snapshot to filepath, see load
+        '''
+        # cheap to build again and larger than the maps
+        state = dict(vars(self), process_name_index=None, reachability_index=None)
+
+        FileUtility.mkdir_p(os.path.dirname(os.path.abspath(filepath)))
+        tmp_filepath = '{}.{}.tmp'.format(filepath, os.getpid())
+
+        with open(tmp_filepath, 'wb') as f:
+            pickle.dump((self.get_snapshot_version(), state), f, protocol=pickle.HIGHEST_PROTOCOL)
+
+        # readers never see a partly written snapshot
+        os.replace(tmp_filepath, filepath)
+
+    @classmethod
+    def load(cls, filepath):
+        ''' :return: WorkflowObj saved to filepath, None if there is none or it was saved by other parser sources
+        '''
+        try:
+            with open(filepath, 'rb') as f:
+                version, state = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as ex:
+            cls.logger.warning('ignore unreadable workflow snapshot [{}]: {}'.format(filepath, ex))
+            return None
+
+        if version != cls.get_snapshot_version():
+            cls.logger.info('ignore workflow snapshot [{}] of other parser sources'.format(filepath))
+            return None
+
+        obj = cls()
+        obj.__dict__.update(state)
+
+        return obj
+
+    # assigning workflows or script_process_map drops the process name index built from them,
+    # the maps are kept in __dict__ under their names, so vars() and snapshots hold them as before
+    @property
+    def workflows(self):
+        return self.__dict__['workflows']
+
+    @workflows.setter
+    def workflows(self, workflows):
+        self.__dict__['workflows'] = workflows
+        self.process_name_index = None
+
+    @property
+    def script_process_map(self):
+        return self.__dict__['script_process_map']
+
+    @script_process_map.setter
+    def script_process_map(self, script_process_map):
+        self.__dict__['script_process_map'] = script_process_map
+        self.process_name_index = None
+
+    def clear_caches(self):
+        ''' Drop the indexes and the resolved params, needed only if maps or config dicts were changed in place
+        '''
+        self.process_name_index = None
+        self.reachability_index = None
+        self.param_templates = {}
+        self.param_maps = {}
+
+    def get_process_name_index(self):
+        ''' Index of workflows and script_process_map, dropped when either is assigned
+        '''
+        if self.process_name_index is None:
+            self.process_name_index = ProcessNameIndex(self.workflows, self.script_process_map)
+
+        return self.process_name_index
+
 
 class WorkflowParser(object):
     logger = logging.getLogger(__name__)
 
+    DEFAULT_OUTPUT_FORMATS = ['gexf', 'dot', 'pdf', 'svg']
+
+    # below this, starting worker processes costs more than parsing the configs
+    PARALLEL_MIN_FILES = 200
+
     def __init__(self):
-        pass
+        self.render_policy = RenderPolicy.from_config_file()
 
     def is_master_config(self, root):
         return root.find('SqlConnectionString') is not None
@@ -82,6 +196,37 @@ class WorkflowParser(object):
         except Exception as ex:
             self.logger.debug('{}: {}'.format(filepath, ex))
 
+    def parse_config_file(self, filepath):
+        ''' :return: (config dict or None, error message or None), the error if the file is not well-formed
+        '''
+        try:
+            return self.parse_file(filepath), None
+        except Exception as e:
+            return None, str(e)
+
+    def parse_config_files(self, filepaths, process_no=1):
+        ''' Parse configs in process_no worker processes
+
+        :param process_no: number of worker processes, None for cpu count, 1 to parse in this process
+        :return: list of parse_config_file results, in the order of filepaths
+        '''
+        if process_no is None:
+            process_no = os.cpu_count() or 1
+
+        process_no = min(process_no, len(filepaths))
+
+        if process_no > 1 and len(filepaths) >= self.PARALLEL_MIN_FILES:
+            import multiprocessing as mp
+
+            # workers of a pool can't start processes themselves
+            if not mp.current_process().daemon:
+                chunksize = max(1, len(filepaths) // (process_no * 4))
+
+                with mp.Pool(processes=process_no) as pool:
+                    return list(pool.imap(self.parse_config_file, filepaths, chunksize=chunksize))
+
+        return [self.parse_config_file(filepath) for filepath in filepaths]
+
     def normalized_delta_interval(self, interval_str):
         ''' Only support D and H
 
@@ -104,36 +249,21 @@ class WorkflowParser(object):
         return interval_str[:interval_str.index(':')].lstrip('0') + 'H'
 
     def get_closest_process_name(self, process_key, workflow_obj):
+        ''' See ProcessNameIndex.get_closest
+        '''
         self.logger.debug('get_closest_process_name, process_key [{}]'.format(process_key))
 
-        process_names = workflow_obj.workflows.keys()
-        script_process_map = workflow_obj.script_process_map
-
-        if process_key in process_names:
-            return process_key
-
-        if process_key in script_process_map:
-            return script_process_map[process_key]
+        return workflow_obj.get_process_name_index().get_closest(process_key)
 
-        process_key_core = os.path.splitext(process_key)[0]
-        # such as key [NKWOptMPIProcessing] and script [NKWOptMPIProcessing3.script]
-        for script_name in script_process_map:
-            if process_key_core in script_name:
-                return script_process_map[script_name]
-
-        # use edit distance to identify the closest one
-        min_key = process_key
-        min_dist = len(process_key) * 2  # just a big enough value
-
-        for key in process_names:
-            dist = editdistance.eval(key, process_key)
-            if dist < min_dist:
-                min_dist = dist
-                min_key = key
-
-        return min_key
-
-    def parse_folder(self, folder_root, exclude_keys=[]):
+    def parse_folder(self, folder_root, exclude_keys=[], process_no=1, previous=None):
+        '''
+        :param process_no: number of processes parsing the configs, None for cpu count. Results are
+                           merged in file order, the first occurrence of a master config or script wins
+                           as when parsing in one process
+        :param previous: WorkflowObj of an earlier parse of folder_root, its results of configs with
+                         the same mtime and size are used instead of parsing them again
+        :return: WorkflowObj, previous itself if no config changed
+        '''
         files = FileUtility.list_files_recursive(folder_root, target_suffix='.config')
 
         masters = {}            # config_filename -> master config dict
@@ -150,6 +280,8 @@ class WorkflowParser(object):
 
         exclude_keys.append('/objd/') # by default, ignore this
 
+        target_files = []
+
         for filepath in files:
             b_exclude = False
             for key in exclude_keys:
@@ -161,11 +293,43 @@ class WorkflowParser(object):
             if b_exclude:
                 continue
 
-            self.logger.debug('parse_folder: filepath = {}'.format(filepath))
+            target_files.append(filepath)
+
+        config_stats = {}
+        config_results = {}
+        changed_files = []
+
+        for filepath in target_files:
             try:
-                d = self.parse_file(filepath)
-            except Exception as e:
-                self.logger.warning('skip wrongly parsed file [{}]: {}'.format(filepath, e))
+                st = os.stat(filepath)
+                config_stats[filepath] = (st.st_mtime_ns, st.st_size)
+            except OSError:
+                config_stats[filepath] = None
+
+            if previous is not None and config_stats[filepath] is not None and previous.config_stats.get(filepath) == config_stats[filepath]:
+                config_results[filepath] = previous.config_results[filepath]
+            else:
+                changed_files.append(filepath)
+
+        if previous is not None:
+            self.logger.info('parse {} of {} configs, {} removed'.format(len(changed_files),
+                                                                         len(target_files),
+                                                                         len(set(previous.config_stats) - set(config_stats))))
+
+            # the same files in the same order, nothing to merge again
+            if not changed_files and list(config_stats.items()) == list(previous.config_stats.items()):
+                return previous
+
+        for filepath, result in zip(changed_files, self.parse_config_files(changed_files, process_no=process_no)):
+            config_results[filepath] = result
+
+        # merge in file order, derived maps are built from the per file results
+        for filepath in target_files:
+            d, error = config_results[filepath]
+            self.logger.debug('parse_folder: filepath = {}'.format(filepath))
+
+            if error is not None:
+                self.logger.warning('skip wrongly parsed file [{}]: {}'.format(filepath, error))
                 continue
 
             if d is None:
@@ -247,6 +411,30 @@ class WorkflowParser(object):
         obj.script_process_map = script_process_map
         obj.event_interval_map = event_interval_map
 
+        obj.config_stats = config_stats
+        obj.config_results = config_results
+
+        if previous is not None:
+            # entries are checked against the config dicts they were made from
+            obj.param_templates = dict(previous.param_templates)
+            obj.param_maps = dict(previous.param_maps)
+
+        return obj
+
+    def load_folder(self, folder_root, snapshot_filepath, exclude_keys=[], process_no=1):
+        ''' parse_folder starting from the snapshot at snapshot_filepath, which is updated if a config changed
+
+        :return: WorkflowObj
+        '''
+        previous = WorkflowObj.load(snapshot_filepath)
+        obj = self.parse_folder(folder_root, exclude_keys=exclude_keys, process_no=process_no, previous=previous)
+
+        if previous is None or obj.config_stats != previous.config_stats:
+            try:
+                obj.save(snapshot_filepath)
+            except OSError as ex:
+                self.logger.warning('failed to save workflow snapshot [{}]: {}'.format(snapshot_filepath, ex))
+
         return obj
 
     def print_obj(self, workflow_obj):
@@ -272,16 +460,42 @@ class WorkflowParser(object):
         self.logger.debug('resolve_param of [{}]'.format(param_str))
         self.logger.debug('master_params = [{}]'.format(master_params))
 
-        for match in re.findall(r'\$\(.*?\)', param_str):
-            param = match[2:-1]
+        return ParamTemplate.replace_params(master_params, param_str)
 
-            if param in master_params:
-                if master_params[param] is None:
-                    continue
+    def get_param_templates(self, workflow_obj, process_name):
+        ''' -params items of the ScopeJobParams of a process, split once per WorkflowObj
+
+        :return: list of (param name, ParamTemplate)
+        '''
+        workflow = workflow_obj.workflows[process_name]
+        entry = workflow_obj.param_templates.get(process_name)
+
+        if entry is not None and entry[0] is workflow:
+            return entry[1]
+
+        templates = []
 
-                param_str = param_str.replace(match, master_params[param])
+        for item in workflow['ScopeJobParams']:
+            if '-params' not in item:
+                continue
 
-        return param_str.replace('\\"', '"')
+            _, target = item.split()
+            # one params can map multiple params
+            # e.g. -params Date=\"{yyyy-MM-dd}\",hour={HH}
+
+            if ',' in target:
+                targets = target.split(',')
+            else:
+                targets = [target,]
+
+            for target in targets:
+                key = target[:target.index('=')]
+                value = target[target.index('=') + 1:]
+                templates.append((key, ParamTemplate(value.strip())))
+
+        workflow_obj.param_templates[process_name] = (workflow, templates)
+
+        return templates
 
     def get_params(self, workflow_obj, process_name, master_key=None):
         obj = workflow_obj
@@ -294,32 +508,23 @@ class WorkflowParser(object):
             master_key = obj.process_master_map[process_name]
 
         master_params = obj.masters[master_key]['parameters']
-        job_params = obj.workflows[process_name]['ScopeJobParams']
+        workflow = obj.workflows[process_name]
 
         self.logger.debug('master_key = {}'.format(master_key))
-        self.logger.debug('master_params = {}'.format(master_params))
 
-        param_map = {}
+        entry = obj.param_maps.get((process_name, master_key))
 
-        for item in job_params:
-            if '-params' not in item:
-                continue
+        if entry is None or entry[0] is not workflow or entry[1] is not master_params:
+            param_map = {}
 
-            _, target = item.split()
-            # one params can map multiple params
-            # e.g. -params Date=\"{yyyy-MM-dd}\",hour={HH}
+            for key, template in self.get_param_templates(obj, process_name):
+                param_map[key] = template.resolve(master_params)
 
-            if ',' in target:
-                targets = target.split(',')
-            else:
-                targets = [target,]
+            entry = (workflow, master_params, param_map)
+            obj.param_maps[(process_name, master_key)] = entry
 
-            for target in targets:
-                key = target[:target.index('=')]
-                value = target[target.index('=') + 1:]
-                param_map[key] = self.resolve_param(master_params, value.strip())
-
-        return param_map
+        # callers add to and change the map
+        return dict(entry[2])
 
     def print_params(self, workflow_obj, process_name, resolve=False):
         param_map = self.get_params(workflow_obj, process_name)
@@ -358,134 +563,87 @@ class WorkflowParser(object):
                     # external
                     attr['fillcolor'] = 'gray'
 
-    def filter_objects(self, adj_map, rev_map, nodes_map, type_='SCRIPT'):
+    def filter_objects(self, dep_graph, nodes, type_='SCRIPT'):
         ''' To remove event nodes, reserve script mapping only
 
         current graph is script -> event -> script -> event -> ...
 
-        :param adj_map: adjacency map (a -> (node_b, node_c))
-        :param rev_map: reverse map (b -> (node_a, node_d))
-        :param nodes_map: contains all nodes by now
+        :param dep_graph: CsrGraph of node names
+        :param nodes: Node of each id of dep_graph
         :return: the new nodes and edges
         '''
+        new_nodes = set()
+        edge_pairs = set()
 
-        # reconstruct edges from nodes
-        nodes = set()
-        edges = set()
+        for i in range(dep_graph.node_count):
+            if dep_graph.out_degree(i) == 0:
+                continue
 
-        for from_name in adj_map:
-            from_node = nodes_map[from_name]
+            node_type = nodes[i].attr['type']
 
             # always keep root event node
-            if from_node.attr['type'] == 'EVENT' and from_name not in rev_map:
-                nodes.add(from_node)
+            if node_type == 'EVENT' and dep_graph.in_degree(i) == 0:
+                new_nodes.add(i)
+                edge_pairs.update((i, j) for j in dep_graph.successors(i))
 
-                for to_node in adj_map[from_name]:
-                    edges.add(Edge(from_node, to_node))
-
-            if from_node.attr['type'] != type_:
+            if node_type != type_:
                 continue
 
-            nodes.add(from_node)
-
-            for to_node in adj_map[from_name]:
-                to_name = to_node.name
+            new_nodes.add(i)
 
-                # map child's children to parent
-                if to_name in adj_map:
-                    for grand_to_node in adj_map[to_name]:
-                        edges.add(Edge(from_node, grand_to_node))
+            # map child's children to parent
+            for j in dep_graph.successors(i):
+                edge_pairs.update((i, k) for k in dep_graph.successors(j))
 
-        return nodes, edges
+        return {nodes[i] for i in new_nodes}, [Edge(nodes[i], nodes[j]) for i, j in edge_pairs]
 
-    def get_target_objects(self, adj_map, rev_map, nodes_map, target_node_names=[]):
+    def get_target_objects(self, dep_graph, nodes, target_node_names=[]):
         ''' To reserve only nodes related to target nodes
 
-        The relationship is defined as up(direct parent node), down(all children node)
+        The relationship is defined as up(all parent nodes), down(all children nodes)
 
-        :param adj_map: adjacency map (a -> (node_b, node_c))
-        :param rev_map: reverse map (b -> (node_a, node_d))
-        :param nodes_map: contains all nodes by now
+        :param dep_graph: CsrGraph of node names
+        :param nodes: Node of each id of dep_graph
         :param target_node_names: if specified, only trace 'related' nodes
         :return: the new nodes and edges
         '''
-        target_map = {}
+        target_ids = []
 
         # init
         for node_name in target_node_names:
-            if node_name not in nodes_map:
+            if node_name not in dep_graph.ids:
                 self.logger.info('specified node [{}] not in node_map. skip.'.format(node_name))
                 continue
 
-            target_map[node_name] = set(['up', 'down'])
+            target_ids.append(dep_graph.ids[node_name])
 
             # highlight target nodes
-            nodes_map[node_name].attr['style'] = 'filled'
-            nodes_map[node_name].attr['fillcolor'] = 'yellow'
+            nodes[target_ids[-1]].attr['style'] = 'filled'
+            nodes[target_ids[-1]].attr['fillcolor'] = 'yellow'
 
-        # reconstruct edges from nodes
-        nodes = set()
-        edges = set()
-        visited = set()
+        down_ids = dep_graph.traverse(target_ids)
+        # a target without children is not traced up
+        up_ids = dep_graph.traverse([i for i in target_ids if dep_graph.out_degree(i) > 0], reverse=True)
 
-        while len(target_map) > 0:
-            target_name, mode_list = target_map.popitem()
+        # all out edges of the nodes traced down, and in edges of the nodes traced up unless already there
+        edges = [Edge(nodes[i], nodes[j]) for i in down_ids for j in dep_graph.successors(i)]
 
-            the_node = nodes_map[target_name]
+        is_down = bytearray(dep_graph.node_count)
+        for i in down_ids:
+            is_down[i] = 1
 
-            visited_key = '{}.{}'.format(the_node, mode_list)
-            if visited_key in visited:
-                continue
-            visited.add(visited_key)
+        edges.extend(Edge(nodes[i], nodes[j]) for j in up_ids for i in dep_graph.predecessors(j) if not is_down[i])
 
-            nodes.add(the_node)
+        new_nodes = {nodes[i] for i in down_ids}
+        new_nodes.update(nodes[i] for i in up_ids)
 
-            if 'down' in mode_list:
-                if target_name not in adj_map:
-                    continue
-
-                for to_node in adj_map[target_name]:
-                    nodes.add(to_node)
-
-                    if to_node.name not in target_map:
-                        target_map[to_node.name] = set()
+        return new_nodes, edges
 
-                    target_map[to_node.name].add('down')
-                    edges.add(Edge(the_node, to_node))
-
-            if 'up' in mode_list:
-                if target_name not in rev_map:
-                    continue
+    def get_dep_objects(self, workflow_obj):
+        ''' Nodes and edges of the dependency graph, script -> output event -> script waiting for it
 
-                for from_node in rev_map[target_name]:
-                    nodes.add(from_node)
-
-                    if from_node.name not in target_map:
-                        target_map[from_node.name] = set()
-
-                    target_map[from_node.name].add('up')
-                    edges.add(Edge(from_node, the_node))
-
-        return nodes, edges
-
-    def update_adj_map(self, src_node, dest_node, adj_map, rev_map):
-        src_name = src_node.name
-        dest_name = dest_node.name
-
-        if not src_name in adj_map:
-            adj_map[src_name] = set()
-
-        if not dest_name in rev_map:
-            rev_map[dest_name] = set()
-
-        adj_map[src_name].add(dest_node)
-        rev_map[dest_name].add(src_node)
-
-    def to_workflow_dep_graph(self,
-                              workflow_obj,
-                              dest_filepath=None,
-                              target_node_names=[],
-                              filter_type=None):
+        :return: (node name -> Node, edges, (from name, to name) of the edges)
+        '''
         obj = workflow_obj
 
         event_deps = obj.process_event_deps
@@ -496,8 +654,8 @@ class WorkflowParser(object):
         nodes_map = {}
         edges = []
 
-        adj_map = {}
-        rev_map = {}
+        # (from name, to name) for target filtering
+        dep_edges = []
 
         for process_name in workflows:
             # only show those enabled in master config
@@ -533,8 +691,7 @@ class WorkflowParser(object):
             script_out_event_node = nodes_map.get(output_event_name)
             # add edge
             edges.append(Edge(script_node, script_out_event_node))
-            # for target filtering
-            self.update_adj_map(script_node, script_out_event_node, adj_map, rev_map)
+            dep_edges.append((script_name, output_event_name))
 
             # input events
             dep_events = event_deps[process_name]
@@ -557,8 +714,7 @@ class WorkflowParser(object):
 
                 # add edge
                 edges.append(Edge(script_in_event_node, script_node))
-                # for target filtering
-                self.update_adj_map(script_in_event_node, script_node, adj_map, rev_map)
+                dep_edges.append((normalized_event_name, script_name))
 
         # update event interval
         for node_name in nodes_map:
@@ -572,36 +728,141 @@ class WorkflowParser(object):
                 nodes_map[node_name].attr['label'] += ' ({})'.format(interval)
                 nodes_map[node_name].attr['interval'] = interval
 
+        return nodes_map, edges, dep_edges
+
+    def get_reachability_index(self, workflow_obj):
+        ''' ReachabilityIndex of the dependency graph, built on the first call for workflow_obj
+
+        :return: (Node of each id, ReachabilityIndex)
+        '''
+        if workflow_obj.reachability_index is None:
+            nodes_map, _, dep_edges = self.get_dep_objects(workflow_obj)
+            workflow_obj.reachability_index = (list(nodes_map.values()), ReachabilityIndex(CsrGraph(nodes_map, dep_edges)))
+
+        return workflow_obj.reachability_index
+
+    def to_workflow_dep_graph(self,
+                              workflow_obj,
+                              dest_filepath=None,
+                              target_node_names=[],
+                              filter_type=None,
+                              output_formats=None,
+                              render=True):
+        '''
+        :param output_formats: formats written to dest_filepath, default DEFAULT_OUTPUT_FORMATS
+        :param render: False to only write the dot file for formats rendered by graphviz
+        :return: list of written files
+        '''
+        if output_formats is None:
+            output_formats = self.DEFAULT_OUTPUT_FORMATS
+
+        nodes_map, edges, dep_edges = self.get_dep_objects(workflow_obj)
+
         self.logger.debug('node_map.keys = {}'.format(nodes_map.keys()))
 
+        if target_node_names or filter_type:
+            dep_graph = CsrGraph(nodes_map, dep_edges)
+            dep_nodes = list(nodes_map.values())
+
         if target_node_names:
-            nodes, edges = self.get_target_objects(adj_map,
-                                                   rev_map,
-                                                   nodes_map,
-                                                   target_node_names=target_node_names)
+            nodes, edges = self.get_target_objects(dep_graph, dep_nodes, target_node_names=target_node_names)
         else:
             nodes = nodes_map.values()
 
         # for now not support target_node_names go together with filter
         if filter_type:
-            nodes, edges = self.filter_objects(adj_map, rev_map, nodes_map, type_=filter_type)
+            nodes, edges = self.filter_objects(dep_graph, dep_nodes, type_=filter_type)
 
         if dest_filepath:
-            self.logger.info('change node color for output')
-            self.change_node_color(nodes)
+            return self.write_dep_graph(nodes, edges, dest_filepath, output_formats, render=render)
+
+        return []
+
+    def write_dep_graph(self, nodes, edges, dest_filepath, output_formats, render=True):
+        ''' :return: list of written files
+        '''
+        self.logger.info('change node color for output')
+        self.change_node_color(nodes)
+
+        # ids are node names, sort so that the same workflows give the same output files
+        nodes = sorted(nodes, key=lambda node: str(node.attr['id']))
+        edges = sorted(edges, key=lambda edge: (str(edge.from_.attr['id']), str(edge.to_.attr['id'])))
+
+        output_files = GraphUtility(nodes, edges).to_files(dest_filepath,
+                                                           output_formats,
+                                                           render=render,
+                                                           render_policy=self.render_policy)
+
+        for output_file in output_files:
+            self.logger.info('output file to [{}]'.format(output_file))
+
+        return output_files
+
+    def get_dep_node_ids(self, workflow_obj, node_names):
+        ''' :param node_names: names of scripts, events or processes, the script of a process is taken
+        :return: ids in the ReachabilityIndex of the names found
+        '''
+        _, index = self.get_reachability_index(workflow_obj)
+        ids = []
+
+        for node_name in node_names:
+            if node_name not in index.graph.ids and node_name in workflow_obj.workflows:
+                node_name = os.path.basename(workflow_obj.workflows[node_name]['ScriptFile'])
+
+            if node_name not in index.graph.ids:
+                self.logger.info('specified node [{}] not in node_map. skip.'.format(node_name))
+                continue
+
+            ids.append(index.graph.ids[node_name])
+
+        return ids
+
+    def path_exists(self, workflow_obj, from_node_name, to_node_name):
+        ''' :return: True if to_node_name depends on from_node_name through any chain of events, None if either is unknown
+        '''
+        _, index = self.get_reachability_index(workflow_obj)
+        ids = self.get_dep_node_ids(workflow_obj, [from_node_name, to_node_name])
+
+        if len(ids) < 2:
+            return None
+
+        return index.path_exists(ids[0], ids[1])
+
+    def get_reachable_objects(self, workflow_obj, node_names, up=True, down=True):
+        ''' Like get_target_objects, from the ReachabilityIndex instead of a traversal
+
+        :param up: add the nodes the targets depend on
+        :param down: add the nodes depending on the targets
+        :return: the new nodes and edges, nodes are copies with the targets highlighted
+        '''
+        dep_nodes, index = self.get_reachability_index(workflow_obj)
+        target_ids = self.get_dep_node_ids(workflow_obj, node_names)
+
+        # edges between the nodes of each side, those are all the edges of the traced paths
+        id_sets = []
+
+        if down:
+            id_sets.append(index.downstream(target_ids))
+
+        if up:
+            id_sets.append(index.upstream(target_ids))
 
-            gu = GraphUtility(nodes, edges)
+        edge_pairs = set()
+        for ids in id_sets:
+            edge_pairs.update(index.get_edges(ids))
 
-            gexf_output_file = gu.to_gexf_file(dest_filepath)
-            self.logger.info('output .gexf file to [{}]'.format(gexf_output_file))
+        # the cached nodes are shared by queries, the output changes their colors
+        nodes = {}
+        for ids in id_sets:
+            for i in ids:
+                if i not in nodes:
+                    nodes[i] = Node(dep_nodes[i].name, attr=dep_nodes[i].attr)
 
-            dot_output_file = gu.to_dot_file(dest_filepath)
-            self.logger.info('output .dot file to [{}]'.format(dot_output_file))
+        for i in target_ids:
+            nodes[i].attr['style'] = 'filled'
+            nodes[i].attr['fillcolor'] = 'yellow'
 
-            self.logger.info('render graphviz file pdf')
-            gu.dot_to_graphviz(dot_output_file, format='pdf')
-            self.logger.info('render graphviz file svg')
-            gu.dot_to_graphviz(dot_output_file, format='svg')
+        return list(nodes.values()), [Edge(nodes[i], nodes[j]) for i, j in edge_pairs]
 
 
 
@@ -1,6 +1,7 @@
 import json
 from pyparsing import *
 from scope_parser.common import Common
+from scope_parser.common import BalancedSkipTo
 from scope_parser.select import Select
 
 
@@ -36,6 +37,23 @@ class Combine(object):
 
     assing_combine = Combine(ident)('assign_var') + '=' + combine_with
 
+    # lineage-only: ON condition is skipped up to USING instead of being parsed
+    on_skip = BalancedSkipTo(['USING'])
+
+    lineage_combine_with = COMBINE + \
+                           Combine(combine_source)('source_1') + Optional(as_something) + \
+                           Optional(PRESORT + ident) + \
+                           WITH + \
+                           Combine(combine_source)('source_2') + Optional(as_something) + \
+                           Optional(PRESORT + ident) + \
+                           Optional(ON + on_skip) + \
+                           USING + (func | func_ptr)('using')
+
+    lineage_assign_combine = Combine(ident)('assign_var') + '=' + lineage_combine_with
+
+    def __init__(self, lineage_only=False):
+        self.lineage_only = lineage_only
+
     def debug(self):
         print(self.combine_with.parseString('''
             COMBINE Suggestions AS L WITH OrderTermBag AS R ON L.OrderId == R.OrderId USING SuggestionTfCombiner("TFIDF");
@@ -48,7 +66,10 @@ class Combine(object):
             'using': None
         }
 
-        d = self.assing_combine.parseString(s)
+        if self.lineage_only:
+            d = self.lineage_assign_combine.parseString(s)
+        else:
+            d = self.assing_combine.parseString(s)
 
 #        print('-' *20)
 #        print(json.dumps(d.asDict(), indent=4))
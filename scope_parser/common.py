@@ -1,6 +1,123 @@
 from pyparsing import *
 
 
+class BalancedSkipTo(Token):
+    ''' Skip over free-form text up to the first stop keyword at bracket depth 0
+
+    Strings, comments and (), [], {} pairs are stepped over as a whole, so keywords inside
+    them never stop the scan. An unmatched closing bracket also stops it (end of a nested select).
+    Used by lineage-only grammars to skip clauses whose content does not affect the sources.
+    '''
+    ident_chars = set(alphanums + '_@')
+    open_brackets = {'(': ')', '[': ']', '{': '}'}
+    close_brackets = set(')]}')
+
+    def __init__(self, stop_keywords):
+        super(BalancedSkipTo, self).__init__()
+        self.stop_keywords = tuple(stop_keywords)
+        self.name = 'BalancedSkipTo({})'.format(', '.join(self.stop_keywords))
+        self.errmsg = 'Expected ' + self.name
+        self.mayReturnEmpty = False
+        self.mayIndexError = False
+
+    def is_stop_keyword(self, instring, loc):
+        if loc > 0 and instring[loc - 1] in self.ident_chars:
+            return False
+
+        for keyword in self.stop_keywords:
+            if not instring.startswith(keyword, loc):
+                continue
+
+            end = loc + len(keyword)
+            if end < len(instring) and instring[end] in self.ident_chars:
+                continue
+
+            return True
+
+        return False
+
+    def skip_quoted(self, instring, loc):
+        quote = instring[loc]
+        loc += 1
+
+        while loc < len(instring):
+            c = instring[loc]
+
+            if c == '\\':
+                loc += 2
+                continue
+
+            if c == quote:
+                return loc + 1
+
+            loc += 1
+
+        return loc
+
+    def skip_verbatim(self, instring, loc):
+        ''' C# verbatim string @"...", the quote at loc: a backslash is a plain char and "" a quote
+        '''
+        loc += 1
+
+        while loc < len(instring):
+            quote = instring.find('"', loc)
+
+            if quote < 0:
+                break
+
+            if not instring.startswith('""', quote):
+                return quote + 1
+
+            loc = quote + 2
+
+        return len(instring)
+
+    def parseImpl(self, instring, loc, doActions=True):
+        start = loc
+        end = len(instring)
+        stack = []
+
+        while loc < end:
+            c = instring[loc]
+
+            if c == '@' and instring.startswith('@"', loc):
+                loc = self.skip_verbatim(instring, loc + 1)
+                continue
+
+            if c in '"\'':
+                loc = self.skip_quoted(instring, loc)
+                continue
+
+            if c == '/' and instring.startswith('//', loc):
+                newline = instring.find('\n', loc)
+                loc = end if newline < 0 else newline
+                continue
+
+            if c == '/' and instring.startswith('/*', loc):
+                close = instring.find('*/', loc + 2)
+                loc = end if close < 0 else close + 2
+                continue
+
+            if c in self.open_brackets:
+                stack.append(self.open_brackets[c])
+            elif c in self.close_brackets:
+                if not stack:
+                    break
+
+                stack.pop()
+            elif not stack and self.is_stop_keyword(instring, loc):
+                break
+
+            loc += 1
+
+        skipped = instring[start:loc].strip()
+
+        if not skipped:
+            raise ParseException(instring, start, self.errmsg, self)
+
+        return loc, skipped
+
+
 class Common(object):
     comment = "//" + restOfLine
     ident = Group(Word('_<>*' + alphanums)).setName("identifier")
@@ -21,6 +21,7 @@ class Output(object):
     func = Common.func
 
     select_stmt = Select.select_stmt
+    lineage_select_stmt = Select.lineage_select_stmt
 
     with_streamexpiry = Group(WITH_STREAMEXPIRY + value_str)
     partitioned_by = PARTITIONED_BY + ident
@@ -40,6 +41,20 @@ class Output(object):
 
     output = output_sstream
 
+    # lineage-only: inline SELECT skips its column list and conditions
+    lineage_output_sstream = OUTPUT + (((ident('ident') | lineage_select_stmt) + Optional(using) + TO) | Optional(using) + TO) + Optional(SSTREAM)('sstream') + value_str('path') + \
+                             Optional(clustered_by) + \
+                             Optional(sorted_by) + \
+                             Optional(partitioned_by)('partition') + \
+                             Optional(with_streamexpiry) + \
+                             Optional(simple_where) + \
+                             Optional(using)
+
+    lineage_output = lineage_output_sstream
+
+    def __init__(self, lineage_only=False):
+        self.lineage_only = lineage_only
+
     def parse(self, s):
         # specific output for our purpose
         ret = {
@@ -49,7 +64,10 @@ class Output(object):
             'attributes': set()
         }
 
-        data = self.output.parseString(s)
+        if self.lineage_only:
+            data = self.lineage_output.parseString(s)
+        else:
+            data = self.output.parseString(s)
 
 #        print('-' *20)
 #        print(json.dumps(data.asDict(), indent=4))
@@ -1,5 +1,6 @@
 from pyparsing import *
-from scope_parser.common import Common
+from scope_parser.common import Common, BalancedSkipTo
+from scope_parser.select import Select
 
 class Process(object):
     PROCESS = Keyword("PROCESS")
@@ -15,13 +16,25 @@ class Process(object):
     using_func = USING + (func | func_ptr)('using')
     process_implicit = PROCESS + Optional(PRODUCE + produce_schema) + using_func
     process_explicit = PROCESS + Combine(ident)('source') + Optional(PRODUCE + produce_schema) + using_func
-    process_select = PROCESS + '(' + Regex('[^\(\)]+') + ')' + using_func
+    process_select = PROCESS + '(' + Regex(r'[^()]+')('inner_select') + ')' + using_func
     process_stmt = process_explicit | process_implicit | process_select
 
     assign_process_stmt = Combine(ident)('assign_var') + '=' + process_stmt
 
     process_both = assign_process_stmt | process_stmt
 
+    # lineage-only: inner SELECT is skipped as a whole, nested parentheses allowed
+    lineage_process_select = PROCESS + '(' + BalancedSkipTo([])('inner_select') + ')' + using_func
+    lineage_process_stmt = process_explicit | process_implicit | lineage_process_select
+
+    lineage_assign_process_stmt = Combine(ident)('assign_var') + '=' + lineage_process_stmt
+
+    lineage_process_both = lineage_assign_process_stmt | lineage_process_stmt
+
+    def __init__(self, lineage_only=False):
+        self.lineage_only = lineage_only
+        self.select = Select(lineage_only=lineage_only)
+
     def parse(self, s):
         ret = {
             'assign_var': None,
@@ -29,12 +42,22 @@ class Process(object):
             'using': None
         }
 
-        d = self.process_both.parseString(s)
+        if self.lineage_only:
+            d = self.lineage_process_both.parseString(s)
+        else:
+            d = self.process_both.parseString(s)
 
         ret['assign_var'] = d.get('assign_var', None)
         if 'source' in d:
             ret['sources'].add(d['source'])
 
+        # the sources of PROCESS (SELECT ...) are those of the inner select
+        if 'inner_select' in d:
+            try:
+                ret['sources'].update(self.select.parse(d['inner_select'])['sources'])
+            except ParseException:
+                pass
+
         ret['using'] = d['using'][0]
 
         return ret
@@ -17,6 +17,7 @@ class Reduce(object):
     func_ptr = Common.func_ptr
 
     select_stmt = Select.select_stmt
+    lineage_select_stmt = Select.lineage_select_stmt
 
     on = ON + delimitedList(ident)('on')
     presort = PRESORT + delimitedList(ident + Optional(oneOf('DESC ASC')))('presort')
@@ -31,6 +32,16 @@ class Reduce(object):
     assign_reduce = Combine(ident)('assign_var') + '=' + reduce
     reduce_stmt = assign_reduce | reduce
 
+    # lineage-only: inner SELECT skips its column list and conditions
+    lineage_reduce_explicit = REDUCE + (Combine(ident)('source') | lineage_select_stmt('select_stmt')) + recude_each
+    lineage_reduce = lineage_reduce_explicit | reduce_implicit
+
+    lineage_assign_reduce = Combine(ident)('assign_var') + '=' + lineage_reduce
+    lineage_reduce_stmt = lineage_assign_reduce | lineage_reduce
+
+    def __init__(self, lineage_only=False):
+        self.lineage_only = lineage_only
+
     def debug(self):
         print(self.using.parseString('USING GroupingReducer("SuggKW", "3")'))
         print(self.presort.parseString('PRESORT Score DESC'))
@@ -42,7 +53,10 @@ class Reduce(object):
             'using': None
         }
 
-        d = self.reduce_stmt.parseString(s)
+        if self.lineage_only:
+            d = self.lineage_reduce_stmt.parseString(s)
+        else:
+            d = self.reduce_stmt.parseString(s)
 
 #        print('-' *20)
 #        print(json.dumps(d.asDict(), indent=4))
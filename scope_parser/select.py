@@ -1,5 +1,5 @@
 from pyparsing import *
-from scope_parser.common import Common
+from scope_parser.common import Common, BalancedSkipTo
 from scope_parser.input import Input
 import json
 import re
@@ -183,8 +183,50 @@ class Select(object):
 
     assign_select_stmt = (Combine(ident)("assign_var") + '=' + select_stmt).ignore(comment)
 
-    def __init__(self):
-        pass
+    # lineage-only grammar: same source structure, but column list, WHERE and JOIN ON conditions
+    # are skipped by bracket-aware scanning instead of being parsed
+    set_op_keywords = ['UNION', 'EXCEPT', 'HAVING', 'SELECT']
+    join_keywords = ['JOIN', 'SEMIJOIN', 'ANTISEMIJOIN', 'PAIR', 'CROSS',
+                     'LEFT', 'RIGHT', 'OUTER', 'INNER', 'FULL', 'HASH', 'BROADCASTRIGHT']
+
+    column_skip = BalancedSkipTo(['FROM', 'WHERE', 'UNION', 'EXCEPT', 'HAVING'])
+    where_skip = BalancedSkipTo(set_op_keywords)
+    on_skip = BalancedSkipTo(join_keywords + ['WHERE'] + set_op_keywords)
+
+    lineage_select_stmt = Forward()
+
+    lineage_join_stmt = join + table_name("join_table_name*") + Optional(AS + ident) + ON + on_skip
+    lineage_union_select = OneOrMore(union + Optional('(') + lineage_select_stmt + Optional(')'))
+    lineage_except_select = OneOrMore(except_ + Optional('(') + lineage_select_stmt + Optional(')'))
+
+    lineage_from_select = Group(Optional('(') + lineage_select_stmt + Optional(')') + Optional(as_something).suppress())
+    lineage_from_stmt = FROM + (lineage_from_select("from_select") |
+                                from_module("module") |
+                                from_view("view") |
+                                from_sstream_streamset("sstream_streamset") |
+                                from_sstream("sstream") |
+                                from_extract("extract") |
+                                table_name_list("tables"))
+
+    lineage_select_stmt <<= (SELECT +
+                             Optional(DISTINCT) +
+                             Optional(top_n) +
+                             column_skip("columns") +
+                             Optional(lineage_from_stmt)("from") +
+                             ZeroOrMore(lineage_join_stmt | cross_join_stmt) +
+                             Optional(cross_apply_stmt) +
+                             Optional(Group(WHERE + where_skip))("where") +
+                             Optional(Group(lineage_union_select))('union') +
+                             Optional(Group(lineage_except_select))('except_') +
+                             Optional(lineage_select_stmt) +
+                             Optional(having))
+
+    lineage_select_stmt = Optional('(') + lineage_select_stmt + Optional(')') + Optional(Group(lineage_union_select))('union')
+
+    lineage_assign_select_stmt = (Combine(ident)("assign_var") + '=' + lineage_select_stmt).ignore(comment)
+
+    def __init__(self, lineage_only=False):
+        self.lineage_only = lineage_only
 
     def debug(self):
         print(self.func_as.parseString('''
@@ -216,9 +258,15 @@ class Select(object):
         return self.one_column.parseString(s)
 
     def parse_select(self, s):
+        if self.lineage_only:
+            return self.lineage_select_stmt.parseString(s)
+
         return self.select_stmt.parseString(s)
 
     def parse_assign_select(self, s):
+        if self.lineage_only:
+            return self.lineage_assign_select_stmt.parseString(s)
+
         return self.assign_select_stmt.parseString(s)
 
     def add_source(self, sources, parsed_result):
@@ -0,0 +1,158 @@
+''' Up/down trace of WorkflowParser.get_target_objects on CsrGraph against the string keyed maps of Node sets
+
+The graph is a synthetic script -> event -> script graph of workflow groups: scripts wait
+for events of earlier scripts of their group and now and then for an event of another group.
+Both sides build their adjacency from the same edges, then trace the same targets. Time and
+the tracemalloc peak memory of building the adjacency and tracing are measured in separate runs.
+
+usage (from repo root): python -m tests.benchmark.dep_graph_trace_benchmark [script_count] [target_count]
+'''
+import sys
+import time
+import random
+import tracemalloc
+from graph.node import Node
+from graph.edge import Edge
+from graph.csr_graph import CsrGraph
+from myparser.workflow_parser import WorkflowParser
+
+
+def make_graph(rand, script_count, group_size=50, cross_group_ratio=0.05):
+    nodes_map = {}
+    edge_names = []
+
+    for i in range(script_count):
+        script_name = 'Group{}_S{}.script'.format(i // group_size, i)
+        event_name = 'Group{}_S{}Done'.format(i // group_size, i)
+
+        nodes_map[script_name] = Node(script_name, attr={'id': script_name, 'type': 'SCRIPT'})
+        nodes_map[event_name] = Node(event_name, attr={'id': event_name, 'type': 'EVENT'})
+        edge_names.append((script_name, event_name))
+
+        group_start = i - i % group_size
+
+        for _ in range(rand.randint(0, 3)):
+            if rand.random() < cross_group_ratio and group_start > 0:
+                dep = rand.randrange(group_start)
+            elif i > group_start:
+                dep = rand.randrange(group_start, i)
+            else:
+                continue
+
+            edge_names.append(('Group{}_S{}Done'.format(dep // group_size, dep), script_name))
+
+    return nodes_map, edge_names
+
+
+def make_adj_maps(nodes_map, edge_names):
+    adj_map = {}
+    rev_map = {}
+
+    for from_name, to_name in edge_names:
+        adj_map.setdefault(from_name, set()).add(nodes_map[to_name])
+        rev_map.setdefault(to_name, set()).add(nodes_map[from_name])
+
+    return adj_map, rev_map
+
+
+def get_target_objects_by_maps(adj_map, rev_map, nodes_map, target_node_names):
+    ''' get_target_objects as it was
+    '''
+    target_map = {name: set(['up', 'down']) for name in target_node_names if name in nodes_map}
+    nodes = set()
+    edges = set()
+    visited = set()
+
+    while len(target_map) > 0:
+        target_name, mode_list = target_map.popitem()
+        the_node = nodes_map[target_name]
+
+        visited_key = '{}.{}'.format(the_node, mode_list)
+        if visited_key in visited:
+            continue
+        visited.add(visited_key)
+
+        nodes.add(the_node)
+
+        if 'down' in mode_list:
+            if target_name not in adj_map:
+                continue
+
+            for to_node in adj_map[target_name]:
+                nodes.add(to_node)
+                target_map.setdefault(to_node.name, set()).add('down')
+                edges.add(Edge(the_node, to_node))
+
+        if 'up' in mode_list:
+            if target_name not in rev_map:
+                continue
+
+            for from_node in rev_map[target_name]:
+                nodes.add(from_node)
+                target_map.setdefault(from_node.name, set()).add('up')
+                edges.add(Edge(from_node, the_node))
+
+    return nodes, edges
+
+
+def measure(build, trace):
+    ''' :return: (trace result, build seconds, trace seconds, bytes held by the built adjacency)
+    '''
+    start = time.time()
+    adjacency = build()
+    build_seconds = time.time() - start
+
+    start = time.time()
+    result = trace(adjacency)
+    trace_seconds = time.time() - start
+
+    # tracing allocations slows everything down, measured in another run
+    del adjacency
+    tracemalloc.start()
+    adjacency = build()
+    adjacency_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    return result, build_seconds, trace_seconds, adjacency_bytes
+
+
+def main(script_count=50000, target_count=20):
+    rand = random.Random(0)
+    nodes_map, edge_names = make_graph(rand, script_count)
+    target_node_names = rand.sample(list(nodes_map), target_count)
+
+    wfp = WorkflowParser()
+    node_list = list(nodes_map.values())
+
+    results = {}
+
+    results['maps of Node sets'] = measure(
+        lambda: make_adj_maps(nodes_map, edge_names),
+        lambda maps: get_target_objects_by_maps(maps[0], maps[1], nodes_map, target_node_names))
+
+    results['CsrGraph'] = measure(
+        lambda: CsrGraph(nodes_map, edge_names),
+        lambda graph: wfp.get_target_objects(graph, node_list, target_node_names))
+
+    (map_nodes, map_edges) = results['maps of Node sets'][0]
+    (csr_nodes, csr_edges) = results['CsrGraph'][0]
+
+    if map_nodes != csr_nodes or {(e.from_.name, e.to_.name) for e in map_edges} != {(e.from_.name, e.to_.name) for e in csr_edges}:
+        raise Exception('traced graphs differ')
+
+    print('{} nodes, {} edges, {} targets -> {} nodes, {} edges ({} Edge objects before)'.format(len(nodes_map),
+                                                                                             len(edge_names),
+                                                                                             target_count,
+                                                                                             len(csr_nodes),
+                                                                                             len(csr_edges),
+                                                                                             len(map_edges)))
+
+    for name, (_, build_seconds, trace_seconds, adjacency_bytes) in results.items():
+        print('{:<18} build {:.3f}s, trace {:.3f}s, adjacency {:.1f} MB'.format(name,
+                                                                               build_seconds,
+                                                                               trace_seconds,
+                                                                               adjacency_bytes / 1024 / 1024))
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:3]])
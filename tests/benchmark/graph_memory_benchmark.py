@@ -0,0 +1,91 @@
+''' Peak memory of parsing a synthetic 10k-statement script into nodes and edges
+
+Each measurement runs in a fresh process, peak RSS is ru_maxrss of that process. Peak RSS
+is dominated by the parser itself, so the deep size of the returned nodes and edges (the
+graph model alone) is reported as well.
+
+usage (from repo root): python -m tests.benchmark.graph_memory_benchmark [statement_count]
+
+To compare with an older tree, run the same command in a checkout of it.
+'''
+import gc
+import sys
+import time
+import resource
+import subprocess
+
+
+def make_script(statement_count):
+    lines = ['#DECLARE In string = "/path/to/input.ss";',
+             '#DECLARE Out string = "/path/to/output.ss";',
+             'Data0 = SSTREAM @In;']
+
+    for i in range(1, statement_count):
+        if i % 10 == 0:
+            lines.append('OUTPUT Data{} TO SSTREAM @Out;'.format(i - 1))
+        elif i % 5 == 0:
+            lines.append('Data{} = SELECT a.A, b.B FROM Data{} AS a INNER JOIN Data{} AS b ON a.A == b.A;'.format(i, i - 1, max(i - 7, 0)))
+        else:
+            lines.append('Data{} = SELECT A, B, C + 1 AS C FROM Data{} WHERE A > {};'.format(i, i - 1, i))
+
+    return '\n'.join(lines)
+
+
+def get_deep_size(root):
+    ''' Bytes of all objects reachable from root, excluding modules, classes and functions
+    '''
+    seen = set()
+    pending = [root]
+    size = 0
+
+    while pending:
+        obj = pending.pop()
+
+        if id(obj) in seen or isinstance(obj, (type, type(sys), type(get_deep_size))):
+            continue
+
+        seen.add(id(obj))
+        size += sys.getsizeof(obj)
+        pending.extend(gc.get_referents(obj))
+
+    return size
+
+
+def measure(statement_count):
+    from myparser.script_parser import ScriptParser
+
+    content = make_script(statement_count)
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    start = time.time()
+    nodes, edges = ScriptParser(lineage_only=True).parse_content(content)
+    seconds = time.time() - start
+
+    rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    print('{} {} {} {} {} {:.1f}'.format(len(list(nodes)),
+                                         len(list(edges)),
+                                         get_deep_size((nodes, edges)),
+                                         rss_before,
+                                         rss_after,
+                                         seconds))
+
+
+def main(statement_count=10000):
+    output = subprocess.check_output([sys.executable, '-m', 'tests.benchmark.graph_memory_benchmark',
+                                      '--measure', str(statement_count)],
+                                     stderr=subprocess.DEVNULL).decode().split()
+
+    node_count, edge_count, graph_bytes, rss_before, rss_after, seconds = output[-6:]
+
+    # ru_maxrss is in KB on linux
+    print('{} statements -> {} nodes (as returned), {} edges, {}s'.format(statement_count, node_count, edge_count, seconds))
+    print('nodes and edges  {:>8.2f} MB'.format(int(graph_bytes) / 1024 / 1024))
+    print('peak RSS         {:>8.1f} MB, {:.1f} MB above start'.format(int(rss_after) / 1024, (int(rss_after) - int(rss_before)) / 1024))
+
+
+if __name__ == '__main__':
+    if sys.argv[1:2] == ['--measure']:
+        measure(int(sys.argv[2]))
+    else:
+        main(*[int(arg) for arg in sys.argv[1:2]])
@@ -0,0 +1,105 @@
+''' Node and edge reduction of GraphSimplifier, and layout time saved if graphviz is installed
+
+Graphs are synthetic script graphs: SSTREAM inputs feeding runs of SELECT rowsets, joined every
+chain_length nodes, with some PROCESS ... USING nodes and an OUTPUT per run. The same graph is
+written to dot as it is and simplified, then both are laid out with dot -Tsvg and timed.
+
+usage (from repo root): python -m tests.benchmark.graph_simplifier_benchmark [node_count] [chain_length]
+'''
+import os
+import sys
+import time
+import shutil
+import tempfile
+import subprocess
+from graph.node import Node, NodeIdAllocator
+from graph.edge import EdgeList
+from graph.graph_utility import GraphUtility
+from graph.graph_simplifier import GraphSimplifier
+
+
+def make_graph(node_count, chain_length):
+    id_allocator = NodeIdAllocator()
+    nodes = []
+    edges = EdgeList()
+    last_node = None
+
+    for i in range(0, node_count, chain_length):
+        input_node = Node('SSTREAM_/input{}.ss'.format(i), attr={'type': 'input'}, id_allocator=id_allocator)
+        nodes.append(input_node)
+        prev_node = input_node
+
+        for j in range(i, min(i + chain_length, node_count)):
+            attr = {'using': 'Processor{}'.format(j)} if j % 25 == 0 else {}
+            node = Node('Data{}'.format(j), attr=attr, id_allocator=id_allocator)
+
+            nodes.append(node)
+            edges.add(prev_node, node)
+            prev_node = node
+
+        # join with the previous run
+        if last_node is not None:
+            edges.add(last_node, prev_node)
+
+        output_node = Node('/output{}.ss'.format(i), attr={'type': 'output'}, id_allocator=id_allocator)
+        nodes.append(output_node)
+        edges.add(prev_node, output_node)
+        last_node = prev_node
+
+    return nodes, edges
+
+
+def layout(dot_filepath):
+    ''' :return: seconds of dot -Tsvg, None if graphviz is not installed
+    '''
+    start = time.time()
+
+    try:
+        subprocess.run(['dot', '-Tsvg', '-o{}.svg'.format(dot_filepath), dot_filepath], check=True)
+    except OSError:
+        return None
+
+    return time.time() - start
+
+
+def main(node_count=2000, chain_length=20):
+    nodes, edges = make_graph(node_count, chain_length)
+    folder = tempfile.mkdtemp()
+
+    try:
+        simplifier = GraphSimplifier()
+
+        start = time.time()
+        simplified_nodes, simplified_edges = simplifier.simplify(nodes, edges)
+        simplify_seconds = time.time() - start
+
+        node_ratio, edge_ratio = simplifier.get_reduction_ratios()
+
+        print('simplify {:.3f}s, {} chains'.format(simplify_seconds, simplifier.chain_count))
+        print('nodes {} -> {} ({:.1%} less), edges {} -> {} ({:.1%} less)'.format(simplifier.node_counts[0],
+                                                                                   simplifier.node_counts[1],
+                                                                                   node_ratio,
+                                                                                   simplifier.edge_counts[0],
+                                                                                   simplifier.edge_counts[1],
+                                                                                   edge_ratio))
+
+        seconds = {}
+
+        for name, graph_nodes, graph_edges in [('original', nodes, edges),
+                                               ('simplified', simplified_nodes, simplified_edges)]:
+            dot_filepath = GraphUtility(graph_nodes, graph_edges).to_dot_file(os.path.join(folder, name))
+            seconds[name] = layout(dot_filepath)
+
+        if seconds['original'] is None:
+            print('graphviz dot not found, layout time not measured')
+        else:
+            print('layout original {:.2f}s, simplified {:.2f}s ({:.1%} less)'.format(
+                seconds['original'],
+                seconds['simplified'],
+                1 - seconds['simplified'] / seconds['original'] if seconds['original'] else 0))
+    finally:
+        shutil.rmtree(folder)
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:3]])
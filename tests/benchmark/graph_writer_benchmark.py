@@ -0,0 +1,76 @@
+''' Time and peak memory of writing DOT and GEXF files with GraphWriter vs networkx
+
+Nodes and edges are synthetic, shaped like the ones ScriptParser returns (id, label, shape
+and style attributes, mostly chained edges with some joins), so the parser is not part of the
+measurement. Peak memory is the tracemalloc peak of building GraphUtility and writing both files.
+
+usage (from repo root): python -m tests.benchmark.graph_writer_benchmark [node_count]
+'''
+import os
+import sys
+import time
+import shutil
+import tempfile
+import tracemalloc
+from graph.node import Node, NodeIdAllocator
+from graph.edge import EdgeList
+from graph.graph_utility import GraphUtility
+
+
+def make_graph(node_count):
+    id_allocator = NodeIdAllocator()
+    nodes = []
+    edges = EdgeList()
+
+    for i in range(node_count):
+        nodes.append(Node('Data{}'.format(i),
+                          attr={'label': 'Data{} = SELECT A, B FROM Data{}'.format(i, i - 1),
+                                'shape': 'box',
+                                'style': 'filled' if i % 10 == 0 else ''},
+                          id_allocator=id_allocator))
+
+        if i > 0:
+            edges.add(nodes[i - 1], nodes[i])
+
+        if i % 5 == 0 and i >= 7:
+            edges.add(nodes[i - 7], nodes[i])
+
+    return nodes, edges
+
+
+def measure(nodes, edges, dest_filepath, use_networkx):
+    tracemalloc.start()
+    start = time.time()
+
+    gu = GraphUtility(nodes, edges, use_networkx=use_networkx)
+    dot_filepath = gu.to_dot_file(dest_filepath)
+    gexf_filepath = gu.to_gexf_file(dest_filepath)
+
+    seconds = time.time() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return seconds, peak, os.path.getsize(dot_filepath), os.path.getsize(gexf_filepath)
+
+
+def main(node_count=20000):
+    nodes, edges = make_graph(node_count)
+    folder = tempfile.mkdtemp()
+
+    print('{} nodes, {} edges'.format(len(nodes), len(edges)))
+
+    try:
+        for name, use_networkx in [('GraphWriter', False), ('networkx', True)]:
+            seconds, peak, dot_size, gexf_size = measure(nodes, edges, os.path.join(folder, name), use_networkx)
+
+            print('{:<12} {:>7.2f}s  peak {:>8.2f} MB  (dot {} bytes, gexf {} bytes)'.format(name,
+                                                                                        seconds,
+                                                                                        peak / 1024 / 1024,
+                                                                                        dot_size,
+                                                                                        gexf_size))
+    finally:
+        shutil.rmtree(folder)
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:2]])
@@ -0,0 +1,83 @@
+''' Time of WorkflowParser.get_params with compiled templates and cached param maps, against resolving every call
+
+Every process has ScopeJobParams with several -params items referencing master params and is
+resolved for each master key several times, as parse_script and all_in_one do for params and
+input hashes.
+
+usage (from repo root): python -m tests.benchmark.param_resolution_benchmark [process_count] [master_count] [repeat]
+'''
+import sys
+import time
+from myparser.workflow_parser import WorkflowObj, WorkflowParser
+from myparser.param_template import ParamTemplate
+
+
+def make_workflow_obj(process_count, master_count):
+    obj = WorkflowObj()
+
+    for m in range(master_count):
+        obj.masters['Master{}'.format(m)] = {'parameters': {'Param{}'.format(i): '/shares/master{}/path{}'.format(m, i)
+                                                            for i in range(50)}}
+
+    for p in range(process_count):
+        process_name = 'Process{}'.format(p)
+        job_params = ['-params In{0}=\\"$(Param{0})/$(Param{1})/{{yyyy-MM-dd}}\\",Hour{0}={{HH}}'.format(i, (i + p) % 50)
+                      for i in range(10)]
+
+        obj.workflows[process_name] = {'ScopeJobParams': job_params + ['-vc x', '-priority 1']}
+        obj.process_master_map[process_name] = 'Master0'
+
+    return obj
+
+
+def get_params_uncached(obj, process_name, master_key):
+    ''' get_params as it was: split the items and scan for placeholders on every call
+    '''
+    master_params = obj.masters[master_key]['parameters']
+    param_map = {}
+
+    for item in obj.workflows[process_name]['ScopeJobParams']:
+        if '-params' not in item:
+            continue
+
+        _, target = item.split()
+
+        for target in target.split(','):
+            key = target[:target.index('=')]
+            value = target[target.index('=') + 1:]
+            param_map[key] = ParamTemplate.replace_params(master_params, value.strip())
+
+    return param_map
+
+
+def main(process_count=1000, master_count=4, repeat=5):
+    obj = make_workflow_obj(process_count, master_count)
+    wfp = WorkflowParser()
+
+    calls = [(process_name, master_key) for _ in range(repeat) for process_name in obj.workflows for master_key in obj.masters]
+
+    start = time.time()
+    expected = [get_params_uncached(obj, process_name, master_key) for process_name, master_key in calls]
+    uncached_seconds = time.time() - start
+
+    round_size = len(calls) // repeat
+
+    start = time.time()
+    results = [wfp.get_params(obj, process_name, master_key=master_key) for process_name, master_key in calls[:round_size]]
+    first_seconds = time.time() - start
+
+    results.extend(wfp.get_params(obj, process_name, master_key=master_key) for process_name, master_key in calls[round_size:])
+    cached_seconds = time.time() - start
+
+    if results != expected:
+        raise Exception('cached params differ from resolving every call')
+
+    print('{} processes x {} master keys x {} calls'.format(process_count, master_count, repeat))
+    print('resolve every call {:.3f}s'.format(uncached_seconds))
+    print('templates and cache {:.3f}s ({:.1f}x), first round {:.3f}s'.format(cached_seconds,
+                                                                             uncached_seconds / cached_seconds if cached_seconds else 0,
+                                                                             first_seconds))
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:4]])
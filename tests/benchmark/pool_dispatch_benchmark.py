@@ -0,0 +1,89 @@
+''' Compare IPC bytes and dispatch time of per-task pickled workflow state vs pool initializer
+
+usage (from repo root): python -m tests.benchmark.pool_dispatch_benchmark [process_count]
+'''
+import sys
+import time
+import pickle
+import multiprocessing as mp
+from myparser.workflow_parser import WorkflowParser, WorkflowObj
+
+
+_shared_state = {}
+
+
+def make_workflow_obj(process_count):
+    obj = WorkflowObj()
+    obj.masters['Group##Master.config'] = {'parameters': {'Param{}'.format(i): 'Value{}'.format(i) for i in range(200)},
+                                           'workflows': {},
+                                           'master': True}
+
+    for i in range(process_count):
+        process_name = 'Process{}'.format(i)
+        script_name = 'Script{}.script'.format(i)
+
+        obj.workflows[process_name] = {'master': False,
+                                       'process_name': process_name,
+                                       'class_name': 'ScopeJobRunner',
+                                       'ScriptFile': 'Scripts/{}'.format(script_name),
+                                       'EventName': 'Event{}'.format(i),
+                                       'DeltaInterval': '1.00:00:00',
+                                       'EventNamesToCheck': ['Event{}'.format(j) for j in range(max(i - 5, 0), i)],
+                                       'ScopeJobParams': ['-params Date=\\"{yyyy-MM-dd}\\"', '-params In=$(Param1)']}
+        obj.masters['Group##Master.config']['workflows'][process_name] = 'Group'
+        obj.process_master_map[process_name] = 'Group##Master.config'
+        obj.process_group_map[process_name] = 'Group'
+        obj.script_process_map[script_name] = process_name
+        obj.process_event_deps[process_name] = obj.workflows[process_name]['EventNamesToCheck']
+
+    return obj
+
+
+def run_per_task(target_filename, workflow_parser, workflow_obj, script_fullpath_map, output_folder):
+    return len(workflow_obj.workflows)
+
+
+def init_shared(shared_state):
+    global _shared_state
+    _shared_state = shared_state
+
+
+def run_shared(target_filename):
+    return len(_shared_state['workflow_obj'].workflows)
+
+
+def main(process_count=500, worker_count=8):
+    obj = make_workflow_obj(process_count)
+    wfp = WorkflowParser()
+    script_fullpath_map = {name: '/root/Scripts/{}'.format(name) for name in obj.script_process_map}
+    target_filenames = list(script_fullpath_map)
+
+    # before: every task tuple carries the whole state
+    arguments_list = [(f, wfp, obj, script_fullpath_map, '/tmp/out') for f in target_filenames]
+    per_task_bytes = sum(len(pickle.dumps(arguments)) for arguments in arguments_list)
+
+    start = time.time()
+    with mp.Pool(processes=worker_count) as pool:
+        pool.starmap(run_per_task, arguments_list)
+    per_task_seconds = time.time() - start
+
+    # after: state once per worker, filename per task
+    shared_state = {'workflow_parser': wfp,
+                    'workflow_obj': obj,
+                    'script_fullpath_map': script_fullpath_map,
+                    'output_folder': '/tmp/out'}
+    shared_bytes = len(pickle.dumps(shared_state)) * worker_count + \
+                   sum(len(pickle.dumps(f)) for f in target_filenames)
+
+    start = time.time()
+    with mp.Pool(processes=worker_count, initializer=init_shared, initargs=(shared_state,)) as pool:
+        pool.map(run_shared, target_filenames)
+    shared_seconds = time.time() - start
+
+    print('{} scripts, {} workers, start method [{}]'.format(process_count, worker_count, mp.get_start_method()))
+    print('per-task state : {:>12,} bytes pickled, {:.3f}s'.format(per_task_bytes, per_task_seconds))
+    print('pool initializer: {:>12,} bytes pickled, {:.3f}s'.format(shared_bytes, shared_seconds))
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:2]])
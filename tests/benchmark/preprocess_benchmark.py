@@ -0,0 +1,55 @@
+''' Benchmark ScriptPreprocessor against the ScriptParser regex chain
+
+usage (from repo root): python -m tests.benchmark.preprocess_benchmark [statement_count]
+'''
+import sys
+import timeit
+import logging
+from myparser.script_parser import ScriptParser
+from tests.unit_tests.test_script_preprocessor import preprocess_regex_chain
+
+
+STATEMENT_TEMPLATE = '''
+// step {i}: join the daily data
+#IF (@@DebugMode@@ == "true")
+#DECLARE DebugPath{i} string = "/local/debug/{i}.ss";
+#ELSE
+#DECLARE DebugPath{i} string = "@@KWRawPath@@/{i}.ss";
+#ENDIF
+
+Data{i} =
+    SELECT RGUID,
+           ListingId AS OrderItemId, /* inline comment */
+           Keyword.Split(';').Length AS TermCnt,
+           HourNum
+    FROM Data{prev}
+         LEFT OUTER JOIN Other{i} [ROWCOUNT=100]
+         ON Data{prev}.RGUID == Other{i}.RGUID
+    WHERE Path == "http://foo/bar"
+    [PARTITION(RGUID)];
+'''
+
+
+def make_script(statement_count):
+    return ''.join(STATEMENT_TEMPLATE.format(i=i, prev=max(i - 1, 0)) for i in range(statement_count))
+
+
+def main(statement_count=2000, repeat=5):
+    sp = ScriptParser()
+    content = make_script(statement_count)
+
+    if preprocess_regex_chain(sp, content) != sp.preprocess(content):
+        print('[WARNING] outputs differ')
+
+    chain = min(timeit.repeat(lambda: preprocess_regex_chain(sp, content), number=1, repeat=repeat))
+    single = min(timeit.repeat(lambda: sp.preprocess(content), number=1, repeat=repeat))
+
+    print('script: {} statements, {} lines, {} bytes'.format(statement_count, content.count('\n'), len(content)))
+    print('regex chain : {:.4f}s'.format(chain))
+    print('single pass : {:.4f}s ({:.1f}x)'.format(single, chain / single))
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.WARNING)
+
+    main(*[int(arg) for arg in sys.argv[1:2]])
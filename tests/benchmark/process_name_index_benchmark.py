@@ -0,0 +1,85 @@
+''' Lookup time of ProcessNameIndex against the linear scan it replaces
+
+Process names are synthetic, built from words like real workflow processes, each with a script
+named after it. Keys are a mix of script names, shortened script names (substring lookup) and
+misspelled process names (edit distance lookup). Every answer is compared to the linear scan.
+
+usage (from repo root): python -m tests.benchmark.process_name_index_benchmark [process_count] [key_count]
+'''
+import sys
+import time
+import random
+from myparser.process_name_index import ProcessNameIndex
+from tests.unit_tests.test_process_name_index import get_closest_linear
+
+
+WORDS = ['Daily', 'Hourly', 'Weekly', 'Agg', 'Ads', 'Click', 'Impression', 'Revenue', 'Market', 'Campaign',
+         'Keyword', 'Budget', 'Bid', 'Opt', 'MPI', 'Processing', 'Extract', 'Merge', 'Report', 'Delta', 'Audience',
+         'Conversion', 'Geo', 'Device', 'Publisher', 'Snapshot', 'Backfill', 'Cleanup', 'Quality', 'Score']
+
+
+def make_names(process_count, rand):
+    names = []
+    seen = set()
+
+    while len(names) < process_count:
+        name = ''.join(rand.choice(WORDS) for _ in range(rand.randint(2, 4))) + str(rand.randint(0, 99))
+
+        if name not in seen:
+            seen.add(name)
+            names.append(name)
+
+    return names
+
+
+def make_keys(process_names, key_count, rand):
+    keys = []
+
+    for i in range(key_count):
+        name = rand.choice(process_names)
+
+        if i % 3 == 0:
+            keys.append(name + '.script')
+        elif i % 3 == 1:
+            keys.append(name[:-2] + '.script')
+        else:
+            chars = list(name)
+            chars[rand.randrange(len(chars))] = rand.choice('xyz')
+            keys.append(''.join(chars) + 'Z')
+
+    return keys
+
+
+def main(process_count=10000, key_count=300):
+    rand = random.Random(0)
+
+    process_names = make_names(process_count, rand)
+    script_process_map = {name + '.script': name for name in process_names}
+    keys = make_keys(process_names, key_count, rand)
+
+    start = time.time()
+    expected = [get_closest_linear(key, process_names, script_process_map) for key in keys]
+    linear_seconds = time.time() - start
+
+    start = time.time()
+    index = ProcessNameIndex(process_names, script_process_map)
+    build_seconds = time.time() - start
+
+    start = time.time()
+    results = [index.get_closest(key) for key in keys]
+    index_seconds = time.time() - start
+
+    if results != expected:
+        raise Exception('index answers differ from the linear scan')
+
+    print('{} process names, {} keys'.format(process_count, key_count))
+    print('linear scan {:.3f}s ({:.2f}ms per key)'.format(linear_seconds, linear_seconds * 1000 / key_count))
+    print('index build {:.3f}s, lookup {:.3f}s ({:.3f}ms per key, {:.0f}x)'.format(
+        build_seconds,
+        index_seconds,
+        index_seconds * 1000 / key_count,
+        linear_seconds / index_seconds if index_seconds else 0))
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:3]])
@@ -0,0 +1,84 @@
+''' Upstream, downstream and path queries of ReachabilityIndex against traversals of the CsrGraph
+
+Uses the synthetic workflow group graph of dep_graph_trace_benchmark, more dependencies across
+groups give longer chains and larger answers. The index is built once, then the same random
+queries are answered by the index and by CsrGraph.traverse, and compared.
+
+usage (from repo root): python -m tests.benchmark.reachability_index_benchmark [script_count] [query_count] [cross_group_percent]
+'''
+import sys
+import time
+import random
+from graph.csr_graph import CsrGraph
+from graph.reachability_index import ReachabilityIndex
+from tests.benchmark.dep_graph_trace_benchmark import make_graph
+
+
+def timed(func, queries):
+    start = time.time()
+    results = [func(*query) for query in queries]
+
+    return results, (time.time() - start) / len(queries)
+
+
+def get_index_bytes(index):
+    ''' the index is made of int arrays
+    '''
+    arrays = [index.comps, index.comp_offsets, index.comp_members]
+
+    for labels in [index.down_labels, index.up_labels]:
+        arrays.extend([labels.post, labels.offsets, labels.los, labels.his, labels.member_offsets, labels.members])
+
+    return sum(a.itemsize * len(a) for a in arrays)
+
+
+def main(script_count=50000, query_count=1000, cross_group_percent=5):
+    rand = random.Random(0)
+    nodes_map, edge_names = make_graph(rand, script_count, cross_group_ratio=cross_group_percent / 100)
+    graph = CsrGraph(nodes_map, edge_names)
+
+    start = time.time()
+    index = ReachabilityIndex(graph)
+    build_seconds = time.time() - start
+
+    starts = [(rand.randrange(graph.node_count),) for _ in range(query_count)]
+    pairs = [(rand.randrange(graph.node_count), rand.randrange(graph.node_count)) for _ in range(query_count)]
+
+    # half of the pairs with a path
+    for k in range(0, query_count, 2):
+        i = pairs[k][0]
+        pairs[k] = (i, rand.choice(graph.traverse([i])))
+
+    results = {}
+
+    results['downstream'] = (timed(lambda i: sorted(index.downstream([i])), starts),
+                             timed(lambda i: sorted(graph.traverse([i])), starts))
+    results['upstream'] = (timed(lambda i: sorted(index.upstream([i])), starts),
+                           timed(lambda i: sorted(graph.traverse([i], reverse=True)), starts))
+    results['path_exists'] = (timed(index.path_exists, pairs),
+                              timed(lambda i, j: j in graph.traverse([i]), pairs))
+
+    for name, ((index_results, _), (traverse_results, _)) in results.items():
+        if index_results != traverse_results:
+            raise Exception('{} of the index differs from traversing'.format(name))
+
+    print('{} nodes, {} edges, {} components, {} intervals, index {:.1f} MB built in {:.3f}s'.format(graph.node_count,
+                                                                                                    graph.edge_count,
+                                                                                                    index.comp_count,
+                                                                                                    index.interval_count,
+                                                                                                    get_index_bytes(index) / 1024 / 1024,
+                                                                                                    build_seconds))
+    print('mean of {} queries, {:.0f} nodes up, {:.0f} nodes down, {:.0%} paths exist'.format(query_count,
+                                                                                           sum(len(r) for r in results['upstream'][0][0]) / query_count,
+                                                                                           sum(len(r) for r in results['downstream'][0][0]) / query_count,
+                                                                                           sum(results['path_exists'][0][0]) / query_count))
+
+    for name, ((_, index_seconds), (_, traverse_seconds)) in results.items():
+        print('{:<12} index {:>9.1f}us, traverse {:>9.1f}us ({:.1f}x)'.format(name,
+                                                                             index_seconds * 1000000,
+                                                                             traverse_seconds * 1000000,
+                                                                             traverse_seconds / index_seconds))
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:4]])
@@ -0,0 +1,102 @@
+''' Time of splitting and writing large graphs with RenderPolicy, and of laying them out if graphviz is installed
+
+Graphs are synthetic script graphs: several module views of mostly chained nodes with some joins,
+named like ScriptParser names view nodes (<view>_name). For each size the dot files written with
+and without the policy are listed with the engine they are laid out with. With --render, each dot
+file is also rendered to svg with graphviz (dot or the layout attribute of the part) and timed.
+
+usage (from repo root): python -m tests.benchmark.render_policy_benchmark [--render] [node_count ...]
+'''
+import os
+import sys
+import time
+import shutil
+import tempfile
+import subprocess
+from graph.node import Node, NodeIdAllocator
+from graph.edge import EdgeList
+from graph.graph_utility import GraphUtility, RenderPolicy
+
+
+def make_graph(node_count, view_count=10):
+    id_allocator = NodeIdAllocator()
+    nodes = []
+    edges = EdgeList()
+    view_size = max(node_count // view_count, 1)
+
+    for i in range(node_count):
+        nodes.append(Node('<View{}>_Data{}'.format(i // view_size, i),
+                          attr={'label': 'Data{} = SELECT A, B FROM Data{}'.format(i, i - 1), 'shape': 'box'},
+                          id_allocator=id_allocator))
+
+        if i > 0:
+            edges.add(nodes[i - 1], nodes[i])
+
+        if i % 5 == 0 and i >= 7:
+            edges.add(nodes[i - 7], nodes[i])
+
+    return nodes, edges
+
+
+def get_layout(dot_filepath):
+    with open(dot_filepath) as f:
+        for line in f:
+            if line.startswith('graph [') and 'layout=' in line:
+                return line.split('layout=')[1].split(',')[0].split(']')[0]
+
+    return 'dot'
+
+
+def render(dot_filepath):
+    ''' :return: seconds of the layout, None if graphviz is not installed
+    '''
+    start = time.time()
+
+    try:
+        subprocess.run(['dot', '-Tsvg', '-o{}.svg'.format(dot_filepath), dot_filepath], check=True)
+    except OSError:
+        return None
+
+    return time.time() - start
+
+
+def measure(nodes, edges, dest_filepath, render_policy, do_render):
+    start = time.time()
+    dot_filepaths = GraphUtility(nodes, edges).to_files(dest_filepath, ['dot'], render_policy=render_policy)
+    write_seconds = time.time() - start
+
+    print('  {:<8} write {:>6.2f}s, {} dot file(s)'.format('policy' if render_policy else 'plain',
+                                                          write_seconds,
+                                                          len(dot_filepaths)))
+
+    for dot_filepath in dot_filepaths:
+        render_seconds = render(dot_filepath) if do_render else None
+
+        print('    {:<24} layout {:<6} {}'.format(os.path.basename(dot_filepath),
+                                                 get_layout(dot_filepath),
+                                                 '' if render_seconds is None else '{:.2f}s'.format(render_seconds)))
+
+
+def main(node_counts=(1000, 5000, 20000), do_render=False):
+    folder = tempfile.mkdtemp()
+    render_policy = RenderPolicy()
+
+    print('max_nodes {}, max_edges {}, large_engine {}'.format(render_policy.max_nodes,
+                                                               render_policy.max_edges,
+                                                               render_policy.large_engine))
+
+    try:
+        for node_count in node_counts:
+            nodes, edges = make_graph(node_count)
+            print('{} nodes, {} edges'.format(len(nodes), len(edges)))
+
+            for policy in [None, render_policy]:
+                measure(nodes, edges, os.path.join(folder, '{}_{}'.format(node_count, 'policy' if policy else 'plain')),
+                        policy, do_render)
+    finally:
+        shutil.rmtree(folder)
+
+
+if __name__ == '__main__':
+    args = sys.argv[1:]
+    main([int(arg) for arg in args if arg != '--render'] or (1000, 5000, 20000), do_render='--render' in args)
@@ -0,0 +1,93 @@
+''' Time of WorkflowParser.parse_folder with 1, 2, 4 and cpu count processes
+
+The tree is synthetic: group folders with a master config each and process configs with
+parameters, event dependencies and script params like real workflow groups. Every parallel
+result is compared to the sequential one.
+
+usage (from repo root): python -m tests.benchmark.workflow_config_benchmark [config_count] [group_size]
+'''
+import os
+import sys
+import time
+import shutil
+import tempfile
+from myparser.workflow_parser import WorkflowParser
+
+
+MASTER_CONFIG = '''<Config><SqlConnectionString>x</SqlConnectionString>
+<Parameters>{parameters}</Parameters>
+<Workflows>{workflows}</Workflows></Config>
+'''
+
+PARAMETER = '<Parameter><Name>{name}</Name><Value>{value}</Value></Parameter>'
+
+WORKFLOW = '<Workflow><Process>{process}</Process><Group>{group}</Group></Workflow>'
+
+PROCESS_CONFIG = '''<Config><Process>{process}</Process><ClassName>ScopeJobRunner</ClassName>
+<Parameters>
+<Parameter><Name>ScriptFile</Name><Value>Scripts/{process}.script</Value></Parameter>
+<Parameter><Name>EventName</Name><Value>{process}Done</Value></Parameter>
+<Parameter><Name>DeltaInterval</Name><Value>1.00:00:00</Value></Parameter>
+<Parameter><Name>EventNamesToCheck</Name><Value>{events}</Value></Parameter>
+<Parameter><Name>ScopeJobParams</Name><Value>{params}</Value></Parameter>
+{parameters}
+</Parameters></Config>
+'''
+
+
+def make_tree(folder, config_count, group_size):
+    for group_start in range(0, config_count, group_size):
+        group = 'Group{}'.format(group_start // group_size)
+        group_folder = os.path.join(folder, group)
+        os.makedirs(group_folder)
+
+        processes = ['P{}'.format(i) for i in range(group_start, min(group_start + group_size, config_count))]
+
+        with open(os.path.join(group_folder, 'Master.config'), 'w') as f:
+            f.write(MASTER_CONFIG.format(
+                parameters=''.join(PARAMETER.format(name='Param{}'.format(i), value='/path/{}'.format(i)) for i in range(20)),
+                workflows=''.join(WORKFLOW.format(process=process, group=group) for process in processes)))
+
+        for i, process in enumerate(processes):
+            events = ''.join('<string>{}Done</string>'.format(p) for p in processes[max(0, i - 3):i])
+            params = ''.join('<string>-params In{0}=\\"$(Param{0})\\"</string>'.format(j) for j in range(10))
+
+            with open(os.path.join(group_folder, process + '.config'), 'w') as f:
+                f.write(PROCESS_CONFIG.format(
+                    process=process,
+                    events=events,
+                    params=params,
+                    parameters=''.join(PARAMETER.format(name='Extra{}'.format(j), value='value{}'.format(j)) for j in range(10))))
+
+
+def main(config_count=5000, group_size=50):
+    folder = tempfile.mkdtemp()
+
+    try:
+        make_tree(folder, config_count, group_size)
+
+        wfp = WorkflowParser()
+        expected = None
+        base_seconds = None
+
+        for process_no in sorted({1, 2, 4, os.cpu_count() or 1}):
+            start = time.time()
+            obj = wfp.parse_folder(folder, process_no=process_no)
+            seconds = time.time() - start
+
+            if expected is None:
+                expected = vars(obj)
+                base_seconds = seconds
+            elif vars(obj) != expected:
+                raise Exception('result of {} processes differs from sequential'.format(process_no))
+
+            print('{} configs, {} processes: {:.2f}s ({:.2f}x)'.format(config_count,
+                                                                       process_no,
+                                                                       seconds,
+                                                                       base_seconds / seconds if seconds else 0))
+    finally:
+        shutil.rmtree(folder)
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:3]])
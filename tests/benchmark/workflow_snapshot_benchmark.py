@@ -0,0 +1,68 @@
+''' Time of WorkflowParser.load_folder with a snapshot against parse_folder from scratch
+
+Uses the synthetic tree of workflow_config_benchmark. Times a full parse, a load with nothing
+changed and a load after touching a share of the process configs, and checks the loaded
+WorkflowObj against a full parse.
+
+usage (from repo root): python -m tests.benchmark.workflow_snapshot_benchmark [config_count] [changed_percent]
+'''
+import os
+import sys
+import time
+import shutil
+import tempfile
+from myparser.workflow_parser import WorkflowParser
+from tests.benchmark.workflow_config_benchmark import make_tree
+
+
+def timed(func, *args, **kwargs):
+    start = time.time()
+    result = func(*args, **kwargs)
+
+    return result, time.time() - start
+
+
+def main(config_count=5000, changed_percent=1):
+    folder = tempfile.mkdtemp()
+    wf_folder = os.path.join(folder, 'WorkflowGroups')
+    snapshot_filepath = os.path.join(folder, 'snapshot.pickle')
+
+    try:
+        make_tree(wf_folder, config_count, 50)
+        wfp = WorkflowParser()
+
+        expected, full_seconds = timed(wfp.parse_folder, wf_folder)
+        _, first_seconds = timed(wfp.load_folder, wf_folder, snapshot_filepath)
+        obj, unchanged_seconds = timed(wfp.load_folder, wf_folder, snapshot_filepath)
+
+        if obj.workflows != expected.workflows:
+            raise Exception('loaded WorkflowObj differs from a full parse')
+
+        # touch every n-th process config
+        step = max(1, 100 // changed_percent)
+        changed = 0
+
+        for root, _, filenames in os.walk(wf_folder):
+            for filename in sorted(filenames):
+                if filename.startswith('P') and int(filename[1:-len('.config')]) % step == 0:
+                    filepath = os.path.join(root, filename)
+                    st = os.stat(filepath)
+                    os.utime(filepath, ns=(st.st_atime_ns, st.st_mtime_ns + 1000000))
+                    changed += 1
+
+        obj, changed_seconds = timed(wfp.load_folder, wf_folder, snapshot_filepath)
+
+        if vars(obj).keys() != vars(expected).keys() or obj.script_process_map != expected.script_process_map:
+            raise Exception('refreshed WorkflowObj differs from a full parse')
+
+        print('{} configs, snapshot {:.1f} MB'.format(config_count, os.path.getsize(snapshot_filepath) / 1024 / 1024))
+        print('full parse          {:.3f}s'.format(full_seconds))
+        print('first load (save)   {:.3f}s'.format(first_seconds))
+        print('load, unchanged     {:.3f}s ({:.1f}x)'.format(unchanged_seconds, full_seconds / unchanged_seconds))
+        print('load, {} changed   {:.3f}s ({:.1f}x)'.format(changed, changed_seconds, full_seconds / changed_seconds))
+    finally:
+        shutil.rmtree(folder)
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:3]])
@@ -0,0 +1,69 @@
+import ast
+import os
+
+
+def load_test_inputs(test_filename):
+    ''' Collect the `s = \'\'\'...\'\'\'` statements used as inputs in a unit test file
+
+    :param test_filename: file name under tests/unit_tests
+    :return: list of (test_name, statement)
+    '''
+    filepath = os.path.join(os.path.dirname(__file__), 'unit_tests', test_filename)
+
+    with open(filepath) as f:
+        tree = ast.parse(f.read())
+
+    inputs = []
+    for func in ast.walk(tree):
+        if not isinstance(func, ast.FunctionDef):
+            continue
+
+        for stmt in func.body:
+            if isinstance(stmt, ast.Assign) and getattr(stmt.targets[0], 'id', None) == 's':
+                inputs.append((func.name, ast.literal_eval(stmt.value)))
+
+    return inputs
+
+
+MASTER_CONFIG = '''<Config><SqlConnectionString>x</SqlConnectionString>
+<Parameters><Parameter><Name>Base</Name><Value>/base</Value></Parameter></Parameters>
+<Workflows>{workflows}</Workflows></Config>
+'''
+
+MASTER_WORKFLOW = '<Workflow><Process>{process}</Process><Group>G1</Group></Workflow>'
+
+PROCESS_CONFIG = '''<Config><Process>{process}</Process><ClassName>ScopeJobRunner</ClassName>
+<Parameters>
+<Parameter><Name>ScriptFile</Name><Value>Scripts/{process}.script</Value></Parameter>
+<Parameter><Name>EventName</Name><Value>{process}Done</Value></Parameter>
+<Parameter><Name>DeltaInterval</Name><Value>1.00:00:00</Value></Parameter>
+<Parameter><Name>EventNamesToCheck</Name><Value><string>Start</string></Value></Parameter>
+<Parameter><Name>ScopeJobParams</Name><Value><string>-params In=\\"$(Base)\\"</string></Value></Parameter>
+</Parameters></Config>
+'''
+
+SCRIPT = '''
+Data = SELECT A FROM (SSTREAM @In);
+OUTPUT Data TO SSTREAM "/out.ss";
+'''
+
+
+def write_file(folder, name, content):
+    filepath = os.path.join(folder, name)
+    os.makedirs(os.path.dirname(filepath), exist_ok=True)
+
+    with open(filepath, 'w') as f:
+        f.write(content)
+
+
+def make_workflow_group(wf_folder, scripts):
+    ''' Write a workflow group: Master.config, a config per process and its script under Scripts
+
+    :param scripts: process name -> script content
+    '''
+    workflows = ''.join(MASTER_WORKFLOW.format(process=process) for process in scripts)
+    write_file(wf_folder, 'Master.config', MASTER_CONFIG.format(workflows=workflows))
+
+    for process, script in scripts.items():
+        write_file(wf_folder, '{}.config'.format(process), PROCESS_CONFIG.format(process=process))
+        write_file(wf_folder, 'Scripts/{}.script'.format(process), script)
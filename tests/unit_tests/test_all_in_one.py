@@ -0,0 +1,99 @@
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+import main
+from util.ndjson_journal import NdjsonJournal
+from tests.input_utility import PROCESS_CONFIG, SCRIPT, write_file, make_workflow_group
+
+
+class TestAllInOne(TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.dwc_wf_folder = os.path.join(self.folder, 'wf')
+        self.out_folder = os.path.join(self.folder, 'out')
+
+        # G1: two scripts, P2 the larger one; G2: a script that fails to parse
+        make_workflow_group(os.path.join(self.dwc_wf_folder, 'G1'), {'P1': SCRIPT, 'P2': SCRIPT * 3})
+        make_workflow_group(os.path.join(self.dwc_wf_folder, 'G2'), {'P3': 'Data = SELECT FROM WHERE ;;; OUTPUT'})
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def run_all_in_one(self, process_no=2, dwc_wf_folder=None):
+        return main.all_in_one(dwc_wf_folder or self.dwc_wf_folder,
+                               self.out_folder,
+                               output_formats=['dot'],
+                               error_log_filename='errors.txt',
+                               use_cache=False,
+                               process_no=process_no)
+
+    def get_counts(self, group_stats):
+        return {wf_folder: (stats['tasks'], stats['skipped'], stats['errors']) for wf_folder, stats in group_stats.items()}
+
+    def test_schedule(self):
+        # a single worker finishes the tasks in the order they are scheduled
+        group_stats = self.run_all_in_one(process_no=1)
+
+        self.assertEqual({'G1': (3, 0, 0), 'G2': (2, 0, 1)}, self.get_counts(group_stats))
+
+        records = NdjsonJournal(os.path.join(self.out_folder, main.CHECKPOINT_FILENAME)).read()
+        artifacts = [record['artifact'] for record in records if record['type'] == 'task']
+
+        # dependency graphs first, then scripts from the largest
+        self.assertCountEqual(['G1/dep_graph', 'G2/dep_graph'], artifacts[:2])
+        self.assertEqual(['G1/P2.script', 'G1/P1.script', 'G2/P3.script'], artifacts[2:])
+
+        for name in ['G1/event_dep_[G1]_target_folders[None]_nodes[]_filter_None.dot',
+                     'G1/script_graph/P1.script.dot',
+                     'G1/script_graph/P2.script.dot',
+                     'G2/event_dep_[G2]_target_folders[None]_nodes[]_filter_None.dot']:
+            self.assertTrue(os.path.isfile(os.path.join(self.out_folder, name)), name)
+
+    def test_error_log(self):
+        self.run_all_in_one()
+
+        with open(os.path.join(self.out_folder, 'errors.txt')) as f:
+            lines = f.read().splitlines()
+
+        # plain text, one line per failed task
+        self.assertEqual(1, len(lines))
+        self.assertTrue(lines[0].startswith(os.path.join(self.dwc_wf_folder, 'G2') + '/P3.script: '), lines[0])
+
+        # and as NDJSON records in the checkpoint
+        records = {record['artifact']: record for record in NdjsonJournal(os.path.join(self.out_folder, main.CHECKPOINT_FILENAME)).read()
+                   if record['type'] == 'task'}
+
+        self.assertEqual(('error', False), (records['G2/P3.script']['status'], records['G2/P3.script']['timed_out']))
+        self.assertTrue(records['G2/P3.script']['error'].startswith('P3.script: '))
+        self.assertEqual(('ok', None, False), tuple(records['G1/P1.script'][key] for key in ['status', 'error', 'timed_out']))
+
+    def test_skip_up_to_date(self):
+        self.run_all_in_one()
+
+        # the failed script is retried, everything else is up to date
+        self.assertEqual({'G1': (0, 3, 0), 'G2': (1, 1, 1)}, self.get_counts(self.run_all_in_one()))
+
+        write_file(self.dwc_wf_folder, 'G1/Scripts/P1.script', SCRIPT + '// changed\n')
+
+        self.assertEqual({'G1': (1, 2, 0), 'G2': (1, 1, 1)}, self.get_counts(self.run_all_in_one()))
+
+    def test_configs_hashed_by_content(self):
+        self.run_all_in_one()
+
+        # a fresh copy at another path, e.g. the next drop extracted with new mtimes
+        copy_folder = os.path.join(self.folder, 'wf_copy')
+        shutil.copytree(self.dwc_wf_folder, copy_folder, copy_function=shutil.copy)
+
+        self.assertEqual({'G1': (0, 3, 0), 'G2': (1, 1, 1)}, self.get_counts(self.run_all_in_one(dwc_wf_folder=copy_folder)))
+
+        # a changed config rebuilds its group
+        write_file(self.dwc_wf_folder, 'G1/P1.config', PROCESS_CONFIG.format(process='P1').replace('1.00:00:00', '2.00:00:00'))
+
+        self.assertEqual({'G1': (3, 0, 0), 'G2': (1, 1, 1)}, self.get_counts(self.run_all_in_one()))
+
+    def test_has_date_placeholder(self):
+        self.assertTrue(main.has_date_placeholder({'P1': {'parameters': {'Date': '"{yyyy-MM-dd}"'}}}))
+        self.assertTrue(main.has_date_placeholder([{}, {'P1': ['/path/{yyyy}/{MM}/x.ss']}]))
+        self.assertFalse(main.has_date_placeholder({'P1': {'parameters': {'Base': '/base', 'Count': 1}}}))
+        self.assertFalse(main.has_date_placeholder({'P1': ['-params Fmt=\\"{0}\\"', '{}']}))
@@ -0,0 +1,60 @@
+import os
+import glob
+import shutil
+import tempfile
+from unittest import TestCase
+from util.build_manifest import BuildManifest
+
+
+class TestBuildManifest(TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.output = os.path.join(self.folder, 'A', 'S1.script.dot.pdf')
+
+        os.makedirs(os.path.dirname(self.output))
+
+        with open(self.output, 'w') as f:
+            f.write('pdf')
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def test_up_to_date(self):
+        inputs_hash = BuildManifest.make_inputs_hash('script', {'Date': '2019-01-01'})
+
+        manifest = BuildManifest(self.folder)
+        self.assertFalse(manifest.is_up_to_date('A/S1.script', inputs_hash))
+
+        manifest.update('A/S1.script', inputs_hash, [self.output])
+        manifest.save()
+
+        manifest = BuildManifest(self.folder)
+        self.assertTrue(manifest.is_up_to_date('A/S1.script', inputs_hash))
+        self.assertEqual(['A/S1.script.dot.pdf'], manifest.entries['A/S1.script']['outputs'])
+
+        # changed inputs
+        self.assertFalse(manifest.is_up_to_date('A/S1.script', BuildManifest.make_inputs_hash('script', {'Date': '2019-01-02'})))
+        self.assertFalse(manifest.is_up_to_date('A/S1.script', None))
+
+        # missing output
+        os.remove(self.output)
+        self.assertFalse(manifest.is_up_to_date('A/S1.script', inputs_hash))
+
+    def test_broken_manifest(self):
+        with open(os.path.join(self.folder, BuildManifest.MANIFEST_FILENAME), 'w') as f:
+            f.write('{"A/S1.script": ')
+
+        self.assertEqual({}, BuildManifest(self.folder).entries)
+
+    def test_inputs_hash_is_order_independent(self):
+        self.assertEqual(BuildManifest.make_inputs_hash({'a': 1, 'b': 2}),
+                         BuildManifest.make_inputs_hash({'b': 2, 'a': 1}))
+
+    def test_tool_sources_exist(self):
+        self.assertIn('config/config.ini', BuildManifest.TOOL_SOURCES)
+
+        root = os.path.join(os.path.dirname(__file__), os.pardir, os.pardir)
+
+        for pattern in BuildManifest.TOOL_SOURCES:
+            with self.subTest(pattern=pattern):
+                self.assertTrue(glob.glob(os.path.join(root, pattern)))
@@ -0,0 +1,119 @@
+import random
+from unittest import TestCase
+from graph.node import Node
+from graph.csr_graph import CsrGraph
+from myparser.workflow_parser import WorkflowParser
+
+
+def make_adj_maps(nodes_map, edge_names):
+    adj_map = {}
+    rev_map = {}
+
+    for from_name, to_name in edge_names:
+        adj_map.setdefault(from_name, set()).add(nodes_map[to_name])
+        rev_map.setdefault(to_name, set()).add(nodes_map[from_name])
+
+    return adj_map, rev_map
+
+
+def get_target_names_by_maps(adj_map, rev_map, nodes_map, target_node_names):
+    ''' get_target_objects on string keyed maps of Node sets, as it was
+
+    :return: (node names, (from name, to name) pairs)
+    '''
+    target_map = {name: set(['up', 'down']) for name in target_node_names if name in nodes_map}
+    nodes = set()
+    edges = set()
+    visited = set()
+
+    while len(target_map) > 0:
+        target_name, mode_list = target_map.popitem()
+
+        visited_key = '{}.{}'.format(target_name, sorted(mode_list))
+        if visited_key in visited:
+            continue
+        visited.add(visited_key)
+
+        nodes.add(target_name)
+
+        if 'down' in mode_list:
+            if target_name not in adj_map:
+                continue
+
+            for to_node in adj_map[target_name]:
+                nodes.add(to_node.name)
+                target_map.setdefault(to_node.name, set()).add('down')
+                edges.add((target_name, to_node.name))
+
+        if 'up' in mode_list:
+            if target_name not in rev_map:
+                continue
+
+            for from_node in rev_map[target_name]:
+                nodes.add(from_node.name)
+                target_map.setdefault(from_node.name, set()).add('up')
+                edges.add((from_node.name, target_name))
+
+    return nodes, edges
+
+
+def make_random_graph(rand, script_count, event_count):
+    ''' script -> event -> script graph like the workflow dependency graph
+    '''
+    names = ['S{}'.format(i) for i in range(script_count)] + ['E{}'.format(i) for i in range(event_count)]
+    nodes_map = {name: Node(name, attr={'id': name, 'type': 'SCRIPT' if name[0] == 'S' else 'EVENT'}) for name in names}
+    edge_names = []
+
+    for i in range(script_count):
+        edge_names.append(('S{}'.format(i), 'E{}'.format(rand.randrange(event_count))))
+
+        for _ in range(rand.randint(0, 3)):
+            edge_names.append(('E{}'.format(rand.randrange(event_count)), 'S{}'.format(i)))
+
+    return nodes_map, edge_names
+
+
+class TestCsrGraph(TestCase):
+    def test_adjacency(self):
+        graph = CsrGraph('abcd', ['ab', 'ac', 'ab', 'cb', 'da'])
+
+        self.assertEqual((4, 4), (graph.node_count, graph.edge_count))
+        self.assertEqual([1, 2], list(graph.successors(0)))
+        self.assertEqual([0, 2], list(graph.predecessors(1)))
+        self.assertEqual([], list(graph.successors(1)))
+        self.assertEqual((0, 2), (graph.out_degree(1), graph.in_degree(1)))
+
+        self.assertEqual([2, 1], graph.traverse([2]))
+        self.assertEqual([2, 0, 3], graph.traverse([2], reverse=True))
+        self.assertEqual([3, 0, 1, 2], graph.traverse([3, 3]))
+
+    def test_target_objects_same_as_maps(self):
+        rand = random.Random(0)
+        wfp = WorkflowParser()
+
+        for _ in range(50):
+            nodes_map, edge_names = make_random_graph(rand, 40, 30)
+            adj_map, rev_map = make_adj_maps(nodes_map, edge_names)
+
+            graph = CsrGraph(nodes_map, edge_names)
+            target_node_names = rand.sample(list(nodes_map), 3) + ['missing']
+
+            nodes, edges = wfp.get_target_objects(graph, list(nodes_map.values()), target_node_names)
+
+            self.assertEqual(get_target_names_by_maps(adj_map, rev_map, nodes_map, target_node_names),
+                             ({node.name for node in nodes}, {(edge.from_.name, edge.to_.name) for edge in edges}))
+            self.assertEqual(len(edges), len({(edge.from_.name, edge.to_.name) for edge in edges}))
+
+            for name in target_node_names[:-1]:
+                self.assertEqual('yellow', nodes_map[name].attr['fillcolor'])
+
+    def test_filter_objects(self):
+        names = ['S1', 'S2', 'S3', 'E0', 'E1', 'E2', 'E3']
+        nodes_map = {name: Node(name, attr={'id': name, 'type': 'SCRIPT' if name[0] == 'S' else 'EVENT'}) for name in names}
+        # E0 is a root event
+        edge_names = [('E0', 'S1'), ('S1', 'E1'), ('E1', 'S2'), ('E1', 'S3'), ('S2', 'E2'), ('E2', 'S3'), ('S3', 'E3')]
+
+        nodes, edges = WorkflowParser().filter_objects(CsrGraph(nodes_map, edge_names), list(nodes_map.values()))
+
+        self.assertEqual(['E0', 'S1', 'S2', 'S3'], sorted(node.name for node in nodes))
+        self.assertEqual(['E0 -> S1', 'S1 -> S2', 'S1 -> S3', 'S2 -> S3'], sorted(str(edge) for edge in edges))
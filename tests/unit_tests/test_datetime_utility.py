@@ -0,0 +1,21 @@
+from datetime import datetime
+from unittest import TestCase
+from util.datetime_utility import DatetimeUtility
+
+
+class TestDatetimeUtility(TestCase):
+    def test_has_ymd(self):
+        for s in ['"{yyyy-MM-dd}"', '/path/{yyyy}/{MM}/x.ss', '{MM_dd}', '{dd}', '{yyyy/MM/dd/HH}']:
+            with self.subTest(s=s):
+                self.assertTrue(DatetimeUtility.has_ymd(s))
+
+        # C# format strings and hour only placeholders
+        for s in ['{}', 'string.Format("{0}", x)', '{HH}', '{-HH}', 'yyyy-MM-dd', '/base']:
+            with self.subTest(s=s):
+                self.assertFalse(DatetimeUtility.has_ymd(s))
+
+    def test_replace_ymd(self):
+        target = datetime(2019, 1, 2, 3)
+
+        self.assertEqual('"2019-01-02"', DatetimeUtility.replace_ymd('"{yyyy-MM-dd}"', target))
+        self.assertEqual('/2019/01/02/03', DatetimeUtility.replace_ymd('/{yyyy/MM/dd/HH}', target))
@@ -0,0 +1,48 @@
+import pickle
+from unittest import TestCase
+from graph.node import Node, NodeIdAllocator, NodeRegistry
+from graph.edge import Edge, EdgeList
+
+
+class TestGraphModel(TestCase):
+    def setUp(self):
+        id_allocator = NodeIdAllocator()
+        self.a, self.b, self.c = [Node(name, id_allocator=id_allocator) for name in 'abc']
+
+    def test_node_registry(self):
+        nodes = NodeRegistry()
+
+        for node in [self.a, self.b, self.a, self.c, self.b]:
+            nodes.append(node)
+
+        self.assertEqual([self.a, self.b, self.c], list(nodes))
+        self.assertEqual(3, len(nodes))
+        self.assertIn(self.c, nodes)
+
+        # identity, not name
+        self.assertNotIn(Node('a'), nodes)
+
+    def test_edge_list(self):
+        edges = EdgeList()
+        edges.add(self.a, self.b)
+        edges.append(Edge(self.b, self.c, {'color': 'red'}))
+
+        self.assertEqual(['a -> b', 'b -> c'], [str(edge) for edge in edges])
+        self.assertEqual({}, edges[0].attr)
+        self.assertEqual({'color': 'red'}, edges[-1].attr)
+        self.assertIs(self.c, edges[1].to_)
+        self.assertEqual(2, len(edges))
+
+    def test_edge_attr_not_shared(self):
+        Edge(self.a, self.b).attr['color'] = 'red'
+
+        self.assertEqual({}, Edge(self.a, self.c).attr)
+
+    def test_pickle(self):
+        nodes = NodeRegistry([self.a, self.b, self.c])
+        edges = EdgeList([Edge(self.a, self.b), Edge(self.b, self.c)])
+
+        nodes, edges = pickle.loads(pickle.dumps((nodes, edges)))
+
+        self.assertEqual(['a', 'b', 'c'], [node.name for node in nodes])
+        self.assertIs(list(nodes)[1], edges[0].to_)
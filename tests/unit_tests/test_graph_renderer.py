@@ -0,0 +1,149 @@
+import os
+import sys
+import time
+import shutil
+import tempfile
+import threading
+import unittest
+from unittest import TestCase
+from graph.graph_renderer import GraphRenderer
+from graph.render_cache import RenderCache
+
+
+# stands in for dot: writes the format to every -o file, counts calls in <dot>.calls, sleeps and fails on request
+FAKE_ENGINE = '''#!{python}
+import sys, time
+args = sys.argv[1:]
+source = open(args[-1]).read()
+if 'sleep' in source:
+    time.sleep(30)
+formats = [a[2:] for a in args if a.startswith('-T')]
+if 'fail_pdf' in source and 'pdf' in formats:
+    sys.exit('cannot render pdf')
+with open(args[-1] + '.calls', 'a') as f:
+    f.write('x')
+for format, a in zip(formats, [a for a in args if a.startswith('-o')]):
+    with open(a[2:], 'w') as f:
+        f.write(format)
+'''
+
+
+def render_all(renderer, jobs):
+    ''' Render (dot_filepath, formats) jobs and wait for them
+
+    :return: {dot_filepath: error}, error is None for success
+    '''
+    for dot_filepath, formats in jobs:
+        renderer.submit([dot_filepath], formats, key=dot_filepath)
+
+    return dict(renderer.join())
+
+
+@unittest.skipIf(os.name == 'nt', 'fake engine is a script with a shebang')
+class TestGraphRenderer(TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.engine = os.path.join(self.folder, 'fake_dot')
+
+        with open(self.engine, 'w') as f:
+            f.write(FAKE_ENGINE.format(python=sys.executable))
+
+        os.chmod(self.engine, 0o755)
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def make_dot_file(self, name, content='digraph {}'):
+        filepath = os.path.join(self.folder, '{}.dot'.format(name))
+
+        with open(filepath, 'w') as f:
+            f.write(content)
+
+        return filepath
+
+    def test_render_all_formats_in_one_call(self):
+        dot_filepaths = [self.make_dot_file('g{}'.format(i)) for i in range(5)]
+
+        errors = render_all(GraphRenderer(concurrency=2, engine=self.engine), [(f, ['pdf', 'svg']) for f in dot_filepaths])
+
+        self.assertEqual({f: None for f in dot_filepaths}, errors)
+
+        for dot_filepath in dot_filepaths:
+            for format in ['pdf', 'svg']:
+                with open('{}.{}'.format(dot_filepath, format)) as f:
+                    self.assertEqual(format, f.read())
+
+            with open('{}.calls'.format(dot_filepath)) as f:
+                self.assertEqual('x', f.read())
+
+    def test_timeout(self):
+        renderer = GraphRenderer(timeout=1, engine=self.engine)
+
+        dot_filepath = self.make_dot_file('slow', 'sleep')
+        start = time.time()
+
+        self.assertEqual({dot_filepath: 'render timeout after 1s'}, render_all(renderer, [(dot_filepath, ['svg'])]))
+        self.assertLess(time.time() - start, 20)
+        self.assertEqual(1, renderer.failed)
+
+    def test_fallback_and_remove_dot(self):
+        renderer = GraphRenderer(engine=self.engine)
+
+        dot_filepath = self.make_dot_file('no_pdf', 'fail_pdf')
+        renderer.submit([dot_filepath], ['pdf'], keep_dot=False, key='no_pdf')
+
+        self.assertEqual([('no_pdf', None)], renderer.join())
+        self.assertTrue(os.path.isfile('{}.svg'.format(dot_filepath)))
+        self.assertFalse(os.path.isfile(dot_filepath))
+
+    def test_cache(self):
+        cache = RenderCache(os.path.join(self.folder, 'cache'))
+        dot_filepaths = [self.make_dot_file('g{}'.format(i)) for i in range(2)]
+
+        render_all(GraphRenderer(engine=self.engine, cache=cache), [(dot_filepaths[0], ['pdf', 'svg'])])
+        self.assertEqual((0, 2), (cache.hits, cache.misses))
+
+        # same dot source, rendered only for the format not cached
+        render_all(GraphRenderer(engine=self.engine, cache=cache), [(dot_filepaths[1], ['pdf', 'png'])])
+        self.assertEqual((1, 3), (cache.hits, cache.misses))
+
+        with open('{}.pdf'.format(dot_filepaths[1])) as f:
+            self.assertEqual('pdf', f.read())
+
+        self.assertTrue(os.path.isfile('{}.png'.format(dot_filepaths[1])))
+
+    def test_error(self):
+        renderer = GraphRenderer(engine=os.path.join(self.folder, 'missing'))
+
+        dot_filepath = self.make_dot_file('g')
+        error = render_all(renderer, [(dot_filepath, ['svg'])])[dot_filepath]
+
+        self.assertTrue(error.startswith('failed to run'))
+
+    def test_job_of_several_files(self):
+        renderer = GraphRenderer(concurrency=2, engine=self.engine)
+
+        dot_filepaths = [self.make_dot_file('part{}'.format(i)) for i in range(3)] + [self.make_dot_file('no_pdf', 'fail_pdf')]
+        renderer.submit(dot_filepaths, ['pdf'], key='split')
+        renderer.submit([], ['pdf'], key='empty')
+
+        # one result per job, after all its files
+        self.assertEqual([('empty', None), ('split', None)], sorted(renderer.join()))
+        self.assertEqual((2, 0), (renderer.rendered, renderer.failed))
+        self.assertTrue(os.path.isfile('{}.svg'.format(dot_filepaths[-1])))
+
+    def test_render_in_thread(self):
+        # e.g. a parse daemon request, dot is not started from the main thread
+        cache = RenderCache(os.path.join(self.folder, 'cache'))
+        dot_filepath = self.make_dot_file('g')
+        errors = {}
+
+        def render():
+            errors.update(render_all(GraphRenderer(engine=self.engine, cache=cache), [(dot_filepath, ['svg'])]))
+
+        thread = threading.Thread(target=render)
+        thread.start()
+        thread.join()
+
+        self.assertEqual({dot_filepath: None}, errors)
+        self.assertEqual((0, 1), (cache.hits, cache.misses))
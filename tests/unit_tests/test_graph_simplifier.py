@@ -0,0 +1,82 @@
+from unittest import TestCase
+from graph.node import Node, NodeIdAllocator
+from graph.edge import EdgeList
+from graph.graph_simplifier import GraphSimplifier
+from myparser.script_parser import ScriptParser
+
+
+class TestGraphSimplifier(TestCase):
+    def setUp(self):
+        self.id_allocator = NodeIdAllocator()
+
+    def make_graph(self, names, edge_names, attrs={}):
+        nodes = {name: Node(name, attr=attrs.get(name, {}), id_allocator=self.id_allocator) for name in names}
+        edges = EdgeList()
+
+        for from_name, to_name in edge_names:
+            edges.add(nodes[from_name], nodes[to_name])
+
+        return list(nodes.values()), edges
+
+    def simplify(self, nodes, edges):
+        new_nodes, new_edges = GraphSimplifier().simplify(nodes, edges)
+
+        return [node.name for node in new_nodes], sorted(str(edge) for edge in new_edges)
+
+    def test_script_chains(self):
+        content = '''
+A = SSTREAM "/a.ss";
+B = SELECT x FROM A;
+C = SELECT x FROM B;
+D = SELECT x FROM C;
+E = PROCESS D USING MyProcessor;
+F = SELECT x FROM E;
+G = SELECT x FROM F;
+OUTPUT G TO "/out.ss";
+'''
+        nodes, edges = ScriptParser().parse_content(content)
+        simplifier = GraphSimplifier()
+        new_nodes, new_edges = simplifier.simplify(nodes, edges)
+
+        # input, USING and output nodes are kept
+        self.assertEqual(['SSTREAM_"/a.ss"', 'A..D', 'E', 'F..G', '"/out.ss"'], [node.name for node in new_nodes])
+        self.assertEqual(['"/out.ss"', 'A..D', 'E', 'F..G'], sorted(str(edge.to_) for edge in new_edges))
+        self.assertEqual((9, 5), simplifier.node_counts)
+        self.assertEqual((4 / 9, 4 / 8), simplifier.get_reduction_ratios())
+
+        # parse results are not modified
+        self.assertEqual(9, len(nodes))
+        self.assertEqual(8, len(edges))
+
+        summary_node = list(new_nodes)[1]
+        self.assertEqual(list(nodes)[1].attr['id'], summary_node.attr['id'])
+        self.assertEqual(4, summary_node.attr['collapsed'])
+
+    def test_branches_are_kept(self):
+        # b has two children, d two parents, c alone is too short
+        nodes, edges = self.make_graph('abcdef', ['ab', 'bc', 'bd', 'cd', 'de', 'ef'])
+
+        self.assertEqual((list('abcdef'), ['a -> b', 'b -> c', 'b -> d', 'c -> d', 'd -> e', 'e -> f']),
+                         self.simplify(nodes, edges))
+
+        # duplicate edges count as one
+        nodes, edges = self.make_graph('abcd', ['ab', 'bc', 'bc', 'cd'])
+
+        self.assertEqual((['a', 'b..c', 'd'], ['a -> b..c', 'b..c -> d']), self.simplify(nodes, edges))
+
+    def test_view_boundaries(self):
+        names = ['<v1>_a', '<v1>_b', '<v1>_c', '<v2>_d', '<v2>_e', '<v2>_f']
+        nodes, edges = self.make_graph(names, zip(names, names[1:]))
+
+        # <v1>_c and <v2>_d are on the boundary
+        self.assertEqual(['<v1>_a', '<v1>_b', '<v1>_c', '<v2>_d', '<v2>_e', '<v2>_f'], self.simplify(nodes, edges)[0])
+
+        names = ['<v1>_a', '<v1>_b', '<v1>_c', '<v1>_d', '<v2>_e']
+        nodes, edges = self.make_graph(names, zip(names, names[1:]))
+
+        self.assertEqual(['<v1>_a', '<v1>_b..<v1>_c', '<v1>_d', '<v2>_e'], self.simplify(nodes, edges)[0])
+
+    def test_cycle(self):
+        nodes, edges = self.make_graph('abc', ['ab', 'bc', 'ca'])
+
+        self.assertEqual((list('abc'), ['a -> b', 'b -> c', 'c -> a']), self.simplify(nodes, edges))
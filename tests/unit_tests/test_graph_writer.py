@@ -0,0 +1,72 @@
+import io
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+from graph.node import Node, NodeIdAllocator
+from graph.edge import Edge
+from graph.graph_writer import GraphWriter
+from graph.graph_utility import GraphUtility
+from myparser.script_parser import ScriptParser
+
+
+class TestGraphWriter(TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def write_graph(self, nodes, edges, use_networkx):
+        gu = GraphUtility(nodes, edges, use_networkx=use_networkx)
+        dest_filepath = os.path.join(self.folder, 'nx' if use_networkx else 'native')
+
+        outputs = []
+
+        for filepath in [gu.to_dot_file(dest_filepath), gu.to_gexf_file(dest_filepath)]:
+            with open(filepath, encoding='utf-8') as f:
+                # the creator line names the writer
+                outputs.append([line for line in f if '<creator>' not in line])
+
+        return outputs
+
+    def assert_same_as_networkx(self, nodes, edges):
+        native_dot, native_gexf = self.write_graph(nodes, edges, use_networkx=False)
+        nx_dot, nx_gexf = self.write_graph(nodes, edges, use_networkx=True)
+
+        self.assertEqual(nx_dot, native_dot)
+        self.assertEqual(nx_gexf, native_gexf)
+
+    def test_script_graph(self):
+        with open(os.path.join(os.path.dirname(__file__), os.pardir, 'files', 'test_scope.script')) as f:
+            nodes, edges = ScriptParser().parse_content(f.read())
+
+        self.assert_same_as_networkx(nodes, edges)
+
+    def test_attrs_and_duplicates(self):
+        id_allocator = NodeIdAllocator()
+
+        a = Node('a', attr={'label': 'A "quoted"\nlabel', 'shape': 'box', 'weight': 2}, id_allocator=id_allocator)
+        b = Node('b_1', attr={'shape': '', 'flag': True}, id_allocator=id_allocator)
+        c = Node('c.d & <e>', id_allocator=id_allocator)
+
+        edges = [Edge(a, b), Edge(b, c, attr={'color': 'red'}), Edge(a, b), Edge(c, 'extra')]
+
+        self.assert_same_as_networkx([a, b, c, a], edges)
+
+    def test_self_loop_is_not_strict(self):
+        a = Node('a', id_allocator=NodeIdAllocator())
+
+        f = io.StringIO()
+        GraphWriter([a], [Edge(a, a)]).write_dot(f)
+
+        self.assertEqual('digraph  {\na [id=1, label=a];\na -> a;\n}\n', f.getvalue())
+
+    def test_quote_dot(self):
+        self.assertEqual('a_1', GraphWriter.quote_dot('a_1'))
+        self.assertEqual('12', GraphWriter.quote_dot('12'))
+        self.assertEqual('"a,b"', GraphWriter.quote_dot('a,b'))
+        self.assertEqual('"node"', GraphWriter.quote_dot('node'))
+        self.assertEqual('"a:b"', GraphWriter.quote_dot('a:b'))
+        self.assertEqual('"é"', GraphWriter.quote_dot('é'))
+        self.assertEqual('""', GraphWriter.quote_dot(''))
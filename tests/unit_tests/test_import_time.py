@@ -0,0 +1,42 @@
+import os
+import sys
+import subprocess
+from unittest import TestCase
+
+
+REPO_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, os.pardir)
+
+# only loaded by the code paths that parse scripts, render graphs or query cosmos
+HEAVY_MODULES = ['pyparsing', 'networkx', 'pydot', 'pygraphviz', 'graphviz', 'bs4', 'pycurl', 'dateutil',
+                 'asyncio', 'concurrent.futures', 'multiprocessing', 'sqlite3', 'scope_parser', 'cosmos',
+                 'myparser.script_parser']
+
+
+def get_imported_modules(statement):
+    ''' Run statement in a fresh interpreter
+
+    :return: set of names in its sys.modules afterwards
+    '''
+    code = '{}\nimport sys\nprint("\\n".join(sys.modules))'.format(statement)
+    proc = subprocess.run([sys.executable, '-c', code],
+                          cwd=REPO_ROOT, stdout=subprocess.PIPE, universal_newlines=True, check=True)
+
+    return set(proc.stdout.split())
+
+
+class TestImportTime(TestCase):
+    def assert_light(self, statement, module):
+        modules = get_imported_modules(statement)
+
+        # imported at all, otherwise there is nothing to check
+        self.assertIn(module, modules)
+
+        heavy = sorted(m for m in modules if any(m == h or m.startswith(h + '.') for h in HEAVY_MODULES))
+
+        self.assertEqual([], heavy)
+
+    def test_main(self):
+        self.assert_light('import main', 'main')
+
+    def test_workflow_parser(self):
+        self.assert_light('from myparser.workflow_parser import WorkflowParser', 'myparser.workflow_parser')
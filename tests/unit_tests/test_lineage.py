@@ -0,0 +1,103 @@
+from unittest import TestCase
+from scope_parser.select import Select
+from scope_parser.reduce import Reduce
+from scope_parser.combine import Combine
+from scope_parser.process import Process
+from scope_parser.output import Output
+from tests.input_utility import load_test_inputs
+
+
+class TestLineage(TestCase):
+    def assert_conformance(self, parser_class, test_filename):
+        full = parser_class()
+        lineage = parser_class(lineage_only=True)
+
+        inputs = load_test_inputs(test_filename)
+        # inputs the full grammar cannot parse are not compared, there should be none
+        skipped = []
+
+        self.assertTrue(inputs)
+
+        for test_name, s in inputs:
+            with self.subTest(test_name=test_name):
+                try:
+                    expected = full.parse(s)
+                except Exception:
+                    skipped.append(test_name)
+                    continue
+
+                self.assertEqual(expected, lineage.parse(s))
+
+        self.assertEqual([], skipped)
+
+    def test_select_conformance(self):
+        self.assert_conformance(Select, 'test_select.py')
+
+    def test_reduce_conformance(self):
+        self.assert_conformance(Reduce, 'test_reduce.py')
+
+    def test_combine_conformance(self):
+        self.assert_conformance(Combine, 'test_combine.py')
+
+    def test_process_conformance(self):
+        self.assert_conformance(Process, 'test_process.py')
+
+    def test_output_conformance(self):
+        self.assert_conformance(Output, 'test_output.py')
+
+    def test_skip_keyword_in_string(self):
+        s = '''
+        a = SELECT "FROM" AS Name,
+                   IF(x == 1, "WHERE", "UNION") AS Flag
+            FROM Step1
+            WHERE Name IN (SELECT Name FROM Step2)
+        '''
+
+        result = Select(lineage_only=True).parse(s)
+
+        self.assertTrue(result['assign_var'] == 'a')
+        self.assertCountEqual(result['sources'], ['Step1'])
+
+    def test_process_nested_parentheses(self):
+        s = '''
+        SMT =
+            PROCESS
+            (
+                SELECT Keyword, IF(A > 0, (B), C) AS D
+                FROM DECorpus
+            )
+            USING GenericExeInvokingProcessor("a", "b")
+        '''
+
+        result = Process(lineage_only=True).parse(s)
+
+        self.assertTrue(result['assign_var'] == 'SMT')
+        self.assertTrue(result['using'] is not None)
+        self.assertCountEqual(result['sources'], ['DECorpus'])
+
+    def test_process_select_sources(self):
+        s = '''
+        SMT =
+            PROCESS
+            (
+                SELECT Keyword, Title
+                FROM DECorpus
+            )
+            USING GenericExeInvokingProcessor("a", "b")
+        '''
+
+        self.assertEqual(Process().parse(s), Process(lineage_only=True).parse(s))
+        self.assertCountEqual(Process().parse(s)['sources'], ['DECorpus'])
+
+    def test_skip_verbatim_string(self):
+        # a backslash does not escape the closing quote of a verbatim string, "" does
+        s = r'''
+        a = SELECT @"C:\dir\" AS Path, @"say ""FROM""" AS Quote
+            FROM Step1
+            WHERE Path != @"D:\"
+        '''
+
+        result = Select(lineage_only=True).parse(s)
+
+        self.assertTrue(result['assign_var'] == 'a')
+        self.assertCountEqual(result['sources'], ['Step1'])
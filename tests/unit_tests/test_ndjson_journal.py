@@ -0,0 +1,57 @@
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+from util.ndjson_journal import NdjsonJournal
+
+
+class TestNdjsonJournal(TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.filepath = os.path.join(self.folder, 'checkpoint.ndjson')
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def test_append_and_read(self):
+        journal = NdjsonJournal(self.filepath)
+        self.assertEqual([], journal.read())
+
+        journal.open(append=False)
+        journal.append({'artifact': 'A/S1.script', 'status': 'ok'})
+        journal.append({'artifact': 'A/S2.script', 'status': 'error'})
+
+        # readable before close, i.e. after a crash
+        self.assertEqual(['A/S1.script', 'A/S2.script'], [r['artifact'] for r in NdjsonJournal(self.filepath).read()])
+
+        journal.close()
+
+    def test_restart_and_resume(self):
+        journal = NdjsonJournal(self.filepath)
+        journal.append({'n': 1})
+        journal.close()
+
+        journal.open(append=True)
+        journal.append({'n': 2})
+        journal.close()
+
+        self.assertEqual([{'n': 1}, {'n': 2}], journal.read())
+
+        journal.open(append=False)
+        journal.append({'n': 3})
+        journal.close()
+
+        self.assertEqual([{'n': 3}], journal.read())
+
+    def test_torn_last_line(self):
+        with open(self.filepath, 'w') as f:
+            f.write('{"n": 1}\n{"n": ')
+
+        journal = NdjsonJournal(self.filepath)
+        self.assertEqual([{'n': 1}], journal.read())
+
+        journal.open(append=True)
+        journal.append({'n': 2})
+        journal.close()
+
+        self.assertEqual([{'n': 1}, {'n': 2}], journal.read())
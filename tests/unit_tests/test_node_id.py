@@ -0,0 +1,37 @@
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+from graph.node import Node, NodeIdAllocator
+from graph.graph_utility import GraphUtility
+from myparser.script_parser import ScriptParser
+
+
+class TestNodeId(TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+
+        with open(os.path.join(os.path.dirname(__file__), os.pardir, 'files', 'test_scope.script')) as f:
+            self.content = f.read()
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def test_allocator(self):
+        id_allocator = NodeIdAllocator()
+
+        self.assertEqual([1, 2], [Node(name, id_allocator=id_allocator).attr['id'] for name in 'ab'])
+        self.assertEqual('x', Node('c', attr={'id': 'x'}, id_allocator=id_allocator).attr['id'])
+        self.assertEqual(3, id_allocator.next_id())
+
+    def write_graph(self, name):
+        nodes, edges = ScriptParser().parse_content(self.content)
+        gu = GraphUtility(nodes, edges)
+
+        dest_filepath = os.path.join(self.folder, name)
+        return gu.to_dot_file(dest_filepath), gu.to_gexf_file(dest_filepath)
+
+    def test_identical_output(self):
+        for filepath_1, filepath_2 in zip(self.write_graph('a'), self.write_graph('b')):
+            with open(filepath_1, 'rb') as f_1, open(filepath_2, 'rb') as f_2:
+                self.assertEqual(f_1.read(), f_2.read())
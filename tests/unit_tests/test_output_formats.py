@@ -0,0 +1,30 @@
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+from graph.graph_utility import GraphUtility
+from myparser.script_parser import ScriptParser
+
+
+class TestOutputFormats(TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.script_filepath = os.path.join(os.path.dirname(__file__), os.pardir, 'files', 'test_scope.script')
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def test_only_requested_formats(self):
+        dest_filepath = os.path.join(self.folder, 'test_scope.script')
+
+        ScriptParser().parse_file(self.script_filepath, dest_filepath=dest_filepath, output_formats=['dot'])
+        self.assertEqual(['test_scope.script.dot'], os.listdir(self.folder))
+
+        ScriptParser().parse_file(self.script_filepath, dest_filepath=dest_filepath, output_formats=['gexf'])
+        self.assertEqual(['test_scope.script.dot', 'test_scope.script.gexf'], sorted(os.listdir(self.folder)))
+
+    def test_check_output_formats(self):
+        GraphUtility.check_output_formats(['gexf', 'dot', 'pdf', 'svg', 'png'])
+
+        with self.assertRaises(ValueError):
+            GraphUtility.check_output_formats(['pdf', 'docx'])
@@ -0,0 +1,75 @@
+import random
+from unittest import TestCase
+from myparser.param_template import ParamTemplate
+from myparser.workflow_parser import WorkflowObj, WorkflowParser
+
+
+class TestParamTemplate(TestCase):
+    def test_resolve(self):
+        master_params = {'Root': '/shares/root', 'Date': '2019-09-09', 'Empty': None}
+        template = ParamTemplate('\\"$(Root)/$(Date)/$(Missing)/$(Empty)/$(Root)\\"')
+
+        self.assertEqual('"/shares/root/2019-09-09/$(Missing)/$(Empty)//shares/root"', template.resolve(master_params))
+        self.assertEqual('plain "value"', ParamTemplate('plain \\"value\\"').resolve(master_params))
+
+    def test_nested_placeholders(self):
+        # replace_params also substitutes placeholders coming with a substituted value
+        master_params = {'A': '$(B)', 'B': 'b', 'C': '$', 'D': '(B)'}
+
+        for param_str in ['$(A)/$(B)', '$(B)/$(A)', '$$(D)-$(B)', '$(C)$(D)-$(B)', '$(x$(B)']:
+            with self.subTest(param_str=param_str):
+                self.assertEqual(ParamTemplate.replace_params(master_params, param_str),
+                                 ParamTemplate(param_str).resolve(master_params))
+
+    def test_same_as_replace_params(self):
+        rand = random.Random(0)
+        pieces = ['$(A)', '$(B)', '$(C)', '$(N)', '$(', '$', '(', ')', 'A', '/', '\\"', '\\', '"', '\n', 'x']
+        mismatches = []
+
+        for _ in range(2000):
+            master_params = {name: rand.choice([None, 'v', '/p/' + name, '$(B)', '$', '(A)', '"', '\\'])
+                             for name in 'ABC'}
+            param_str = ''.join(rand.choice(pieces) for _ in range(rand.randint(0, 8)))
+
+            expected = ParamTemplate.replace_params(master_params, param_str)
+
+            if ParamTemplate(param_str).resolve(master_params) != expected:
+                mismatches.append((param_str, master_params, expected))
+
+        self.assertEqual([], mismatches)
+
+
+class TestGetParams(TestCase):
+    def setUp(self):
+        self.obj = WorkflowObj()
+        self.obj.masters = {'M1': {'parameters': {'Root': '/m1'}}, 'M2': {'parameters': {'Root': '/m2'}}}
+        self.obj.workflows = {'P1': {'ScopeJobParams': ['-params In=\\"$(Root)/in\\",Hour={HH}', '-other x']}}
+        self.obj.process_master_map = {'P1': 'M1'}
+
+        self.wfp = WorkflowParser()
+
+    def test_cached_per_master_key(self):
+        self.assertEqual({'In': '"/m1/in"', 'Hour': '{HH}'}, self.wfp.get_params(self.obj, 'P1'))
+        self.assertEqual({'In': '"/m2/in"', 'Hour': '{HH}'}, self.wfp.get_params(self.obj, 'P1', master_key='M2'))
+
+        # callers change the returned map
+        param_map = self.wfp.get_params(self.obj, 'P1')
+        param_map['In'] = 'changed'
+
+        self.assertEqual('"/m1/in"', self.wfp.get_params(self.obj, 'P1')['In'])
+        self.assertEqual({('P1', 'M1'), ('P1', 'M2')}, set(self.obj.param_maps))
+
+    def test_invalidated(self):
+        self.wfp.get_params(self.obj, 'P1')
+
+        # configs parsed again
+        self.obj.masters['M1'] = {'parameters': {'Root': '/new'}}
+        self.assertEqual('"/new/in"', self.wfp.get_params(self.obj, 'P1')['In'])
+
+        self.obj.workflows['P1'] = {'ScopeJobParams': ['-params Out=$(Root)']}
+        self.assertEqual({'Out': '/new'}, self.wfp.get_params(self.obj, 'P1'))
+
+        # changed in place
+        self.obj.masters['M1']['parameters']['Root'] = '/in_place'
+        self.obj.clear_caches()
+        self.assertEqual({'Out': '/in_place'}, self.wfp.get_params(self.obj, 'P1'))
@@ -0,0 +1,65 @@
+import os
+import tempfile
+import shutil
+from unittest import TestCase
+from myparser.parse_cache import ParseCache
+from myparser.script_parser import ScriptParser
+
+
+class TestParseCache(TestCase):
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.script_filepath = os.path.join(os.path.dirname(__file__), os.pardir, 'files', 'test_scope.script')
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_dir)
+
+    def test_put_get(self):
+        cache = ParseCache(self.cache_dir)
+        cache.put('key', ([1, 2], [3]))
+
+        self.assertEqual(([1, 2], [3]), cache.get('key'))
+        self.assertIsNone(cache.get('other_key'))
+        self.assertEqual(1, cache.hits)
+        self.assertEqual(1, cache.misses)
+
+    def test_key_params_flags(self):
+        cache = ParseCache(self.cache_dir)
+
+        key = cache.make_key('content', {'a': '1'}, {'lineage_only': False})
+
+        self.assertEqual(key, cache.make_key('content', {'a': '1'}, {'lineage_only': False}))
+        self.assertNotEqual(key, cache.make_key('content2', {'a': '1'}, {'lineage_only': False}))
+        self.assertNotEqual(key, cache.make_key('content', {'a': '2'}, {'lineage_only': False}))
+        self.assertNotEqual(key, cache.make_key('content', {'a': '1'}, {'lineage_only': True}))
+
+    def test_evict_lru(self):
+        cache = ParseCache(self.cache_dir, max_bytes=2500)
+
+        cache.put('a', 'x' * 1000)
+        cache.put('b', 'x' * 1000)
+        cache.get('a')  # b becomes the least recently used
+        cache.put('c', 'x' * 1000)
+
+        self.assertIsNotNone(cache.get('a'))
+        self.assertIsNone(cache.get('b'))
+        self.assertIsNotNone(cache.get('c'))
+        self.assertTrue(cache.get_total_bytes() <= 2500)
+
+    def test_shared_between_instances(self):
+        ParseCache(self.cache_dir).put('key', 'value')
+
+        self.assertEqual('value', ParseCache(self.cache_dir).get('key'))
+
+    def test_script_parser_cached(self):
+        with open(self.script_filepath) as f:
+            content = f.read()
+
+        cache = ParseCache(self.cache_dir)
+
+        nodes, edges = ScriptParser(parse_cache=cache).parse_content(content)
+        cached_nodes, cached_edges = ScriptParser(parse_cache=cache).parse_content(content)
+
+        self.assertEqual(1, cache.hits)
+        self.assertEqual([str(node) for node in nodes], [str(node) for node in cached_nodes])
+        self.assertEqual([str(edge) for edge in edges], [str(edge) for edge in cached_edges])
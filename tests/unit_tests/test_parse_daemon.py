@@ -0,0 +1,128 @@
+import os
+import shutil
+import tempfile
+import threading
+from unittest import TestCase
+import main
+from myparser.parse_daemon import ParseDaemon, WorkflowObjCache, request_daemon
+from tests.input_utility import PROCESS_CONFIG, SCRIPT, write_file, make_workflow_group
+
+
+class TestParseDaemon(TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.wf_folder = os.path.join(self.folder, 'Group')
+        self.out_folder = os.path.join(self.folder, 'out')
+
+        make_workflow_group(self.wf_folder, {'P1': SCRIPT})
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def start_daemon(self, handlers):
+        parse_daemon = ParseDaemon(handlers, port=0)
+        thread = threading.Thread(target=parse_daemon.serve_forever, daemon=True)
+        thread.start()
+
+        self.addCleanup(thread.join)
+        self.addCleanup(parse_daemon.shutdown)
+
+        return parse_daemon.address[1]
+
+    def test_workflow_cache(self):
+        cache = WorkflowObjCache()
+
+        obj, hit = cache.get(self.wf_folder)
+        self.assertFalse(hit)
+        self.assertEqual(['P1'], list(obj.workflows))
+
+        self.assertIs(obj, cache.get(self.wf_folder)[0])
+
+        # a new config invalidates the folder
+        write_file(self.wf_folder, 'P2.config', PROCESS_CONFIG.format(process='P2'))
+
+        obj, hit = cache.get(self.wf_folder)
+        self.assertFalse(hit)
+        self.assertEqual(['P1', 'P2'], sorted(obj.workflows))
+        self.assertEqual((1, 2), (cache.hits, cache.misses))
+
+    def test_requests(self):
+        port = self.start_daemon({'/echo': lambda payload, workflow_cache: {'echo': payload['x']},
+                                  '/fail': lambda payload, workflow_cache: {}['missing']})
+
+        self.assertEqual(['/echo', '/fail'], request_daemon('/status', port=port)['paths'])
+
+        reply = request_daemon('/echo', {'x': [1, 2]}, port=port)
+        self.assertEqual((True, [1, 2]), (reply['ok'], reply['echo']))
+
+        self.assertEqual({'ok': False, 'error': "KeyError: 'missing'"}, request_daemon('/fail', {}, port=port))
+        self.assertFalse(request_daemon('/unknown', {}, port=port)['ok'])
+
+        self.assertEqual((2, 1), (request_daemon('/status', port=port)['requests'],
+                                  request_daemon('/status', port=port)['errors']))
+
+    def test_concurrent_requests(self):
+        port = self.start_daemon({'/echo': lambda payload, workflow_cache: {'echo': payload['x']},
+                                  '/fail': lambda payload, workflow_cache: {'error': 'failed'}})
+
+        def send(client_no):
+            for i in range(20):
+                request_daemon('/fail' if i % 4 == 0 else '/echo', {'x': client_no}, port=port)
+
+        clients = [threading.Thread(target=send, args=(client_no,)) for client_no in range(8)]
+
+        for client in clients:
+            client.start()
+
+        for client in clients:
+            client.join()
+
+        status = request_daemon('/status', port=port)
+        self.assertEqual((160, 40), (status['requests'], status['errors']))
+
+    def test_parse_script_and_dep_graph(self):
+        port = self.start_daemon(main.get_daemon_handlers(use_cache=False))
+
+        payload = {'proj_folder': self.wf_folder,
+                   'target_filename': 'P1.script',
+                   'output_folder': self.out_folder,
+                   'output_formats': ['dot']}
+
+        reply = request_daemon('/parse_script', payload, port=port)
+
+        self.assertTrue(reply['ok'], reply)
+        self.assertFalse(reply['workflow_cache_hit'])
+        self.assertEqual([os.path.join(self.out_folder, 'P1.script.dot')], reply['files'])
+
+        with open(reply['files'][0]) as f:
+            self.assertIn('Data -> "/out.ss"', f.read())
+
+        reply = request_daemon('/dep_graph', {'proj_folder': self.wf_folder,
+                                              'output_folder': self.out_folder,
+                                              'output_formats': ['gexf']}, port=port)
+
+        self.assertTrue(reply['workflow_cache_hit'])
+        self.assertEqual(1, len(reply['files']))
+        self.assertTrue(reply['files'][0].endswith('.gexf'))
+
+        reply = request_daemon('/parse_script', dict(payload, target_filename='missing.script'), port=port)
+        self.assertEqual('script [missing.script] not found in [{}]'.format(self.wf_folder), reply['error'])
+
+    def test_reachability(self):
+        port = self.start_daemon(main.get_daemon_handlers(use_cache=False))
+
+        payload = {'proj_folder': self.wf_folder, 'query': 'downstream', 'node_names': ['Start']}
+
+        reply = request_daemon('/reachability', payload, port=port)
+        self.assertTrue(reply['ok'], reply)
+        self.assertEqual(['P1.script', 'P1Done'], reply['nodes'])
+
+        reply = request_daemon('/reachability', dict(payload, query='upstream', node_names=['P1'], output_folder=self.out_folder, output_formats=['dot']), port=port)
+        self.assertTrue(reply['workflow_cache_hit'])
+        self.assertEqual(['Start'], reply['nodes'])
+        self.assertEqual([os.path.join(self.out_folder, 'reachable_[Group]_up_nodes[P1].dot')], reply['files'])
+
+        reply = request_daemon('/reachability', dict(payload, query='path_exists', node_names=['P1Done', 'Start']), port=port)
+        self.assertIs(False, reply['path_exists'])
+
+        self.assertFalse(request_daemon('/reachability', dict(payload, query='unknown'), port=port)['ok'])
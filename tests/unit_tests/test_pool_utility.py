@@ -0,0 +1,60 @@
+import time
+from unittest import TestCase
+from util.pool_utility import PoolUtility
+
+
+_offset = 0
+
+
+def init_offset(offset):
+    global _offset
+    _offset = offset
+
+
+def add_offset(x):
+    return x + _offset
+
+
+def sleep_seconds(seconds):
+    time.sleep(seconds)
+    return seconds
+
+
+class TestPoolUtility(TestCase):
+    def test_imap_unordered(self):
+        pool = PoolUtility(processes=3, initializer=init_offset, initargs=(100,), chunksize=2)
+
+        results = list(pool.imap_unordered(add_offset, range(10)))
+
+        self.assertEqual(list(range(10)), sorted(task for task, _, _ in results))
+        self.assertTrue(all(result == task + 100 for task, result, _ in results))
+        self.assertFalse(any(timed_out for _, _, timed_out in results))
+
+    def test_timeout(self):
+        pool = PoolUtility(processes=2, timeout=1, maxtasksperchild=1)
+
+        start = time.time()
+        results = {task: (result, timed_out) for task, result, timed_out in pool.imap_unordered(sleep_seconds, [0, 60, 0.1, 0])}
+
+        self.assertLess(time.time() - start, 30)
+        self.assertEqual((None, True), results[60])
+        self.assertEqual((0.1, False), results[0.1])
+        self.assertEqual((0, False), results[0])
+
+    def test_timeout_while_results_stream(self):
+        pool = PoolUtility(processes=2, timeout=1)
+
+        # the quick tasks keep one worker returning results well within the poll time for 3s
+        tasks = [3600] + [0.02] * 150
+        results = list(pool.imap_unordered(sleep_seconds, tasks))
+
+        timed_out = [i for i, (_, _, timed_out) in enumerate(results) if timed_out]
+
+        self.assertEqual(151, len(results))
+        self.assertEqual(1, len(timed_out))
+        self.assertEqual((3600, None), results[timed_out[0]][:2])
+        # killed at about 1s, not after the quick tasks ran out
+        self.assertLess(timed_out[0], 120)
+
+    def test_timeout_forces_chunksize_one(self):
+        self.assertEqual(1, PoolUtility(chunksize=8, timeout=5).chunksize)
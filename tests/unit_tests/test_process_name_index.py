@@ -0,0 +1,102 @@
+import os
+import random
+import editdistance
+from unittest import TestCase
+from myparser.process_name_index import ProcessNameIndex
+from myparser.workflow_parser import WorkflowObj, WorkflowParser
+
+
+def get_closest_linear(process_key, process_names, script_process_map):
+    ''' The scan ProcessNameIndex replaces
+    '''
+    if process_key in process_names:
+        return process_key
+
+    if process_key in script_process_map:
+        return script_process_map[process_key]
+
+    process_key_core = os.path.splitext(process_key)[0]
+    for script_name in script_process_map:
+        if process_key_core in script_name:
+            return script_process_map[script_name]
+
+    min_key = process_key
+    min_dist = len(process_key) * 2
+
+    for key in process_names:
+        dist = editdistance.eval(key, process_key)
+        if dist < min_dist:
+            min_dist = dist
+            min_key = key
+
+    return min_key
+
+
+class TestProcessNameIndex(TestCase):
+    def setUp(self):
+        self.process_names = ['NKWOptMPIProcessing', 'NKWOptMPIProcessing2', 'DailyAgg', 'DailyAgh', 'HourlyAgg']
+        self.script_process_map = {'NKWOptMPIProcessing3.script': 'NKWOptMPIProcessing',
+                                   'NKWOptMPIProcessing2.script': 'NKWOptMPIProcessing2',
+                                   'Daily.script': 'DailyAgg',
+                                   'HourlyAgg.script': 'HourlyAgg'}
+        self.index = ProcessNameIndex(self.process_names, self.script_process_map)
+
+    def test_lookups(self):
+        # exact
+        self.assertEqual('DailyAgh', self.index.get_closest('DailyAgh'))
+        self.assertEqual('DailyAgg', self.index.get_closest('Daily.script'))
+
+        # the first script containing the key
+        self.assertEqual('NKWOptMPIProcessing', self.index.get_closest('NKWOptMPI.script'))
+        self.assertEqual('DailyAgg', self.index.get_closest('ai'))
+
+        # edit distance, DailyAgg and DailyAgh are both 1 away, the first one wins
+        self.assertEqual('DailyAgg', self.index.get_closest('DailyAgf'))
+        self.assertEqual('HourlyAgg', self.index.get_closest('HourlyAxg'))
+
+        # nothing close enough
+        self.assertEqual('Q', self.index.get_closest('Q'))
+        self.assertEqual('', ProcessNameIndex([], {}).get_closest(''))
+
+    def test_same_as_linear_scan(self):
+        rand = random.Random(0)
+        alphabet = 'abcdeAB_1'
+
+        for _ in range(20):
+            process_names = list({''.join(rand.choice(alphabet) for _ in range(rand.randint(1, 10))) for _ in range(100)})
+            script_process_map = {}
+
+            for name in rand.sample(process_names, 50):
+                script_process_map.setdefault(name[:rand.randint(1, len(name))] + rand.choice(['', 'x']) + '.script', name)
+
+            index = ProcessNameIndex(process_names, script_process_map)
+            mismatches = []
+
+            for _ in range(200):
+                key = ''.join(rand.choice(alphabet) for _ in range(rand.randint(0, 12))) + rand.choice(['', '.script'])
+                expected = get_closest_linear(key, process_names, script_process_map)
+
+                if index.get_closest(key) != expected:
+                    mismatches.append((key, expected, index.get_closest(key)))
+
+            self.assertEqual([], mismatches)
+
+    def test_workflow_obj(self):
+        obj = WorkflowObj()
+        obj.workflows = {name: {} for name in self.process_names}
+        obj.script_process_map = dict(self.script_process_map)
+
+        wfp = WorkflowParser()
+
+        self.assertEqual('NKWOptMPIProcessing2', wfp.get_closest_process_name('NKWOptMPIProcessing2.script', obj))
+        self.assertIs(obj.get_process_name_index(), obj.get_process_name_index())
+
+        # rebuilt after the maps are assigned, e.g. renamed by a reparse with the same sizes
+        obj.workflows = {name.replace('NKWOpt', 'KWOpt'): {} for name in self.process_names}
+        obj.script_process_map = {name: process_name.replace('NKWOpt', 'KWOpt') for name, process_name in self.script_process_map.items()}
+        self.assertEqual('KWOptMPIProcessing2', wfp.get_closest_process_name('NKWOptMPIProcessing2.script', obj))
+
+        # or changed in place and the caches cleared
+        obj.workflows['NewProcess'] = {}
+        obj.clear_caches()
+        self.assertEqual('NewProcess', wfp.get_closest_process_name('NewProces', obj))
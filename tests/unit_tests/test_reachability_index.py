@@ -0,0 +1,143 @@
+import os
+import random
+import shutil
+import tempfile
+from unittest import TestCase
+from graph.csr_graph import CsrGraph
+from graph.reachability_index import ReachabilityIndex
+from myparser.workflow_parser import WorkflowObj, WorkflowParser
+
+
+MASTER_CONFIG = '''<Config><SqlConnectionString>x</SqlConnectionString>
+<Parameters><Parameter><Name>Root</Name><Value>/root</Value></Parameter></Parameters>
+<Workflows>{workflows}</Workflows></Config>
+'''
+
+WORKFLOW = '<Workflow><Process>{process}</Process><Group>G1</Group></Workflow>'
+
+PROCESS_CONFIG = '''<Config><Process>{process}</Process><ClassName>ScopeJobRunner</ClassName>
+<Parameters>
+<Parameter><Name>ScriptFile</Name><Value>Scripts/{process}.script</Value></Parameter>
+<Parameter><Name>EventName</Name><Value>{process}Done</Value></Parameter>
+<Parameter><Name>DeltaInterval</Name><Value>1.00:00:00</Value></Parameter>
+<Parameter><Name>EventNamesToCheck</Name><Value>{events}</Value></Parameter>
+</Parameters></Config>
+'''
+
+# P1 -> P2 -> P4, P1 -> P3, P5 on its own
+PROCESS_EVENTS = {'P1': ['Start'], 'P2': ['P1Done'], 'P3': ['P1Done'], 'P4': ['P2Done'], 'P5': ['Other']}
+
+
+class TestReachabilityIndex(TestCase):
+    def test_components(self):
+        # a <-> b -> c -> d -> c, e alone
+        graph = CsrGraph('abcde', ['ab', 'ba', 'bc', 'cd', 'dc'])
+        index = ReachabilityIndex(graph)
+
+        self.assertEqual(3, index.comp_count)
+        self.assertEqual(index.comps[0], index.comps[1])
+        self.assertEqual(index.comps[2], index.comps[3])
+        # reverse topological order
+        self.assertLess(index.comps[2], index.comps[0])
+
+        self.assertEqual([0, 1, 2, 3], sorted(index.downstream([1])))
+        self.assertEqual([0, 1, 2, 3], sorted(index.upstream([3])))
+        self.assertEqual([4], index.downstream([4]))
+        self.assertEqual([], index.downstream([]))
+
+        self.assertTrue(index.path_exists(1, 0))
+        self.assertTrue(index.path_exists(0, 3))
+        self.assertTrue(index.path_exists(4, 4))
+        self.assertFalse(index.path_exists(3, 0))
+        self.assertFalse(index.path_exists(0, 4))
+
+        self.assertEqual([(2, 3), (3, 2)], sorted(index.get_edges([2, 3])))
+
+    def test_same_as_traverse(self):
+        rand = random.Random(0)
+        mismatches = []
+
+        for _ in range(200):
+            n = rand.randint(1, 40)
+            graph = CsrGraph(range(n), [(rand.randrange(n), rand.randrange(n)) for _ in range(rand.randint(0, 2 * n))])
+            index = ReachabilityIndex(graph)
+
+            for i in range(n):
+                down = graph.traverse([i])
+
+                if sorted(index.downstream([i])) != sorted(down) or sorted(index.upstream([i])) != sorted(graph.traverse([i], reverse=True)):
+                    mismatches.append((n, i))
+
+                if [index.path_exists(i, j) for j in range(n)] != [j in down for j in range(n)]:
+                    mismatches.append((n, i))
+
+            starts = rand.sample(range(n), min(3, n))
+
+            if sorted(index.downstream(starts)) != sorted(graph.traverse(starts)):
+                mismatches.append((n, starts))
+
+        self.assertEqual([], mismatches)
+
+
+class TestWorkflowReachability(TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+
+        with open(os.path.join(self.folder, 'Master.config'), 'w') as f:
+            f.write(MASTER_CONFIG.format(workflows=''.join(WORKFLOW.format(process=p) for p in sorted(PROCESS_EVENTS))))
+
+        for process, events in PROCESS_EVENTS.items():
+            with open(os.path.join(self.folder, process + '.config'), 'w') as f:
+                f.write(PROCESS_CONFIG.format(process=process, events=''.join('<string>{}</string>'.format(e) for e in events)))
+
+        self.wfp = WorkflowParser()
+        self.obj = self.wfp.parse_folder(self.folder)
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def test_queries(self):
+        wfp, obj = self.wfp, self.obj
+
+        self.assertIs(wfp.get_reachability_index(obj), wfp.get_reachability_index(obj))
+
+        # process names stand for their scripts
+        self.assertTrue(wfp.path_exists(obj, 'P1', 'P4.script'))
+        self.assertTrue(wfp.path_exists(obj, 'Start', 'P3Done'))
+        self.assertFalse(wfp.path_exists(obj, 'P3', 'P4'))
+        self.assertFalse(wfp.path_exists(obj, 'P1', 'P5'))
+        self.assertIsNone(wfp.path_exists(obj, 'P1', 'missing'))
+
+    def test_reachable_objects(self):
+        wfp, obj = self.wfp, self.obj
+
+        nodes, edges = wfp.get_reachable_objects(obj, ['P2'])
+
+        self.assertEqual(['P1.script', 'P1Done', 'P2.script', 'P2Done', 'P4.script', 'P4Done', 'Start'], sorted(node.name for node in nodes))
+        self.assertEqual(['P1.script -> P1Done', 'P1Done -> P2.script', 'P2.script -> P2Done', 'P2Done -> P4.script',
+                          'P4.script -> P4Done', 'Start -> P1.script'], sorted(str(edge) for edge in edges))
+        self.assertEqual('yellow', [node for node in nodes if node.name == 'P2.script'][0].attr['fillcolor'])
+
+        # same as tracing down from the target
+        nodes_map, _, dep_edges = wfp.get_dep_objects(obj)
+        graph = CsrGraph(nodes_map, dep_edges)
+        down_nodes, down_edges = wfp.get_reachable_objects(obj, ['P1Done'], up=False)
+
+        self.assertEqual(sorted(graph.keys[i] for i in graph.traverse([graph.ids['P1Done']])), sorted(node.name for node in down_nodes))
+        self.assertEqual(6, len(down_edges))
+
+        # the cached nodes are not highlighted
+        dep_nodes, _ = wfp.get_reachability_index(obj)
+        self.assertNotIn('fillcolor', [node for node in dep_nodes if node.name == 'P2.script'][0].attr)
+
+    def test_not_in_snapshot(self):
+        self.wfp.get_reachability_index(self.obj)
+
+        snapshot_filepath = os.path.join(self.folder, 'snapshot.pickle')
+        self.obj.save(snapshot_filepath)
+
+        self.assertIsNotNone(self.obj.reachability_index)
+        self.assertIsNone(WorkflowObj.load(snapshot_filepath).reachability_index)
+
+        self.obj.clear_caches()
+        self.assertIsNone(self.obj.reachability_index)
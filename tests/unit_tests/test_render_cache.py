@@ -0,0 +1,82 @@
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+from graph.render_cache import RenderCache
+
+
+class TestRenderCache(TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.cache = RenderCache(os.path.join(self.folder, 'cache'), max_bytes=250)
+
+    def tearDown(self):
+        self.cache.close()
+        shutil.rmtree(self.folder)
+
+    def write_file(self, name, content):
+        filepath = os.path.join(self.folder, name)
+
+        with open(filepath, 'w') as f:
+            f.write(content)
+
+        return filepath
+
+    def read_file(self, name):
+        with open(os.path.join(self.folder, name)) as f:
+            return f.read()
+
+    def test_canonical_key(self):
+        self.assertEqual(self.cache.make_key('digraph {\r\n  a -> b;\r\n\r\n}\r\n', 'dot'),
+                         self.cache.make_key('digraph {\na -> b;\n}', 'dot'))
+        self.assertNotEqual(self.cache.make_key('digraph {\na -> b;\n}', 'dot'),
+                            self.cache.make_key('digraph {\nb -> a;\n}', 'dot'))
+        self.assertNotEqual(self.cache.make_key('digraph {}', 'dot'),
+                            self.cache.make_key('digraph {}', 'sfdp'))
+
+    def test_get_put(self):
+        key = self.cache.make_key('digraph {}', 'dot')
+        dest_filepath = os.path.join(self.folder, 'g.dot.pdf')
+
+        self.assertFalse(self.cache.get(key, 'pdf', dest_filepath))
+
+        self.cache.put(key, 'pdf', self.write_file('rendered.pdf', 'pdf'))
+
+        self.assertTrue(self.cache.get(key, 'pdf', dest_filepath))
+        self.assertEqual('pdf', self.read_file('g.dot.pdf'))
+
+        # hit again on an existing output
+        self.assertTrue(self.cache.get(key, 'pdf', dest_filepath))
+        self.assertEqual(['cache', 'g.dot.pdf', 'rendered.pdf'], sorted(os.listdir(self.folder)))
+
+        self.assertFalse(self.cache.get(key, 'svg', dest_filepath))
+        self.assertEqual((2, 2), (self.cache.hits, self.cache.misses))
+
+    def test_lru_eviction(self):
+        keys = [self.cache.make_key('digraph {{ {} }}'.format(i), 'dot') for i in range(3)]
+
+        self.cache.put(keys[0], 'pdf', self.write_file('0.pdf', 'a' * 100))
+        self.cache.put(keys[1], 'pdf', self.write_file('1.pdf', 'b' * 100))
+
+        # keys[0] is used more recently than keys[1]
+        self.assertTrue(self.cache.get(keys[0], 'pdf', os.path.join(self.folder, 'out.pdf')))
+
+        self.cache.put(keys[2], 'pdf', self.write_file('2.pdf', 'c' * 100))
+
+        self.assertEqual(200, self.cache.get_total_bytes())
+        self.assertFalse(os.path.isfile(self.cache.get_filepath(keys[1], 'pdf')))
+        self.assertFalse(self.cache.get(keys[1], 'pdf', os.path.join(self.folder, 'out1.pdf')))
+        self.assertTrue(self.cache.get(keys[0], 'pdf', os.path.join(self.folder, 'out0.pdf')))
+
+        # too large for the cache
+        self.cache.put(keys[1], 'svg', self.write_file('big.svg', 'd' * 300))
+        self.assertEqual(200, self.cache.get_total_bytes())
+
+    def test_missing_file(self):
+        key = self.cache.make_key('digraph {}', 'dot')
+
+        self.cache.put(key, 'pdf', self.write_file('rendered.pdf', 'pdf'))
+        os.remove(self.cache.get_filepath(key, 'pdf'))
+
+        self.assertFalse(self.cache.get(key, 'pdf', os.path.join(self.folder, 'g.dot.pdf')))
+        self.assertEqual(0, self.cache.get_total_bytes())
@@ -0,0 +1,102 @@
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+from graph.node import Node, NodeIdAllocator
+from graph.edge import EdgeList
+from graph.graph_utility import GraphUtility, RenderPolicy
+
+
+class TestRenderPolicy(TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.id_allocator = NodeIdAllocator()
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def make_chains(self, names_list):
+        ''' :return: nodes, edges of one chain per names list
+        '''
+        nodes = []
+        edges = EdgeList()
+
+        for names in names_list:
+            chain = [Node(name, id_allocator=self.id_allocator) for name in names]
+
+            for from_node, to_node in zip(chain, chain[1:]):
+                edges.add(from_node, to_node)
+
+            nodes.extend(chain)
+
+        return nodes, edges
+
+    def write_dot_files(self, nodes, edges, render_policy):
+        dest_filepath = os.path.join(self.folder, 'g')
+        output_files = GraphUtility(nodes, edges).to_files(dest_filepath, ['dot'], render_policy=render_policy)
+
+        return [os.path.basename(f) for f in output_files]
+
+    def read_file(self, name):
+        with open(os.path.join(self.folder, name)) as f:
+            return f.read()
+
+    def test_small_graph(self):
+        nodes, edges = self.make_chains([['a', 'b', 'c']])
+
+        self.assertEqual(['g.dot'], self.write_dot_files(nodes, edges, RenderPolicy(max_nodes=3)))
+        self.assertNotIn('layout', self.read_file('g.dot'))
+
+    def test_split_components(self):
+        nodes, edges = self.make_chains([['a1', 'a2', 'a3'], ['b1', 'b2'], ['c1', 'c2', 'c3']])
+
+        # b is packed with a, c does not fit anymore
+        self.assertEqual(['g.part1.dot', 'g.part2.dot'],
+                         self.write_dot_files(nodes, edges, RenderPolicy(max_nodes=5)))
+
+        part1 = self.read_file('g.part1.dot')
+        self.assertIn('a1 -> a2', part1)
+        self.assertIn('b1 -> b2', part1)
+        self.assertNotIn('c1', part1)
+        self.assertIn('c2 -> c3', self.read_file('g.part2.dot'))
+
+    def test_split_views(self):
+        nodes, edges = self.make_chains([['<v1>_a', '<v1>_b', '<v2>_a', '<v2>_b']])
+        policy = RenderPolicy(max_nodes=3)
+
+        self.assertEqual(['g.part1.dot', 'g.part2.dot'], self.write_dot_files(nodes, edges, policy))
+        self.assertNotIn('<v2>_a', self.read_file('g.part1.dot'))
+
+        # one connected component left as it is, laid out with the large graph engine
+        policy = RenderPolicy(max_nodes=3, split=RenderPolicy.SPLIT_COMPONENTS)
+        self.assertEqual(['g.dot'], self.write_dot_files(nodes, edges, policy))
+        self.assertIn('layout=sfdp', self.read_file('g.dot'))
+
+    def test_large_part(self):
+        nodes, edges = self.make_chains([['a1', 'a2', 'a3', 'a4'], ['b1', 'b2']])
+        policy = RenderPolicy(max_nodes=3, large_engine='neato')
+
+        self.assertEqual(['g.part1.dot', 'g.part2.dot'], self.write_dot_files(nodes, edges, policy))
+        self.assertIn('graph [layout=neato, overlap=false];', self.read_file('g.part1.dot'))
+        self.assertNotIn('layout', self.read_file('g.part2.dot'))
+
+    def test_no_split(self):
+        nodes, edges = self.make_chains([['a1', 'a2'], ['b1', 'b2']])
+        policy = RenderPolicy(max_edges=1, split=RenderPolicy.SPLIT_NONE)
+
+        self.assertEqual(['g.dot'], self.write_dot_files(nodes, edges, policy))
+        self.assertIn('layout=sfdp', self.read_file('g.dot'))
+
+    def test_from_config_file(self):
+        config_filepath = os.path.join(self.folder, 'config.ini')
+
+        with open(config_filepath, 'w') as f:
+            f.write('[RenderPolicy]\nmax_nodes = 10\nlarge_engine = neato\n')
+
+        policy = RenderPolicy.from_config_file(config_filepath)
+
+        self.assertEqual((10, RenderPolicy.DEFAULT_MAX_EDGES, 'neato', RenderPolicy.SPLIT_AUTO),
+                         (policy.max_nodes, policy.max_edges, policy.large_engine, policy.split))
+
+        with self.assertRaises(ValueError):
+            RenderPolicy(large_engine='dot')
@@ -0,0 +1,107 @@
+import os
+from unittest import TestCase
+from myparser.script_parser import ScriptParser
+from tests.input_utility import load_test_inputs
+
+
+def preprocess_regex_chain(sp, content):
+    ''' Reference of ScriptParser.preprocess, one regex pass of the ScriptParser helpers per rule
+    '''
+    content = sp.remove_comments(content)
+    content = sp.remove_if(content)
+    content = sp.remove_if(content)  # for nested if
+    content = sp.resolve_external_params(content, sp.external_params)
+    content = sp.expand_loop(content)
+    content = sp.remove_data_hint(content)
+    content = sp.remove_split_reserved_char(content)
+    content = sp.remove_ascii_non_target(content)
+
+    return content
+
+
+class TestScriptPreprocessor(TestCase):
+    def setUp(self):
+        self.sp = ScriptParser()
+        self.sp.external_params.update({'Param': '"value"', 'Path': '/path/to/data'})
+
+    def assert_same_as_regex_chain(self, content):
+        self.assertEqual(preprocess_regex_chain(self.sp, content), self.sp.preprocess(content))
+
+    def test_scope_script(self):
+        filepath = os.path.join(os.path.dirname(__file__), os.pardir, 'files', 'test_scope.script')
+
+        with open(filepath) as f:
+            self.assert_same_as_regex_chain(f.read())
+
+    def test_unit_test_inputs(self):
+        for test_filename in os.listdir(os.path.dirname(__file__)):
+            if not test_filename.startswith('test_') or not test_filename.endswith('.py'):
+                continue
+
+            for test_name, s in load_test_inputs(test_filename):
+                with self.subTest(test_name=test_name):
+                    self.assert_same_as_regex_chain(s)
+
+    def test_if_else(self):
+        s = '''
+        #IF (@@DebugMode@@ == "true")
+            #DECLARE Out string = "/local/debug.ss";
+        #ELSE
+            #DECLARE Out string = "@@Path@@/out.ss";
+        #ENDIF
+        '''
+
+        self.assert_same_as_regex_chain(s)
+        self.assertNotIn('#IF', self.sp.preprocess(s))
+        self.assertNotIn('#ELSE', self.sp.preprocess(s))
+
+    def test_nested_if(self):
+        s = '''
+        #IF (A)
+            a = SELECT * FROM b;
+            #IF (B)
+                c = SELECT * FROM d;
+            #ENDIF
+        #ENDIF
+        e = SELECT * FROM f;
+        '''
+
+        self.assert_same_as_regex_chain(s)
+
+    def test_comment_in_string(self):
+        s = '''
+        a = SELECT "http://host/path" AS Url, // the url
+               @"C:\\dir\\" AS Dir /* dir
+               */
+        FROM b;
+        '''
+
+        self.assert_same_as_regex_chain(s)
+        self.assertIn('"http://host/path"', self.sp.preprocess(s))
+
+    def test_param_in_string(self):
+        s = '''
+        #DECLARE In string = "@@Param@@";
+        #DECLARE Base string = "@@Path@@/@@Unknown@@";
+        '''
+
+        self.assert_same_as_regex_chain(s)
+        self.assertIn('/path/to/data/@@Unknown@@', self.sp.preprocess(s))
+
+    def test_data_hint(self):
+        s = '''
+        a = SELECT Keyword.Split(';').Length AS Cnt FROM b [ROWCOUNT=100]
+            [PARTITION=(PARTITIONCOUNT=2000)]
+            [LOWDISTINCTNESS(MatchTypeId)]
+            [Privacy.Asset.NonPersonal]
+            [ PARTITION(BiddedKeyword) ];
+        '''
+
+        self.assert_same_as_regex_chain(s)
+        self.assertNotIn('[', self.sp.preprocess(s))
+
+    def test_non_ascii(self):
+        s = 'a\xa0= SELECT\u00e9 * FROM b;'
+
+        self.assert_same_as_regex_chain(s)
+        self.assertEqual('a= SELECT * FROM b;', self.sp.preprocess(s))
@@ -0,0 +1,51 @@
+from unittest import TestCase
+from myparser.statement_splitter import StatementSplitter
+
+
+class TestStatementSplitter(TestCase):
+    def split(self, content):
+        return list(StatementSplitter().split(content))
+
+    def test_basic(self):
+        content = 'a = SELECT * FROM b;\nOUTPUT a TO "x.ss";'
+
+        result = self.split(content)
+
+        self.assertEqual(['a = SELECT * FROM b', '\nOUTPUT a TO "x.ss"', ''], [part for _, part in result])
+
+        for offset, part in result:
+            self.assertEqual(part, content[offset:offset + len(part)])
+
+    def test_semicolon_in_string(self):
+        result = self.split('a = SELECT "x;y" AS A, Keyword.Split(\';\') AS B FROM b; c = SELECT * FROM a;')
+
+        self.assertEqual(3, len(result))
+        self.assertEqual('a = SELECT "x;y" AS A, Keyword.Split(\';\') AS B FROM b', result[0][1])
+
+    def test_escaped_quote(self):
+        result = self.split('#DECLARE A string = "a\\";b"; #DECLARE B string = "c";')
+
+        self.assertEqual('#DECLARE A string = "a\\";b"', result[0][1])
+        self.assertEqual(' #DECLARE B string = "c"', result[1][1])
+
+    def test_verbatim_string(self):
+        result = self.split('#DECLARE A string = @"C:\\dir\\"; #DECLARE B string = @"say ""a;b""";')
+
+        self.assertEqual('#DECLARE A string = @"C:\\dir\\"', result[0][1])
+        self.assertEqual(' #DECLARE B string = @"say ""a;b"""', result[1][1])
+
+    def test_comment(self):
+        result = self.split('a = SELECT * // no; split\nFROM b /* nor; here */;')
+
+        self.assertEqual(2, len(result))
+
+    def test_stop_at_cs(self):
+        result = self.split('a = SELECT * FROM b;\n#CS\npublic class A { int a; }\n#ENDCS')
+
+        self.assertEqual([(0, 'a = SELECT * FROM b')], result)
+
+    def test_lazy(self):
+        gen = StatementSplitter().split('a;b;c')
+
+        self.assertEqual((0, 'a'), next(gen))
+        self.assertEqual((2, 'b'), next(gen))
@@ -0,0 +1,76 @@
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+from myparser.workflow_parser import WorkflowParser
+
+
+MASTER_CONFIG = '''<Config><SqlConnectionString>x</SqlConnectionString>
+<Parameters><Parameter><Name>Base</Name><Value>/base</Value></Parameter></Parameters>
+<Workflows>{workflows}</Workflows></Config>
+'''
+
+WORKFLOW = '<Workflow><Process>{process}</Process><Group>{group}</Group></Workflow>'
+
+PROCESS_CONFIG = '''<Config><Process>{process}</Process><ClassName>ScopeJobRunner</ClassName>
+<Parameters>
+<Parameter><Name>ScriptFile</Name><Value>Scripts/{script}</Value></Parameter>
+<Parameter><Name>EventName</Name><Value>{process}Done</Value></Parameter>
+<Parameter><Name>DeltaInterval</Name><Value>1.00:00:00</Value></Parameter>
+</Parameters></Config>
+'''
+
+
+class TestWorkflowParallel(TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+
+        # the same master config key (folder##filename) under two parents, the first one wins
+        self.write_file('a/Group/Master.config', MASTER_CONFIG.format(
+            workflows=''.join(WORKFLOW.format(process='P{}'.format(i), group='G{}'.format(i % 3)) for i in range(20))))
+        self.write_file('b/Group/Master.config', MASTER_CONFIG.format(
+            workflows=WORKFLOW.format(process='P0', group='Other')))
+
+        for i in range(20):
+            # pairs of processes share a script, the first one is kept in script_process_map
+            self.write_file('a/Group/P{}.config'.format(i), PROCESS_CONFIG.format(process='P{}'.format(i),
+                                                                                  script='S{}.script'.format(i // 2)))
+
+        self.write_file('a/Group/Broken.config', '<Config><Process>')
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def write_file(self, name, content):
+        filepath = os.path.join(self.folder, name)
+        os.makedirs(os.path.dirname(filepath), exist_ok=True)
+
+        with open(filepath, 'w') as f:
+            f.write(content)
+
+    def test_same_as_sequential(self):
+        wfp = WorkflowParser()
+        wfp.PARALLEL_MIN_FILES = 0
+
+        expected = vars(wfp.parse_folder(self.folder))
+
+        # which duplicate comes first depends on the listing order, the same in both cases
+        self.assertEqual(['Group##Master.config'], list(expected['masters']))
+        self.assertEqual(10, len(expected['script_process_map']))
+        self.assertEqual(20, len(expected['workflows']))
+
+        for process_no in [2, None]:
+            obj = vars(wfp.parse_folder(self.folder, process_no=process_no))
+
+            self.assertEqual(expected, obj)
+            self.assertEqual(list(expected['workflows']), list(obj['workflows']))
+
+    def test_parse_config_files(self):
+        wfp = WorkflowParser()
+        wfp.PARALLEL_MIN_FILES = 0
+
+        filepaths = [os.path.join(self.folder, 'a/Group', name) for name in ['P1.config', 'Broken.config', 'P0.config']]
+        results = wfp.parse_config_files(filepaths, process_no=2)
+
+        self.assertEqual(['P1', None, 'P0'], [d and d['process_name'] for d, _ in results])
+        self.assertEqual([None, str, None], [error and type(error) for _, error in results])
@@ -0,0 +1,151 @@
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+from myparser.workflow_parser import WorkflowObj, WorkflowParser
+
+
+MASTER_CONFIG = '''<Config><SqlConnectionString>x</SqlConnectionString>
+<Parameters><Parameter><Name>Root</Name><Value>{root}</Value></Parameter></Parameters>
+<Workflows>{workflows}</Workflows></Config>
+'''
+
+WORKFLOW = '<Workflow><Process>{process}</Process><Group>G1</Group></Workflow>'
+
+PROCESS_CONFIG = '''<Config><Process>{process}</Process><ClassName>ScopeJobRunner</ClassName>
+<Parameters>
+<Parameter><Name>ScriptFile</Name><Value>Scripts/{process}.script</Value></Parameter>
+<Parameter><Name>EventName</Name><Value>{process}Done</Value></Parameter>
+<Parameter><Name>DeltaInterval</Name><Value>{interval}</Value></Parameter>
+<Parameter><Name>ScopeJobParams</Name><Value><string>-params Out=$(Root)/{process}</string></Value></Parameter>
+</Parameters></Config>
+'''
+
+
+class CountingWorkflowParser(WorkflowParser):
+    def __init__(self):
+        super().__init__()
+        self.parsed = []
+
+    def parse_file(self, filepath):
+        self.parsed.append(os.path.basename(filepath))
+        return super().parse_file(filepath)
+
+
+class TestWorkflowSnapshot(TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.wf_folder = os.path.join(self.folder, 'Group')
+        self.snapshot_filepath = os.path.join(self.folder, 'cache', 'Group.pickle')
+
+        os.makedirs(self.wf_folder)
+
+        self.write_master('/root1', ['P1', 'P2', 'P3'])
+
+        for process in ['P1', 'P2', 'P3']:
+            self.write_process(process)
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def write_file(self, name, content):
+        filepath = os.path.join(self.wf_folder, name)
+        mtime_ns = os.stat(filepath).st_mtime_ns if os.path.exists(filepath) else None
+
+        with open(filepath, 'w') as f:
+            f.write(content)
+
+        # a change within the mtime resolution
+        if mtime_ns is not None and os.stat(filepath).st_mtime_ns == mtime_ns:
+            os.utime(filepath, ns=(mtime_ns + 1000000, mtime_ns + 1000000))
+
+    def write_master(self, root, processes):
+        self.write_file('Master.config', MASTER_CONFIG.format(root=root, workflows=''.join(WORKFLOW.format(process=p) for p in processes)))
+
+    def write_process(self, process, interval='1.00:00:00'):
+        self.write_file(process + '.config', PROCESS_CONFIG.format(process=process, interval=interval))
+
+    def assert_same_as_full_parse(self, obj):
+        expected = vars(WorkflowParser().parse_folder(self.wf_folder))
+
+        for name in ['masters', 'workflows', 'wf_groups', 'process_master_map', 'script_process_map',
+                     'event_interval_map', 'process_event_deps', 'process_filepath', 'config_stats']:
+            self.assertEqual(expected[name], getattr(obj, name), name)
+
+    def test_save_load(self):
+        wfp = WorkflowParser()
+        obj = wfp.parse_folder(self.wf_folder)
+        wfp.get_params(obj, 'P1')
+        obj.save(self.snapshot_filepath)
+
+        loaded = WorkflowObj.load(self.snapshot_filepath)
+
+        self.assert_same_as_full_parse(loaded)
+        self.assertEqual({'Out': '/root1/P1'}, wfp.get_params(loaded, 'P1'))
+
+        # the cached params are still tied to the loaded config dicts
+        self.assertIs(loaded.workflows['P1'], loaded.param_maps[('P1', 'Group##Master.config')][0])
+
+    def test_invalid_snapshots(self):
+        self.assertIsNone(WorkflowObj.load(self.snapshot_filepath))
+
+        WorkflowParser().parse_folder(self.wf_folder).save(self.snapshot_filepath)
+
+        version = WorkflowObj.get_snapshot_version()
+        self.addCleanup(setattr, WorkflowObj, '_snapshot_version', version)
+
+        WorkflowObj._snapshot_version = 'other'
+        self.assertIsNone(WorkflowObj.load(self.snapshot_filepath))
+
+        WorkflowObj._snapshot_version = version
+
+        with open(self.snapshot_filepath, 'wb') as f:
+            f.write(b'not a snapshot')
+
+        with self.assertLogs('myparser.workflow_parser', 'WARNING'):
+            self.assertIsNone(WorkflowObj.load(self.snapshot_filepath))
+
+    def test_incremental_refresh(self):
+        wfp = CountingWorkflowParser()
+        previous = wfp.parse_folder(self.wf_folder)
+
+        # changed, added and removed configs
+        self.write_master('/root2', ['P1', 'P3', 'P4'])
+        self.write_process('P3', interval='03:00:00')
+        self.write_process('P4')
+        os.remove(os.path.join(self.wf_folder, 'P2.config'))
+
+        wfp.parsed = []
+        obj = wfp.parse_folder(self.wf_folder, previous=previous)
+
+        self.assertEqual(['Master.config', 'P3.config', 'P4.config'], sorted(wfp.parsed))
+        self.assert_same_as_full_parse(obj)
+        self.assertEqual('3H', obj.event_interval_map['P3Done'])
+        self.assertEqual({'Out': '/root2/P1'}, wfp.get_params(obj, 'P1'))
+
+        # unchanged configs are shared
+        self.assertIs(previous.workflows['P1'], obj.workflows['P1'])
+
+    def test_load_folder(self):
+        wfp = CountingWorkflowParser()
+
+        wfp.load_folder(self.wf_folder, self.snapshot_filepath)
+        self.assertEqual(4, len(wfp.parsed))
+
+        snapshot_mtime_ns = os.stat(self.snapshot_filepath).st_mtime_ns
+
+        # nothing changed, nothing parsed or saved
+        wfp.parsed = []
+        obj = wfp.load_folder(self.wf_folder, self.snapshot_filepath)
+
+        self.assertEqual([], wfp.parsed)
+        self.assertEqual(snapshot_mtime_ns, os.stat(self.snapshot_filepath).st_mtime_ns)
+        self.assert_same_as_full_parse(obj)
+
+        self.write_process('P2', interval='P2D')
+
+        obj = wfp.load_folder(self.wf_folder, self.snapshot_filepath)
+
+        self.assertEqual(['P2.config'], wfp.parsed)
+        self.assertEqual('2D', WorkflowObj.load(self.snapshot_filepath).event_interval_map['P2Done'])
+        self.assert_same_as_full_parse(obj)
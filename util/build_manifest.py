@@ -0,0 +1,92 @@
+import os
+import glob
+import json
+import hashlib
+import logging
+from util.file_utility import FileUtility
+
+
+class BuildManifest(object):
+    ''' Input hashes of generated artifacts, kept as manifest.json in the output folder
+
+    An artifact (e.g. the graphs of one script) is up to date if the hash of its inputs equals
+    the recorded one and all its recorded outputs still exist.
+    '''
+    logger = logging.getLogger(__name__)
+
+    MANIFEST_FILENAME = 'manifest.json'
+
+    # files whose content affects generated graphs: sources, and config.ini with TARGET_DATE,
+    # sstream prefixes, ExternalParam and RenderPolicy
+    TOOL_SOURCES = ['main.py',
+                    'myparser/*.py',
+                    'scope_parser/*.py',
+                    'graph/*.py',
+                    'util/datetime_utility.py',
+                    'util/file_utility.py',
+                    'util/parse_util.py',
+                    'config/config.ini']
+
+    _tool_version = None
+
+    def __init__(self, folder):
+        self.folder = folder
+        self.filepath = os.path.join(folder, self.MANIFEST_FILENAME)
+        self.entries = {}
+
+        self.load()
+
+    @classmethod
+    def get_tool_version(cls):
+        if cls._tool_version is None:
+            root = os.path.join(os.path.dirname(__file__), os.pardir)
+            filepaths = []
+
+            for pattern in cls.TOOL_SOURCES:
+                filepaths.extend(sorted(glob.glob(os.path.join(root, pattern))))
+
+            cls._tool_version = FileUtility.get_files_sha1(filepaths)
+
+        return cls._tool_version
+
+    @staticmethod
+    def make_inputs_hash(*inputs):
+        ''' sha1 of json serializable inputs, e.g. file hashes, param map, flags
+        '''
+        return hashlib.sha1(json.dumps(inputs, sort_keys=True, default=str).encode()).hexdigest()
+
+    def load(self):
+        if not os.path.isfile(self.filepath):
+            return
+
+        try:
+            with open(self.filepath) as f:
+                self.entries = json.load(f)
+        except (OSError, ValueError) as ex:
+            self.logger.warning('ignore broken manifest [{}]: {}'.format(self.filepath, ex))
+            self.entries = {}
+
+    def save(self):
+        # write then rename, so a killed run never leaves a truncated manifest
+        tmp_filepath = '{}.tmp'.format(self.filepath)
+
+        with open(tmp_filepath, 'w') as f:
+            json.dump(self.entries, f, indent=1, sort_keys=True)
+
+        os.replace(tmp_filepath, self.filepath)
+
+    def is_up_to_date(self, artifact, inputs_hash):
+        entry = self.entries.get(artifact)
+
+        if entry is None or inputs_hash is None or entry['inputs'] != inputs_hash or not entry['outputs']:
+            return False
+
+        return all(os.path.isfile(os.path.join(self.folder, output)) for output in entry['outputs'])
+
+    def update(self, artifact, inputs_hash, output_filepaths):
+        self.entries[artifact] = {'inputs': inputs_hash,
+                                  'outputs': sorted(os.path.relpath(f, self.folder).replace('\\', '/')
+                                                    for f in output_filepaths)}
+
+    def remove(self, artifact):
+        self.entries.pop(artifact, None)
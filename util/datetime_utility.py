@@ -3,6 +3,11 @@ import re
 
 
 class DatetimeUtility(object):
+    # {yyyy-MM-dd}
+    re_ymd = re.compile(r'({(yyyy)?([-_/]?MM)?([-_/]?dd)?([-_/]?HH)?})')
+    # same with a date part, re_ymd also matches {} or {HH}, which don't change with the date
+    re_has_ymd = re.compile(r'{(?=[-_/]?(yyyy|MM|dd))(yyyy)?([-_/]?MM)?([-_/]?dd)?([-_/]?HH)?}')
+
     @staticmethod
     def get_datetime(delta_days=0, fmt_str=''):
         ret = datetime.now() + timedelta(days=delta_days)
@@ -12,10 +17,13 @@ class DatetimeUtility(object):
 
         return ret
 
-    @staticmethod
-    def replace_ymd(ymd_str, target_datetime):
-        # {yyyy-MM-dd}
-        match = re.search(r'({(yyyy)?([-_/]?MM)?([-_/]?dd)?([-_/]?HH)?})', ymd_str)
+    @classmethod
+    def has_ymd(cls, ymd_str):
+        return cls.re_has_ymd.search(ymd_str) is not None
+
+    @classmethod
+    def replace_ymd(cls, ymd_str, target_datetime):
+        match = cls.re_ymd.search(ymd_str)
         if match:
             s = match.group(1).replace('yyyy', target_datetime.strftime('%Y'))\
                               .replace('MM', target_datetime.strftime('%m'))\
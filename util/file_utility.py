@@ -2,6 +2,7 @@ import time
 import os
 import stat
 import codecs
+import hashlib
 
 class FileUtility(object):
 
@@ -50,6 +51,20 @@ class FileUtility(object):
         with open(filepath) as f:
             return f.read()
 
+    @staticmethod
+    def get_files_sha1(filepaths):
+        ''' sha1 hex digest over the name and content of the files, in the given order
+        '''
+        h = hashlib.sha1()
+
+        for filepath in filepaths:
+            h.update(os.path.basename(filepath).encode('utf-8', 'ignore'))
+
+            with open(filepath, 'rb') as f:
+                h.update(f.read())
+
+        return h.hexdigest()
+
 
 if __name__ == '__main__':
     print(FileUtility.get_file_age_seconds(__file__))
@@ -0,0 +1,67 @@
+import os
+import json
+import logging
+
+
+class NdjsonJournal(object):
+    ''' Append-only file of JSON records, one per line
+
+    Every append is flushed and fsync'd, so records written before a crash or kill survive it.
+    A torn last line (killed in the middle of a write) is ignored on read.
+    '''
+    logger = logging.getLogger(__name__)
+
+    def __init__(self, filepath):
+        self.filepath = filepath
+        self._fp = None
+
+    def read(self):
+        ''' :return: list of records, empty if the file does not exist
+        '''
+        records = []
+
+        if not os.path.isfile(self.filepath):
+            return records
+
+        with open(self.filepath, encoding='utf-8') as f:
+            for line_no, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    self.logger.warning('ignore broken record at [{}:{}]'.format(self.filepath, line_no))
+
+        return records
+
+    def open(self, append=True):
+        ''' :param append: keep existing records, otherwise start an empty journal
+        '''
+        self.close()
+
+        if append and os.path.isfile(self.filepath):
+            # a torn last line must not swallow the next record
+            with open(self.filepath, 'rb+') as f:
+                f.seek(0, os.SEEK_END)
+
+                if f.tell() > 0:
+                    f.seek(-1, os.SEEK_END)
+
+                    if f.read(1) != b'\n':
+                        f.write(b'\n')
+
+        self._fp = open(self.filepath, 'a' if append else 'w', encoding='utf-8')
+
+    def append(self, record):
+        if self._fp is None:
+            self.open()
+
+        self._fp.write(json.dumps(record, sort_keys=True, default=str) + '\n')
+        self._fp.flush()
+        os.fsync(self._fp.fileno())
+
+    def close(self):
+        if self._fp is not None:
+            self._fp.close()
+            self._fp = None
@@ -0,0 +1,126 @@
+import os
+import time
+import signal
+import logging
+import multiprocessing as mp
+
+
+# set in each worker by _init_worker, workers report (task_index, pid, start_time) here
+_started_queue = None
+
+
+def _init_worker(started_queue, initializer, initargs):
+    global _started_queue
+    _started_queue = started_queue
+
+    if initializer:
+        initializer(*initargs)
+
+
+def _run_task(func_index_task):
+    func, index, task = func_index_task
+
+    if _started_queue is not None:
+        _started_queue.put((index, os.getpid(), time.time()))
+
+    return index, func(task)
+
+
+class PoolUtility(object):
+    ''' multiprocessing.Pool that streams results back and kills tasks running over a timeout
+
+    Results are yielded as soon as any worker finishes (imap_unordered). With a timeout, each
+    worker reports when it starts a task, and the worker of a task running longer than
+    timeout seconds is killed; the pool replaces it with a fresh one.
+    '''
+    logger = logging.getLogger(__name__)
+
+    POLL_SECONDS = 0.5
+
+    def __init__(self,
+                 processes=None,
+                 initializer=None,
+                 initargs=(),
+                 chunksize=1,
+                 maxtasksperchild=None,
+                 timeout=None):
+        self.processes = processes
+        self.initializer = initializer
+        self.initargs = initargs
+        self.chunksize = chunksize
+        self.maxtasksperchild = maxtasksperchild
+        self.timeout = timeout
+
+        if timeout and chunksize != 1:
+            # a killed worker would silently drop the rest of its chunk
+            self.logger.info('timeout specified, use chunksize 1 instead of {}'.format(chunksize))
+            self.chunksize = 1
+
+    def imap_unordered(self, func, tasks):
+        ''' Run func(task) for every task in the pool
+
+        :param func: module level function, called as func(task) in the worker
+        :param tasks: list of picklable tasks
+        :return: generator of (task, result, timed_out), result is None if timed_out
+        '''
+        tasks = list(tasks)
+        started_queue = mp.SimpleQueue() if self.timeout else None
+
+        with mp.Pool(processes=self.processes,
+                     initializer=_init_worker,
+                     initargs=(started_queue, self.initializer, self.initargs),
+                     maxtasksperchild=self.maxtasksperchild) as pool:
+            results = pool.imap_unordered(_run_task,
+                                          [(func, index, task) for index, task in enumerate(tasks)],
+                                          chunksize=self.chunksize)
+
+            if not self.timeout:
+                for index, result in results:
+                    yield tasks[index], result, False
+
+                return
+
+            pending = set(range(len(tasks)))
+            running = {}  # task index -> (pid, start time)
+
+            while pending:
+                try:
+                    index, result = results.next(timeout=self.POLL_SECONDS)
+                except mp.TimeoutError:
+                    pass
+                else:
+                    pending.discard(index)
+                    running.pop(index, None)
+
+                    yield tasks[index], result, False
+
+                # also while other tasks keep finishing within the poll time
+                for index in self.kill_timeout_tasks(started_queue, pending, running):
+                    yield tasks[index], None, True
+
+    def kill_timeout_tasks(self, started_queue, pending, running):
+        while not started_queue.empty():
+            index, pid, start = started_queue.get()
+
+            if index in pending:
+                running[index] = (pid, start)
+
+        now = time.time()
+        timeout_indexes = []
+
+        for index, (pid, start) in list(running.items()):
+            if now - start <= self.timeout:
+                continue
+
+            self.logger.warning('task {} exceeds timeout {}s, kill worker [{}]'.format(index, self.timeout, pid))
+
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except OSError as ex:
+                self.logger.warning('failed to kill worker [{}]: {}'.format(pid, ex))
+
+            pending.discard(index)
+            del running[index]
+            timeout_indexes.append(index)
+
+        return timeout_indexes